@@ -4,7 +4,9 @@ Descriptions and Instructions
 ===============================
 This module contains the function that is used to extract the author
 information from the given dataset of authors and builds a dictionary
-mapping the ID of each author to their name.
+mapping the ID of each author to their name. Only the authors whose IDs
+are needed can be kept, and the resulting table can be saved as a small
+sidecar index that later runs read instead of the whole dataset.
 
 Copyright and Usage Information
 ===============================
@@ -21,32 +23,157 @@ This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
 Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 
+from __future__ import annotations
+from collections.abc import Iterable
+from functools import partial
 import gzip
 import json
+import re
+import numpy
+from ingest import parse_chunks
+from snapshot import load_snapshot, save_snapshot
 
 
 DATA_FILENAME = 'data/authors.json.gz'
+AUTHOR_INDEX_DIRECTORY = 'data/author_index'
+AUTHOR_ID_PATTERN = re.compile(rb'"author_id":\s*"(\d+)"')
 
 
-def load_author_data() -> dict[int, str]:
+class AuthorIndex:
+    """A compact table from author id to author name.
+
+    Instance Attributes:
+        - ids: the author ids in the table, in ascending order
+        - offsets: the name of the author ids[i] is data[offsets[i]:offsets[i + 1]]
+        - data: the utf-8 encoded names of all authors in the table, one after another
+        - requested: the sorted author ids this table was built for, including those of
+          authors that are missing from the dataset
+
+    Representation Invariants:
+        - len(self.offsets) == len(self.ids) + 1
     """
-    Read and extract author json.gz data and return a mapping from author id to author name
+    ids: numpy.ndarray
+    offsets: numpy.ndarray
+    data: numpy.ndarray
+    requested: numpy.ndarray
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the table from the arrays returned by AuthorIndex.arrays."""
+        self.ids = arrays['ids']
+        self.offsets = arrays['offsets']
+        self.data = arrays['data']
+        self.requested = arrays['requested']
+
+    @classmethod
+    def from_names(cls, names: dict[int, str], requested: Iterable[int]) -> AuthorIndex:
+        """Return a table holding the given mapping from author id to author name, built for
+        the requested author ids.
+        """
+        ids = numpy.array(sorted(names), dtype=numpy.int64)
+        encoded = [names[author_id].encode('utf-8') for author_id in ids.tolist()]
+        offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+        offsets[1:] = numpy.cumsum(numpy.fromiter(map(len, encoded), dtype=numpy.int64, count=len(encoded)))
+
+        return cls({'ids': ids,
+                    'offsets': offsets,
+                    'data': numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8),
+                    'requested': numpy.array(sorted(requested), dtype=numpy.int64)})
+
+    def arrays(self) -> dict[str, numpy.ndarray]:
+        """Return the arrays this table is stored in."""
+        return {'ids': self.ids, 'offsets': self.offsets, 'data': self.data, 'requested': self.requested}
+
+    def covers(self, author_ids: set[int]) -> bool:
+        """Return whether this table was built for every author id in author_ids."""
+        needed = numpy.fromiter(author_ids, dtype=numpy.int64, count=len(author_ids))
+        return bool(numpy.isin(needed, self.requested, assume_unique=True).all())
+
+    def to_dict(self) -> dict[int, str]:
+        """Return the mapping from author id to author name held by this table."""
+        offsets = self.offsets.tolist()
+        data = self.data.tobytes()
+        return {author_id: data[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i, author_id in enumerate(self.ids.tolist())}
+
+
+def load_author_data(workers: int = 1, author_ids: set[int] | None = None) -> dict[int, str]:
     """
+    Read and extract author json.gz data and return a mapping from author id to author name
 
-    data = []
-    with gzip.open(DATA_FILENAME) as fin:
-        for i in fin:
-            d = json.loads(i)
-            data.append(d)
+    If author_ids is not None, only the authors whose ids are in author_ids are kept, and the
+    records of the other authors are skipped without being fully decoded. If workers > 1, the
+    lines are parsed in chunks by that many worker processes, which gives the same mapping as
+    parsing them in this process.
 
-    data = {int(author['author_id']): author['name'] for author in data}
+    Preconditions:
+        - workers >= 1
+    """
+    if workers == 1:
+        with gzip.open(DATA_FILENAME) as fin:
+            return dict(_parse_authors(fin, author_ids))
+
+    data = {}
+    for authors in parse_chunks(DATA_FILENAME, partial(_parse_author_chunk, author_ids=author_ids), workers):
+        data.update(authors)
 
     return data
 
 
+def load_author_names(author_ids: set[int], workers: int = 1) -> dict[int, str]:
+    """Return a mapping from author id to author name for every author in author_ids that is
+    in the author data.
+
+    The mapping is read from the sidecar author index if that index was built from the current
+    author data for all of author_ids. Otherwise, it is read from the author data, keeping only
+    the needed authors, and saved as the new sidecar index.
+
+    Preconditions:
+        - workers >= 1
+    """
+    arrays = load_snapshot(AUTHOR_INDEX_DIRECTORY, [DATA_FILENAME])
+    if arrays is not None:
+        index = AuthorIndex(arrays)
+        if index.covers(author_ids):
+            return index.to_dict()
+        # the arrays are memory-mapped from the files that are about to be rewritten
+        arrays = index = None
+
+    names = load_author_data(workers, author_ids)
+    save_snapshot(AUTHOR_INDEX_DIRECTORY, AuthorIndex.from_names(names, author_ids).arrays(), [DATA_FILENAME])
+
+    return names
+
+
+def _parse_authors(lines: Iterable[bytes], author_ids: set[int] | None = None) -> list[tuple[int, str]]:
+    """Return the (author id, author name) pair of every author record in lines, keeping only
+    the authors whose ids are in author_ids unless author_ids is None.
+    """
+    authors = []
+    for line in lines:
+        if author_ids is not None:
+            match = AUTHOR_ID_PATTERN.search(line)
+            if match is not None and int(match.group(1)) not in author_ids:
+                continue
+
+        author = json.loads(line)
+        author_id = int(author['author_id'])
+        if author_ids is None or author_id in author_ids:
+            authors.append((author_id, author['name']))
+
+    return authors
+
+
+def _parse_author_chunk(chunk: bytes, author_ids: set[int] | None = None) -> list[tuple[int, str]]:
+    """Return the (author id, author name) pair of every author record in the given chunk of
+    whole lines, keeping only the authors whose ids are in author_ids unless author_ids is None.
+    """
+    return _parse_authors(chunk.splitlines(), author_ids)
+
+
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['gzip', 'json']
+        'extra-imports': ['__future__', 'collections.abc', 'functools', 'gzip', 'json', 're', 'numpy', 'ingest',
+                          'snapshot']
     })
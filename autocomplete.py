@@ -0,0 +1,176 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a customized class called AutocompleteIndex that is
+used to complete what the user types into the GUI's search boxes. The
+index keeps the case-folded keys of all completions in one sorted list, so
+that the completions starting with a prefix are found by binary search,
+and returns only the most popular of them, as measured by the number of
+ratings of the books they belong to. Indexes are built for book IDs,
+titles, authors and publishers.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from collections.abc import Iterable
+import numpy
+from book import Book
+from book_store import BookStore, decode_strings
+
+
+COMPLETION_FIELDS = ('book_id', 'title', 'author', 'publisher')
+NUM_COMPLETIONS = 10
+# Prefixes matching at most this many keys are ranked directly; for more, the completions
+# are visited from the most to the least popular until enough of them match.
+RANK_LIMIT = 4096
+SCAN_CHUNK = 4096
+
+
+class AutocompleteIndex:
+    """An index of completions, which finds the most popular completions of a prefix.
+
+    Each completion has a label, which is what is shown to the user, a key, which is what
+    the prefix typed by the user is matched against, and a score. The keys are case-folded
+    and kept in sorted order together with the labels and scores of their completions.
+
+    Instance Attributes:
+        - keys: the key of every completion, in sorted order
+        - labels: the label of every completion, in the same order as keys
+        - scores: the score of every completion, in the same order as keys
+        - ranking: the positions of the completions from the highest to the lowest score
+          (ties in key order)
+
+    Representation Invariants:
+        - len(self.keys) == len(self.labels) == len(self.scores) == len(self.ranking)
+        - self.keys == sorted(self.keys)
+    """
+    keys: list[str]
+    labels: list[str]
+    scores: numpy.ndarray
+    ranking: numpy.ndarray
+
+    def __init__(self, keys: Iterable[str], labels: Iterable[str], scores: Iterable[int]) -> None:
+        """Initialize the index with completions that have the given keys, labels and scores,
+        in corresponding order. Keys are case-folded here.
+        """
+        entries = sorted(zip((key.casefold() for key in keys), labels, scores))
+        self.keys = [entry[0] for entry in entries]
+        self.labels = [entry[1] for entry in entries]
+        self.scores = numpy.array([entry[2] for entry in entries], dtype=numpy.int64)
+        self.ranking = numpy.lexsort((numpy.arange(len(entries)), -self.scores))
+
+    def __len__(self) -> int:
+        """Return the number of completions in this index."""
+        return len(self.keys)
+
+    def complete(self, prefix: str, n: int = NUM_COMPLETIONS) -> list[str]:
+        """Return the labels of the n completions with the highest scores whose key starts with
+        prefix, ignoring case, from the highest score to the lowest (ties in key order).
+
+        Preconditions:
+            - n >= 0
+        """
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + chr(0x10ffff), start)
+        if end - start <= RANK_LIMIT:
+            positions = start + numpy.argsort(-self.scores[start:end], kind='stable')[:n]
+        else:
+            positions = self._scan(start, end, n)
+
+        return [self.labels[position] for position in positions.tolist()]
+
+    def _scan(self, start: int, end: int, n: int) -> numpy.ndarray:
+        """Return the positions of the n completions with the highest scores among the
+        positions start to end - 1, by visiting the completions from the most popular one.
+        """
+        found = []
+        num_found = 0
+        for chunk_start in range(0, len(self.ranking), SCAN_CHUNK):
+            if num_found >= n:
+                break
+            chunk = self.ranking[chunk_start:chunk_start + SCAN_CHUNK]
+            matches = chunk[(chunk >= start) & (chunk < end)]
+            found.append(matches)
+            num_found += len(matches)
+
+        return numpy.concatenate(found)[:n] if found else numpy.zeros(0, dtype=numpy.int64)
+
+
+def build_indexes(books: dict[int, Book]) -> dict[str, AutocompleteIndex]:
+    """Return an autocomplete index for every field in COMPLETION_FIELDS over books.
+
+    A book ID completes to itself, a title or publisher to itself, and an author name to
+    '<name> (ID <author id>)' as in the GUI. Each completion is scored by the total number of
+    ratings of the books it belongs to.
+    """
+    if isinstance(books, BookStore):
+        return _build_from_columns(books.arrays)
+
+    totals = {field: {} for field in COMPLETION_FIELDS[1:]}
+    names = {}
+    for book_id in books:
+        book = books[book_id]
+        totals['title'][book.title] = totals['title'].get(book.title, 0) + book.ratings_count
+        totals['publisher'][book.publisher] = totals['publisher'].get(book.publisher, 0) + book.ratings_count
+        for author_id, name in book.authors.items():
+            totals['author'][author_id] = totals['author'].get(author_id, 0) + book.ratings_count
+            names.setdefault(author_id, name)
+
+    authors = totals['author']
+    return {
+        'book_id': AutocompleteIndex((str(book_id) for book_id in books), (str(book_id) for book_id in books),
+                                     (books[book_id].ratings_count for book_id in books)),
+        'title': AutocompleteIndex(totals['title'], totals['title'], totals['title'].values()),
+        'author': AutocompleteIndex((names[author_id] for author_id in authors),
+                                    (f'{names[author_id]} (ID {author_id})' for author_id in authors),
+                                    authors.values()),
+        'publisher': AutocompleteIndex(totals['publisher'], totals['publisher'], totals['publisher'].values())
+    }
+
+
+def _build_from_columns(columns: dict[str, numpy.ndarray]) -> dict[str, AutocompleteIndex]:
+    """Return an autocomplete index for every field in COMPLETION_FIELDS over the books with
+    the given BookStore columns, summing the ratings of each distinct value by its dictionary code.
+    """
+    ratings = columns['ratings_count']
+    ids = [str(book_id) for book_id in columns['book_id'].tolist()]
+    indexes = {'book_id': AutocompleteIndex(ids, ids, ratings.tolist())}
+
+    for field in ('title', 'publisher'):
+        values = decode_strings(columns[f'{field}.offsets'], columns[f'{field}.data'])
+        totals = numpy.bincount(columns[f'{field}.codes'], weights=ratings, minlength=len(values))
+        indexes[field] = AutocompleteIndex(values, values, totals.astype(numpy.int64).tolist())
+
+    author_ratings = numpy.repeat(ratings, numpy.diff(columns['authors.offsets']))
+    author_ids, first, inverse = numpy.unique(columns['authors.ids'], return_index=True, return_inverse=True)
+    totals = numpy.bincount(inverse.reshape(-1), weights=author_ratings, minlength=len(author_ids))
+    values = decode_strings(columns['authors.names.offsets'], columns['authors.names.data'])
+    names = [values[code] for code in columns['authors.names.codes'][first].tolist()]
+    indexes['author'] = AutocompleteIndex(names, (f'{name} (ID {author_id})'
+                                                  for name, author_id in zip(names, author_ids.tolist())),
+                                          totals.astype(numpy.int64).tolist())
+
+    return indexes
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'bisect', 'collections.abc', 'numpy', 'book', 'book_store']
+    })
@@ -0,0 +1,290 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module measures how the time and memory used to load the library and
+to build and query the recommendation systems grow with the number of
+books. For each size, a synthetic catalogue is generated with
+synthetic_data.py and every stage is timed in a new process, from reading
+the data files to answering a batch of seeded queries with each system.
+
+The results, with the scaling exponent of every stage and the commit and
+versions they were measured with, are saved as json, so that the results
+of two commits can be compared with compare_results. Run it with
+
+    python -m cli benchmark [--sizes 10000 100000 1000000] [--compare <old results>]
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy
+from synthetic_data import SEED, generate_catalogue
+
+
+SIZES = (10000, 100000, 1000000)
+BENCHMARK_DIRECTORY = 'data/benchmark'
+RESULTS_FILENAME = 'data/benchmark/results.json'
+NUM_QUERIES = 100
+NUM_SAVED_BOOKS = 3
+PAGE_RANGE = 50
+ANSWERED = 0.5
+# A stage is reported as a regression if it takes this fraction longer than before.
+REGRESSION_THRESHOLD = 0.2
+
+
+def run_benchmark(sizes: tuple[int, ...] = SIZES, directory: str = BENCHMARK_DIRECTORY, seed: int = SEED,
+                  workers: int = 1, trace: bool = False) -> dict[str, Any]:
+    """Return the results of the benchmark at every number of books in sizes, using the given
+    number of worker processes to read the data files, with the catalogues generated in
+    subdirectories of directory from seed.
+
+    Each size is measured in a new process, so that its peak memory is not that of an earlier
+    size. If trace is True, the peak memory allocated in every stage is also traced with
+    tracemalloc, which makes every stage slower.
+
+    Preconditions:
+        - all(size >= 1 for size in sizes)
+        - workers >= 1
+    """
+    results = {'environment': _environment(), 'seed': seed, 'workers': workers, 'sizes': []}
+    for size in sizes:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results['sizes'].append(pool.submit(_benchmark_size, size, os.path.join(directory, str(size)), seed,
+                                                workers, trace).result())
+
+    results['scaling'] = scaling_exponents(results['sizes'])
+    return results
+
+
+def _benchmark_size(num_books: int, directory: str, seed: int, workers: int, trace: bool) -> dict[str, Any]:
+    """Return the time and memory of every stage of the benchmark with a catalogue of num_books
+    books generated from seed in directory, which is replaced if it exists.
+    """
+    stages = []
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    with _measure(stages, 'generate', trace):
+        summary = generate_catalogue(num_books, os.path.join(directory, 'data'), seed)
+
+    # the data files are read from paths relative to the working directory
+    working_directory = os.getcwd()
+    os.chdir(directory)
+    try:
+        _benchmark_systems(stages, seed, workers, trace)
+    finally:
+        os.chdir(working_directory)
+
+    return {'books': num_books, 'catalogue': summary, 'stages': stages}
+
+
+def _benchmark_systems(stages: list[dict[str, Any]], seed: int, workers: int, trace: bool) -> None:
+    """Append the time and memory of loading the library in the working directory and of building
+    and querying every recommendation system to stages.
+    """
+    from main import load_data
+    from library import Library
+    from recommendation_system import (IndexedRecommendationSystem, RecommendationSystem, SimilarBookSystem,
+                                       profile_seeds)
+
+    with _measure(stages, 'load_data', trace):
+        df = load_data(workers)
+    library = Library(columnar=True)
+    with _measure(stages, 'load_books', trace):
+        library.load_books(df, workers)
+    del df
+
+    books = library.books
+    stages[-1]['loaded'] = len(books)
+    profiles, saved_books = _queries(books, seed)
+
+    for name, system_class in (('tree', RecommendationSystem), ('indexed', IndexedRecommendationSystem)):
+        rec_sys = system_class(books)
+        with _measure(stages, f'{name}_initialize', trace):
+            rec_sys.initialize()
+        with _measure(stages, f'{name}_recommend', trace, len(profiles)):
+            for responses, profile_seed in zip(profiles, profile_seeds(seed, len(profiles))):
+                rec_sys.recommend(responses, random.Random(profile_seed))
+        del rec_sys
+
+    sim_sys = SimilarBookSystem(books)
+    with _measure(stages, 'similar_initialize', trace):
+        sim_sys.initialize()
+    with _measure(stages, 'similar_recommend', trace, len(saved_books)):
+        for saved in saved_books:
+            sim_sys.recommend(saved)
+
+
+def _queries(books: Any, seed: int) -> tuple[list[list], list[set[int]]]:
+    """Return NUM_QUERIES lists of responses to the recommendation questions, each describing a
+    random book in books with each optional question answered with probability ANSWERED, and
+    NUM_QUERIES random sets of NUM_SAVED_BOOKS saved books, drawn with seed.
+    """
+    rng = numpy.random.default_rng(seed)
+    book_ids = numpy.fromiter(books, dtype=numpy.int64, count=len(books))
+    profiles = []
+    for book_id, answered in zip(rng.choice(book_ids, NUM_QUERIES).tolist(),
+                                 (rng.random((NUM_QUERIES, 4)) < ANSWERED).tolist()):
+        book = books[book_id]
+        optional = [book.title, next(iter(book.authors)), book.publisher, book.publication_year]
+        profiles.append([(max(book.num_pages - PAGE_RANGE, 0), book.num_pages + PAGE_RANGE), [book.country],
+                         [book.language]] + [value if is_answered else None
+                                             for value, is_answered in zip(optional, answered)]
+                        + [True if book.is_ebook else None])
+
+    saved_books = [set(rng.choice(book_ids, NUM_SAVED_BOOKS).tolist()) for _ in range(NUM_QUERIES)]
+    return profiles, saved_books
+
+
+@contextmanager
+def _measure(stages: list[dict[str, Any]], name: str, trace: bool, num_queries: int = 0) -> Iterator[None]:
+    """Time the body of the with statement and append the result for the stage with the given name
+    to stages, with the peak memory of the process after it and, if trace is True, the peak memory
+    allocated during it. If num_queries is not 0, the time per query is also given.
+
+    The peak resident memory is a high-water mark of the whole process, so it is recorded as
+    cumulative_peak_rss_mb, together with peak_rss_growth_mb, how much this stage raised it
+    (0 for a stage using less memory than an earlier one).
+
+    The stage is recorded, marked as failed, and tracing is stopped even if the body raises.
+    """
+    if trace:
+        tracemalloc.start()
+    peak_before = _peak_rss_mb()
+    start = time.perf_counter()
+    stage = {'stage': name}
+    try:
+        yield
+    except BaseException:
+        stage['failed'] = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        peak = _peak_rss_mb()
+        stage.update({'seconds': round(seconds, 6), 'cumulative_peak_rss_mb': peak,
+                      'peak_rss_growth_mb': None if peak is None else round(peak - peak_before, 3)})
+        if num_queries != 0:
+            stage['ms_per_query'] = round(1000 * seconds / num_queries, 6)
+        if trace:
+            stage['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+            tracemalloc.stop()
+        stages.append(stage)
+
+
+def _peak_rss_mb() -> float | None:
+    """Return the peak resident memory of this process in megabytes, or None if it cannot be
+    measured on this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 3)
+
+
+def scaling_exponents(sizes: list[dict[str, Any]]) -> dict[str, float]:
+    """Return the scaling exponent of the time of every stage measured at two or more of the
+    given sizes, which is the slope of the log of its time against the log of the number of
+    books, so that 1 is linear and 2 is quadratic.
+    """
+    times = {}
+    for size in sizes:
+        for stage in size['stages']:
+            if stage['seconds'] > 0:
+                times.setdefault(stage['stage'], []).append((size['books'], stage['seconds']))
+
+    exponents = {}
+    for name, points in times.items():
+        num_books = numpy.log([point[0] for point in points])
+        if len(set(num_books.tolist())) >= 2:
+            slope = numpy.polyfit(num_books, numpy.log([point[1] for point in points]), 1)[0]
+            exponents[name] = round(float(slope), 3)
+
+    return exponents
+
+
+def compare_results(old: dict[str, Any], new: dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> list[dict[str, Any]]:
+    """Return the change in the time of every stage measured at the same number of books in
+    both the old and the new results, where a stage has regressed if its new time is more than
+    1 + threshold times its old time.
+
+    Preconditions:
+        - threshold >= 0
+    """
+    old_times = {(size['books'], stage['stage']): stage['seconds']
+                 for size in old['sizes'] for stage in size['stages']}
+    changes = []
+    for size in new['sizes']:
+        for stage in size['stages']:
+            old_seconds = old_times.get((size['books'], stage['stage']))
+            if old_seconds is None or old_seconds == 0:
+                continue
+            ratio = stage['seconds'] / old_seconds
+            changes.append({'books': size['books'], 'stage': stage['stage'], 'old_seconds': old_seconds,
+                            'new_seconds': stage['seconds'], 'ratio': round(ratio, 3),
+                            'regressed': ratio > 1 + threshold})
+
+    return changes
+
+
+def save_results(results: dict[str, Any], filename: str = RESULTS_FILENAME) -> None:
+    """Save results as json to filename, creating its directory if necessary."""
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def load_results(filename: str) -> dict[str, Any]:
+    """Return the results saved to filename by save_results."""
+    with open(filename) as file:
+        return json.load(file)
+
+
+def _environment() -> dict[str, Any]:
+    """Return the commit of the source tree and the versions of everything the results depend on."""
+    result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=False,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return {'commit': result.stdout.strip() if result.returncode == 0 else None,
+            'python': platform.python_version(), 'numpy': numpy.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'collections.abc', 'concurrent.futures', 'contextlib', 'typing', 'json',
+                          'multiprocessing', 'os', 'platform', 'random', 'shutil', 'subprocess', 'sys', 'time',
+                          'tracemalloc', 'numpy', 'synthetic_data', 'main', 'library', 'recommendation_system',
+                          'resource'],
+        'disable': ['forbidden-IO-function', 'import-outside-toplevel']
+    })
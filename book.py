@@ -20,7 +20,12 @@ This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
 Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 
-import pandas
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # pandas is only needed for type checking, so that reading books from a snapshot does not import it
+    import pandas
 
 
 class Book:
@@ -43,6 +48,10 @@ class Book:
         - similar_books: a set of similar books' ids
         - link: Goodreads url of the book
     """
+    # Books are kept by the hundred thousand, so they have no per-instance __dict__
+    __slots__ = ('book_id', 'title', 'is_ebook', 'authors', 'publisher', 'publication_year', 'country',
+                 'language', 'num_pages', 'genres', 'average_rating', 'ratings_count', 'description',
+                 'similar_books', 'link')
     book_id: int
     title: str
     is_ebook: bool
@@ -77,17 +86,42 @@ class Book:
         self.similar_books = {int(book_id) for book_id in df.iloc[i]['similar_books']}
         self.link = df.iloc[i]['link']
 
+    @classmethod
+    def from_fields(cls, fields: dict[str, Any]) -> Book:
+        """Return a book whose attributes are given by fields, a mapping from attribute name to value.
+
+        Preconditions:
+            - fields contains a value for every attribute of Book
+        """
+        book = cls.__new__(cls)
+        for name, value in fields.items():
+            setattr(book, name, value)
+        return book
+
     def get_attributes(self) -> tuple:
         """Return a tuple of attributes that are used in the tree-based recommendation system."""
         return (self.num_pages, self.country, self.language,
                 self.title, frozenset(self.authors.keys()), self.publisher, self.publication_year,
                 self.is_ebook, self.book_id)
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return every attribute of this book in a json-compatible dictionary.
+
+        Author IDs are converted to strings, and genres and similar books to sorted lists.
+        """
+        return {'book_id': self.book_id, 'title': self.title, 'is_ebook': self.is_ebook,
+                'authors': {str(author_id): name for author_id, name in self.authors.items()},
+                'publisher': self.publisher, 'publication_year': self.publication_year,
+                'country': self.country, 'language': self.language, 'num_pages': self.num_pages,
+                'genres': sorted(self.genres), 'average_rating': self.average_rating,
+                'ratings_count': self.ratings_count, 'description': self.description,
+                'similar_books': sorted(self.similar_books), 'link': self.link}
+
 
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['pandas'],
+        'extra-imports': ['__future__', 'typing', 'pandas'],
         'disable': ['too-many-instance-attributes']
     })
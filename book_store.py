@@ -0,0 +1,308 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a customized class called BookStore that is used
+to store the books of the library column by column instead of as one
+Book object per book. Numeric fields are kept in typed numpy arrays,
+string fields are dictionary-encoded into byte blobs, and lightweight
+Book views are created only when a book is looked up.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain
+import numpy
+from book import Book
+from genre import genres_to_mask, mask_to_genres
+
+
+NUMERIC_FIELDS = {
+    'num_pages': numpy.int32,
+    'publication_year': numpy.int32,
+    'average_rating': numpy.float64,
+    'ratings_count': numpy.int64,
+    'is_ebook': numpy.bool_
+}
+STRING_FIELDS = ('title', 'publisher', 'country', 'language', 'description', 'link')
+BOOK_FIELDS = ('book_id', 'title', 'is_ebook', 'authors', 'publisher', 'publication_year', 'country', 'language',
+               'num_pages', 'genres', 'average_rating', 'ratings_count', 'description', 'similar_books', 'link')
+# The number of book ids converted to ints at a time when iterating over a store.
+ITER_CHUNK = 4096
+
+
+class BookStore(Mapping):
+    """A columnar repository of books that maps each book id to a lightweight Book view.
+
+    Every column is a numpy array stored in self.arrays under a dotted name, so that the
+    whole store can be written to and read from disk one array at a time:
+
+        - book_id, num_pages, publication_year, average_rating, ratings_count, is_ebook:
+          one entry per book, in insertion order
+        - sorted_rows: the rows of the store sorted by book id, used for id lookups
+        - <field>.codes, <field>.offsets, <field>.data: the string field <field>, where
+          codes[row] indexes a distinct value whose utf-8 bytes are
+          data[offsets[code]:offsets[code + 1]]
+        - authors.offsets, authors.ids, authors.names.*: the authors of book row are
+          authors.ids[authors.offsets[row]:authors.offsets[row + 1]], and the name of each
+          of those authors is the string entry with the same index in authors.names
+        - genres: the genre mask of each book, as defined in genre.py
+        - similar_books.offsets, similar_books.ids: the similar books of each book
+
+    Instance Attributes:
+        - arrays: a mapping from column name to the numpy array holding that column
+
+    Representation Invariants:
+        - all(len(self.arrays[field]) == len(self.arrays['book_id']) for field in NUMERIC_FIELDS)
+    """
+    arrays: dict[str, numpy.ndarray]
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the store with the given columns."""
+        self.arrays = arrays
+
+    @classmethod
+    def from_books(cls, books: Iterable[Book]) -> BookStore:
+        """Return a store containing every book in books, in the same order."""
+        books = list(books)
+        return cls.from_columns({field: [getattr(book, field) for book in books] for field in BOOK_FIELDS})
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Sequence]) -> BookStore:
+        """Return a store built from whole columns of book data.
+
+        columns maps every attribute name in BOOK_FIELDS to the values of that attribute
+        for every book, in the same order, with the same types as the attributes of Book.
+        """
+        arrays = {'book_id': numpy.asarray(columns['book_id'], dtype=numpy.int64)}
+        for field, dtype in NUMERIC_FIELDS.items():
+            arrays[field] = numpy.asarray(columns[field], dtype=dtype)
+        for field in STRING_FIELDS:
+            arrays.update(_encode_strings(field, columns[field]))
+
+        authors = columns['authors']
+        arrays['authors.offsets'] = _counts_to_offsets(len(entry) for entry in authors)
+        arrays['authors.ids'] = numpy.fromiter(chain.from_iterable(authors), dtype=numpy.int64)
+        arrays.update(_encode_strings('authors.names', chain.from_iterable(entry.values() for entry in authors)))
+
+        arrays['genres'] = numpy.fromiter((genres_to_mask(genres) for genres in columns['genres']),
+                                          dtype=numpy.uint64, count=len(columns['genres']))
+
+        similar_books = columns['similar_books']
+        arrays['similar_books.offsets'] = _counts_to_offsets(len(entry) for entry in similar_books)
+        arrays['similar_books.ids'] = numpy.fromiter(chain.from_iterable(similar_books), dtype=numpy.int64)
+
+        arrays['sorted_rows'] = numpy.argsort(arrays['book_id'], kind='stable')
+        return cls(arrays)
+
+    def __len__(self) -> int:
+        """Return the number of books in this store."""
+        return len(self.arrays['book_id'])
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the book ids in this store, in insertion order.
+
+        The ids are converted to ints ITER_CHUNK at a time, so iterating never builds a list of
+        every id, and stopping early only converts the first chunk.
+        """
+        book_ids = self.arrays['book_id']
+        for start in range(0, len(book_ids), ITER_CHUNK):
+            yield from book_ids[start:start + ITER_CHUNK].tolist()
+
+    def __contains__(self, book_id: object) -> bool:
+        """Return whether a book with book_id is in this store."""
+        return isinstance(book_id, (int, numpy.integer)) and self.row(book_id) is not None
+
+    def __getitem__(self, book_id: int) -> BookView:
+        """Return a view of the book with the given book_id.
+
+        Raise KeyError if the book is not in this store.
+        """
+        row = self.row(book_id) if isinstance(book_id, (int, numpy.integer)) else None
+        if row is None:
+            raise KeyError(book_id)
+        return BookView(self, row)
+
+    def row(self, book_id: int) -> int | None:
+        """Return the row of the book with the given book_id, or None if it is not in this store."""
+        book_ids, sorted_rows = self.arrays['book_id'], self.arrays['sorted_rows']
+        i = int(numpy.searchsorted(book_ids, book_id, sorter=sorted_rows))
+        if i < len(sorted_rows) and book_ids[sorted_rows[i]] == book_id:
+            return int(sorted_rows[i])
+        return None
+
+    def rows(self, book_ids: Iterable[int]) -> numpy.ndarray:
+        """Return the rows of the books with the given book_ids.
+
+        Preconditions:
+            - all(book_id in self for book_id in book_ids)
+        """
+        book_ids = numpy.fromiter(book_ids, dtype=numpy.int64)
+        sorted_rows = self.arrays['sorted_rows']
+        return sorted_rows[numpy.searchsorted(self.arrays['book_id'], book_ids, sorter=sorted_rows)]
+
+    def string(self, field: str, i: int) -> str:
+        """Return entry i of the dictionary-encoded string column field."""
+        code = self.arrays[f'{field}.codes'][i]
+        offsets = self.arrays[f'{field}.offsets']
+        return self.arrays[f'{field}.data'][offsets[code]:offsets[code + 1]].tobytes().decode('utf-8')
+
+    def update_author_names(self, names: Mapping[int, str]) -> None:
+        """Replace the name of every author of every book whose id is in names with names[id],
+        by rebuilding the authors.names column.
+        """
+        ids = self.arrays['authors.ids'].tolist()
+        self.arrays.update(_encode_strings('authors.names', (
+            names[author_id] if author_id in names else self.string('authors.names', i)
+            for i, author_id in enumerate(ids))))
+
+    def span(self, field: str, row: int) -> range:
+        """Return the range of entries of book row in the flattened column field."""
+        offsets = self.arrays[f'{field}.offsets']
+        return range(int(offsets[row]), int(offsets[row + 1]))
+
+
+class BookView(Book):
+    """A read-only view of one book in a BookStore, with the same attributes as Book.
+
+    Every attribute is read from the store's columns when it is accessed, so creating
+    a view is cheap and holding one does not copy any book data.
+
+    Instance Attributes:
+        - store: the store containing this book
+        - row: the row of this book in store
+    """
+    __slots__ = ('store', 'row')
+    store: BookStore
+    row: int
+
+    def __init__(self, store: BookStore, row: int) -> None:
+        """Initialize a view of the given row of store."""
+        self.store = store
+        self.row = row
+
+    @property
+    def book_id(self) -> int:
+        """Return the id of this book."""
+        return int(self.store.arrays['book_id'][self.row])
+
+    @property
+    def title(self) -> str:
+        """Return the title of this book."""
+        return self.store.string('title', self.row)
+
+    @property
+    def is_ebook(self) -> bool:
+        """Return whether this book has an e-book version."""
+        return bool(self.store.arrays['is_ebook'][self.row])
+
+    @property
+    def authors(self) -> dict[int, str]:
+        """Return a mapping of author id to author name for the author(s) of this book."""
+        ids = self.store.arrays['authors.ids']
+        return {int(ids[i]): self.store.string('authors.names', i) for i in self.store.span('authors', self.row)}
+
+    @property
+    def publisher(self) -> str:
+        """Return the publisher of this book."""
+        return self.store.string('publisher', self.row)
+
+    @property
+    def publication_year(self) -> int:
+        """Return the publication year of this book."""
+        return int(self.store.arrays['publication_year'][self.row])
+
+    @property
+    def country(self) -> str:
+        """Return the country of origin of this book."""
+        return self.store.string('country', self.row)
+
+    @property
+    def language(self) -> str:
+        """Return the language in which this book is written."""
+        return self.store.string('language', self.row)
+
+    @property
+    def num_pages(self) -> int:
+        """Return the number of pages of this book."""
+        return int(self.store.arrays['num_pages'][self.row])
+
+    @property
+    def genres(self) -> set[str]:
+        """Return the genres of this book."""
+        return mask_to_genres(int(self.store.arrays['genres'][self.row]))
+
+    @property
+    def average_rating(self) -> float:
+        """Return the average of this book's ratings."""
+        return float(self.store.arrays['average_rating'][self.row])
+
+    @property
+    def ratings_count(self) -> int:
+        """Return the number of this book's ratings."""
+        return int(self.store.arrays['ratings_count'][self.row])
+
+    @property
+    def description(self) -> str:
+        """Return the description of this book."""
+        return self.store.string('description', self.row)
+
+    @property
+    def similar_books(self) -> set[int]:
+        """Return the ids of the books similar to this book."""
+        span = self.store.span('similar_books', self.row)
+        return set(self.store.arrays['similar_books.ids'][span.start:span.stop].tolist())
+
+    @property
+    def link(self) -> str:
+        """Return the Goodreads url of this book."""
+        return self.store.string('link', self.row)
+
+
+def decode_strings(offsets: numpy.ndarray, data: numpy.ndarray) -> list[str]:
+    """Return the strings whose utf-8 bytes are data[offsets[i]:offsets[i + 1]], in order,
+    e.g. the dictionary of a dictionary-encoded string column.
+    """
+    blob, offsets = data.tobytes(), offsets.tolist()
+    return [blob[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+
+def _encode_strings(field: str, values: Iterable[str]) -> dict[str, numpy.ndarray]:
+    """Return the arrays of a dictionary-encoded string column named field holding values."""
+    index = {}
+    codes = numpy.fromiter((index.setdefault(value, len(index)) for value in values), dtype=numpy.int32)
+    encoded = [value.encode('utf-8') for value in index]
+
+    return {f'{field}.codes': codes,
+            f'{field}.offsets': _counts_to_offsets(len(value) for value in encoded),
+            f'{field}.data': numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8)}
+
+
+def _counts_to_offsets(counts: Iterable[int]) -> numpy.ndarray:
+    """Return the offsets of consecutive runs with the given lengths in a flattened column."""
+    counts = numpy.fromiter(counts, dtype=numpy.int64)
+    offsets = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+    numpy.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'collections.abc', 'itertools', 'numpy', 'book', 'genre'],
+        'disable': ['too-many-public-methods']
+    })
@@ -0,0 +1,394 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the command-line interface of our book
+recommendation system, for scripted and batch use without the GUI. Run
+it from the project directory with
+
+    python -m cli <command> [options]
+
+where <command> is one of lookup, search, recommend, similar, neighbours,
+lsh-recall, build-cache, serve, startup-check, generate and benchmark (run
+python -m cli <command> --help for details).
+Every command prints its answer as json.
+
+This module never imports the GUI, and every other module is only
+imported by the command that needs it, so that a command answers as soon
+as the library snapshot is read. The startup-check command measures the
+time from starting a new process to the answer of a lookup and fails if
+it is over a given budget or if the GUI toolkit was imported.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from typing import Any
+import argparse
+import json
+import sys
+
+
+STARTUP_BUDGET = 2.0
+SEARCH_RESULTS = 10
+# Modules that are never imported by a lookup.
+HEAVY_MODULES = ('PyQt6', 'pandas')
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command given by the command-line arguments argv (sys.argv[1:] if argv is None)
+    and return its exit status.
+    """
+    args = _parser().parse_args(argv)
+    return args.command(args)
+
+
+def _parser() -> argparse.ArgumentParser:
+    """Return the parser of the command-line arguments."""
+    parser = argparse.ArgumentParser(prog='python -m cli', description='Book recommendation system.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes used if the library has to be built (default: all cores)')
+    commands = parser.add_subparsers(required=True, metavar='command')
+
+    lookup = commands.add_parser('lookup', help='print the book with the given ID')
+    lookup.add_argument('book_id', type=int)
+    lookup.set_defaults(command=_lookup)
+
+    search = commands.add_parser('search', help='print the books whose title and description best match the query')
+    search.add_argument('query')
+    search.add_argument('-k', type=int, default=SEARCH_RESULTS, help='number of books to print')
+    search.set_defaults(command=_search)
+
+    recommend = commands.add_parser('recommend', help='print the books recommended for the given preferences')
+    recommend.add_argument('--min-pages', type=int, default=0)
+    recommend.add_argument('--max-pages', type=int, default=1000)
+    recommend.add_argument('--country', action='append', required=True, help='preferred country (repeatable)')
+    recommend.add_argument('--language', action='append', required=True, help='preferred language (repeatable)')
+    recommend.add_argument('--title')
+    recommend.add_argument('--author', type=int, help='author ID')
+    recommend.add_argument('--publisher')
+    recommend.add_argument('--year', type=int, help='publication year')
+    recommend.add_argument('--ebook', action='store_true', help='prefer books with an e-book version')
+    _add_genre_arguments(recommend)
+    recommend.set_defaults(command=_recommend)
+
+    similar = commands.add_parser('similar', help='print the books similar to the given saved books')
+    similar.add_argument('book_ids', type=int, nargs='*', help='IDs of saved books')
+    similar.add_argument('--profile', help='also use the books saved in this profile')
+    _add_genre_arguments(similar)
+    similar.set_defaults(command=_similar)
+
+    neighbours = commands.add_parser('neighbours', help='print the books with the most similar content to a book')
+    neighbours.add_argument('book_id', type=int)
+    neighbours.set_defaults(command=_neighbours)
+
+    lsh_recall = commands.add_parser('lsh-recall',
+                                     help='print the recall and latency of the content similarity LSH index')
+    lsh_recall.add_argument('--queries', type=int, default=200, help='number of random books queried')
+    lsh_recall.add_argument('-k', type=int, default=10, help='number of neighbours per query')
+    lsh_recall.set_defaults(command=_lsh_recall)
+
+    build_cache = commands.add_parser('build-cache', help='build the library snapshot if it is missing or stale')
+    build_cache.set_defaults(command=_build_cache)
+
+    serve = commands.add_parser('serve', help='serve recommendations over HTTP')
+    serve.add_argument('--host', default=None)
+    serve.add_argument('--port', type=int, default=None)
+    serve.add_argument('--processes', type=int, default=None, help='number of worker processes')
+    serve.set_defaults(command=_serve)
+
+    startup_check = commands.add_parser('startup-check',
+                                        help='time a lookup in a new process and fail if it is over budget')
+    startup_check.add_argument('--budget', type=float, default=STARTUP_BUDGET, help='budget in seconds')
+    startup_check.set_defaults(command=_startup_check)
+
+    generate = commands.add_parser('generate', help='write a synthetic catalogue of books and authors')
+    generate.add_argument('num_books', type=int)
+    generate.add_argument('--directory', default=None,
+                          help='directory the data files are written to (default: data/benchmark/generated)')
+    generate.add_argument('--seed', type=int, default=None)
+    generate.add_argument('--force', action='store_true', help='overwrite existing data files')
+    generate.set_defaults(command=_generate)
+
+    benchmark = commands.add_parser('benchmark',
+                                    help='time loading and querying the library on synthetic catalogues')
+    benchmark.add_argument('--sizes', type=int, nargs='+', default=None, help='numbers of books to measure')
+    benchmark.add_argument('--seed', type=int, default=None)
+    benchmark.add_argument('--trace', action='store_true', help='also trace the memory allocated in every stage')
+    benchmark.add_argument('--output', default=None, help='file the results are saved to')
+    benchmark.add_argument('--compare', help='file of earlier results to compare the new results with')
+    benchmark.set_defaults(command=_benchmark)
+
+    return parser
+
+
+def _add_genre_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments filtering the printed books by genre to the parser of a command."""
+    parser.add_argument('--genre', action='append', default=[], help='only print books of this genre (repeatable)')
+    parser.add_argument('--any-genre', action='append', default=[],
+                        help='only print books of at least one of these genres (repeatable)')
+    parser.add_argument('--exclude-genre', action='append', default=[],
+                        help='never print books of this genre (repeatable)')
+
+
+def _lookup(args: argparse.Namespace) -> int:
+    """Print the book with ID args.book_id."""
+    books = _load_books(args)
+    if args.book_id not in books:
+        return _fail(f'no book with id {args.book_id}')
+
+    _print(books[args.book_id].to_dict())
+    return 0
+
+
+def _search(args: argparse.Namespace) -> int:
+    """Print the args.k books whose title and description best match the words of args.query,
+    with their BM25 scores.
+    """
+    library = _load_library(args)
+    results = library.text_index.search(args.query, args.k)
+    books = _summaries(library.books, [book_id for book_id, _ in results])
+    for book, (_, score) in zip(books, results):
+        book['score'] = round(score, 6)
+
+    _print({'books': books})
+    return 0
+
+
+def _recommend(args: argparse.Namespace) -> int:
+    """Print the books recommended for the preferences in args, from the best to the worst rated."""
+    from recommendation_system import IndexedRecommendationSystem
+
+    library = _load_library(args)
+    books = library.books
+    rec_sys = IndexedRecommendationSystem(books)
+    rec_sys.initialize()
+    book_ids = rec_sys.recommend([(args.min_pages, args.max_pages), args.country, args.language, args.title,
+                                  args.author, args.publisher, args.year, True if args.ebook else None],
+                                 allowed=_allowed_genres(args, library))
+    book_ids = sorted(book_ids, key=lambda book_id: (-books[book_id].average_rating, -books[book_id].ratings_count))
+
+    _print({'books': _summaries(books, book_ids)})
+    return 0
+
+
+def _similar(args: argparse.Namespace) -> int:
+    """Print the books similar to the books with args.book_ids and the books saved in
+    args.profile, from the one sharing the most genres with the saved books to the one sharing
+    the least, and then from the best to the worst rated.
+    """
+    from recommendation_system import SimilarBookSystem
+
+    library = _load_library(args)
+    books = library.books
+    saved_ids = set(args.book_ids)
+    if args.profile is not None:
+        from profile_store import ProfileStore
+        profiles = ProfileStore(read_only=True)
+        saved_ids.update(profiles.saved_books(args.profile))
+        profiles.close()
+
+    sim_sys = SimilarBookSystem(books, library.similar_graph)
+    sim_sys.initialize()
+    saved_ids = {book_id for book_id in saved_ids if book_id in books}
+    allowed = _allowed_genres(args, library)
+    book_ids = [book_id for book_id in sim_sys.recommend(saved_ids)
+                if book_id in books and (allowed is None or book_id in allowed)]
+    shared = dict(zip(book_ids, library.genre_index.shared_genres(
+        book_ids, library.genre_index.combined_mask(saved_ids))))
+    book_ids.sort(key=lambda book_id: (-shared[book_id], -books[book_id].average_rating,
+                                       -books[book_id].ratings_count))
+
+    summaries = _summaries(books, book_ids)
+    for summary in summaries:
+        summary['shared_genres'] = shared[summary['book_id']]
+    _print({'books': summaries})
+    return 0
+
+
+def _neighbours(args: argparse.Namespace) -> int:
+    """Print the books with the most similar content to the book with ID args.book_id, read from
+    the neighbour table saved on disk, which is built first if it is missing or stale.
+    """
+    from content_similarity import load_neighbour_table
+    from main import AUTHOR_DATA_FILENAME, DATA_FILENAME
+
+    books = _load_books(args)
+    if args.book_id not in books:
+        return _fail(f'no book with id {args.book_id}')
+
+    table = load_neighbour_table(books, [DATA_FILENAME, AUTHOR_DATA_FILENAME])
+    neighbours = table.neighbours(args.book_id)
+    summaries = _summaries(books, [book_id for book_id, _ in neighbours])
+    for summary, (_, score) in zip(summaries, neighbours):
+        summary['similarity'] = round(score, 6)
+
+    _print({'books': summaries})
+    return 0
+
+
+def _lsh_recall(args: argparse.Namespace) -> int:
+    """Print the recall and latency of the content similarity LSH index for every number of
+    tables and probes it is measured with.
+    """
+    from content_similarity import ContentIndex, measure_recall
+
+    index = ContentIndex.from_books(_load_books(args))
+    _print({'books': len(index), 'bits': index.bits, 'k': args.k,
+            'results': measure_recall(index, args.k, args.queries)})
+    return 0
+
+
+def _build_cache(args: argparse.Namespace) -> int:
+    """Build the library snapshot if it is missing or stale, and print its number of books."""
+    _print({'books': len(_load_books(args))})
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    """Serve recommendations over HTTP until interrupted."""
+    import asyncio
+    import server
+
+    library = _load_library(args)
+    host = server.HOST if args.host is None else args.host
+    port = server.PORT if args.port is None else args.port
+    processes = server.SERVER_WORKERS if args.processes is None else args.processes
+    try:
+        asyncio.run(server.serve(library.books, host, port, processes, library.text_index,
+                                 library.similar_graph))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _startup_check(args: argparse.Namespace) -> int:
+    """Time a lookup run in a new process, print the result and fail if the lookup took longer
+    than args.budget seconds or imported one of HEAVY_MODULES.
+
+    The library snapshot is built first if necessary, so that only the startup is timed.
+    """
+    import subprocess
+    import time
+
+    books = _load_books(args)
+    if len(books) == 0:
+        return _fail('the library is empty')
+    book_id = next(iter(books))
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'cli', 'lookup', str(book_id)],
+                            capture_output=True, text=True, check=False)
+    seconds = time.perf_counter() - start
+
+    imported = {line.rsplit('|', 1)[-1].strip().split('.')[0] for line in result.stderr.splitlines()
+                if line.startswith('import time:')}
+    heavy = sorted(module for module in HEAVY_MODULES if module in imported)
+    passed = result.returncode == 0 and seconds <= args.budget and not heavy
+    _print({'seconds': round(seconds, 3), 'budget': args.budget, 'heavy_imports': heavy, 'passed': passed})
+    return 0 if passed else 1
+
+
+def _generate(args: argparse.Namespace) -> int:
+    """Write a synthetic catalogue of args.num_books books to args.directory and print its summary.
+
+    Fail without writing anything if the directory already has data files, unless args.force is set,
+    so that the real data files are never replaced by accident.
+    """
+    import os
+    from benchmark import BENCHMARK_DIRECTORY
+    from synthetic_data import AUTHORS_FILENAME, BOOKS_FILENAME, SEED, generate_catalogue
+
+    directory = os.path.join(BENCHMARK_DIRECTORY, 'generated') if args.directory is None else args.directory
+    existing = [filename for filename in (BOOKS_FILENAME, AUTHORS_FILENAME)
+                if os.path.exists(os.path.join(directory, filename))]
+    if existing and not args.force:
+        return _fail(f'{", ".join(existing)} already in {directory} (use --force to overwrite)')
+
+    _print({'directory': directory,
+            **generate_catalogue(args.num_books, directory, SEED if args.seed is None else args.seed)})
+    return 0
+
+
+def _benchmark(args: argparse.Namespace) -> int:
+    """Run the benchmark, save its results and print them, and if args.compare is given, also print
+    the change from the results in args.compare and fail if any stage has regressed.
+    """
+    import benchmark
+
+    results = benchmark.run_benchmark(benchmark.SIZES if args.sizes is None else tuple(args.sizes),
+                                      seed=benchmark.SEED if args.seed is None else args.seed,
+                                      workers=1 if args.workers is None else args.workers, trace=args.trace)
+    benchmark.save_results(results, benchmark.RESULTS_FILENAME if args.output is None else args.output)
+    if args.compare is None:
+        _print(results)
+        return 0
+
+    changes = benchmark.compare_results(benchmark.load_results(args.compare), results)
+    _print({**results, 'changes': changes})
+    return 1 if any(change['regressed'] for change in changes) else 0
+
+
+def _allowed_genres(args: argparse.Namespace, library: Any) -> set[int] | None:
+    """Return the IDs of the books of library that pass the genre filters in args, or None if
+    args has no genre filter.
+    """
+    if not (args.genre or args.any_genre or args.exclude_genre):
+        return None
+    return library.genre_index.books_with_genres(args.genre, args.any_genre, args.exclude_genre)
+
+
+def _load_books(args: argparse.Namespace) -> Any:
+    """Return the books of the library, built and saved as a snapshot first if necessary."""
+    return _load_library(args).books
+
+
+def _load_library(args: argparse.Namespace) -> Any:
+    """Return the library, built and saved as a snapshot first if necessary."""
+    import os
+    from main import load_library
+
+    workers = args.workers if args.workers is not None else (os.cpu_count() or 1)
+    return load_library(workers)
+
+
+def _summaries(books: Any, book_ids: list[int]) -> list[dict[str, Any]]:
+    """Return the ID and title of every book with one of book_ids, in the same order."""
+    return [{'book_id': book_id, 'title': books[book_id].title} for book_id in book_ids]
+
+
+def _print(payload: dict[str, Any]) -> None:
+    """Print payload as json."""
+    print(json.dumps(payload, indent=2))
+
+
+def _fail(message: str) -> int:
+    """Print message as a json error and return a failing exit status."""
+    _print({'error': message})
+    return 1
+
+
+if __name__ == '__main__':
+    if '--python-ta' in sys.argv:
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 120,
+            'extra-imports': ['__future__', 'typing', 'argparse', 'json', 'sys', 'os', 'subprocess', 'time', 'asyncio',
+                              'main', 'recommendation_system', 'profile_store', 'content_similarity', 'server',
+                              'benchmark', 'synthetic_data'],
+            'disable': ['forbidden-IO-function', 'import-outside-toplevel']
+        })
+        sys.exit(0)
+
+    sys.exit(main())
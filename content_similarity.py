@@ -0,0 +1,390 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module finds books with similar content, for the many books that
+have few or no similar books listed in the dataset. Every book is turned
+into a sparse TF-IDF vector of the words of its description, its genres
+and its authors, which is reduced to a short dense vector by a sparse
+random projection. Nearest neighbours by cosine similarity are then
+found with a locality-sensitive hashing (LSH) index: every table hashes
+a vector to the signs of its dot products with random hyperplanes, and
+only the books sharing a bucket with the query in at least one table are
+compared with it. Using more tables finds more of the true neighbours at
+the cost of comparing more books; measure_recall reports this trade-off.
+
+The nearest neighbours of every book can be computed once and saved to
+disk as a NeighbourTable, so that looking them up is a table lookup.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from typing import Any
+import time
+import numpy
+from book import Book
+from snapshot import load_snapshot, save_snapshot
+from text_search import tokenize
+
+
+CONTENT_DIRECTORY = 'data/content_neighbours'
+DIMENSIONS = 128
+# Each feature is projected onto this many random dimensions, with random signs.
+NONZEROS_PER_FEATURE = 4
+NUM_TABLES = 16
+# Unless given, the number of hyperplanes per table is chosen so that a bucket holds about
+# BUCKET_SIZE books on average.
+BUCKET_SIZE = 32
+MAX_BITS = 24
+# The number of extra buckets probed per table, whose codes differ from the query's in one of
+# its least certain bits.
+PROBES = 2
+NUM_NEIGHBOURS = 10
+# The weight of each group of features in the vector of a book, after normalizing each group.
+FIELD_WEIGHTS = {'description': 1.0, 'genre': 0.7, 'author': 0.5}
+PROJECTION_CHUNK = 1 << 14
+SEED = 111
+
+
+class ContentIndex:
+    """An LSH index of the projected TF-IDF vectors of books.
+
+    Instance Attributes:
+        - book_ids: the ID of the book in every row of the index
+        - sorted_rows: the rows of the index sorted by book ID, used for ID lookups
+        - vectors: the unit-length projected vector of every row, or a zero vector for a book
+          without any feature
+        - bits: the number of hyperplanes of every table
+        - planes: the random hyperplanes of every table, one column per hyperplane, grouped by table
+        - sorted_codes: for every table, the hash codes of the rows in increasing order
+        - bucket_rows: for every table, the rows in the same order as sorted_codes
+
+    Representation Invariants:
+        - self.vectors.shape[0] == len(self.book_ids)
+        - self.sorted_codes.shape == self.bucket_rows.shape
+    """
+    book_ids: numpy.ndarray
+    sorted_rows: numpy.ndarray
+    vectors: numpy.ndarray
+    bits: int
+    planes: numpy.ndarray
+    sorted_codes: numpy.ndarray
+    bucket_rows: numpy.ndarray
+
+    def __init__(self, book_ids: numpy.ndarray, vectors: numpy.ndarray, num_tables: int = NUM_TABLES,
+                 bits: int | None = None, seed: int = SEED) -> None:
+        """Initialize the index of the books with book_ids and the given projected vectors, with
+        num_tables hash tables of bits random hyperplanes each drawn with the given seed.
+
+        If bits is None, it is chosen so that a bucket holds about BUCKET_SIZE books on average.
+
+        Preconditions:
+            - num_tables >= 1
+            - bits is None or 1 <= bits <= 62
+        """
+        if bits is None:
+            bits = min(MAX_BITS, max(1, round(numpy.log2(max(len(book_ids), 1) / BUCKET_SIZE))))
+        self.book_ids = numpy.asarray(book_ids, dtype=numpy.int64)
+        self.sorted_rows = numpy.argsort(self.book_ids, kind='stable')
+        self.vectors = vectors
+        self.bits = bits
+        self.planes = numpy.random.default_rng(seed).standard_normal(
+            (vectors.shape[1], num_tables * bits)).astype(numpy.float32)
+
+        codes = numpy.concatenate([self._codes(vectors[first:first + PROJECTION_CHUNK])
+                                   for first in range(0, max(len(vectors), 1), PROJECTION_CHUNK)], axis=1)
+        self.bucket_rows = numpy.argsort(codes, axis=1, kind='stable')
+        self.sorted_codes = numpy.take_along_axis(codes, self.bucket_rows, axis=1)
+
+    @classmethod
+    def from_books(cls, books: dict[int, Book], dimensions: int = DIMENSIONS, num_tables: int = NUM_TABLES,
+                   bits: int | None = None, seed: int = SEED) -> ContentIndex:
+        """Return the index of the content vectors of books, projected onto the given number of
+        dimensions, with num_tables hash tables of bits hyperplanes each (chosen from the number
+        of books if bits is None).
+        """
+        book_ids, indptr, features, weights, num_features = tfidf_features(books)
+        vectors = project(indptr, features, weights, num_features, dimensions, seed)
+        return cls(book_ids, vectors, num_tables, bits, seed)
+
+    def __len__(self) -> int:
+        """Return the number of books in this index."""
+        return len(self.book_ids)
+
+    def row(self, book_id: int) -> int | None:
+        """Return the row of the book with book_id, or None if it is not in this index."""
+        i = int(numpy.searchsorted(self.book_ids, book_id, sorter=self.sorted_rows))
+        if i < len(self.sorted_rows) and self.book_ids[self.sorted_rows[i]] == book_id:
+            return int(self.sorted_rows[i])
+        return None
+
+    def neighbours(self, book_id: int, k: int = NUM_NEIGHBOURS, num_tables: int | None = None,
+                   probes: int = PROBES) -> list[tuple[int, float]]:
+        """Return the IDs and cosine similarities of the k books most similar to the book with
+        book_id among those found in the buckets probed in the first num_tables tables (all
+        tables if num_tables is None), from the most to the least similar.
+
+        Books without any feature in common with the book are never returned.
+
+        Preconditions:
+            - book_id is in this index
+        """
+        row = self.row(book_id)
+        rows, scores = self.query(self.vectors[row], k, num_tables, probes, exclude=row)
+        return list(zip(self.book_ids[rows].tolist(), scores.tolist()))
+
+    def query(self, vector: numpy.ndarray, k: int, num_tables: int | None = None, probes: int = PROBES,
+              exclude: int | None = None) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the rows and cosine similarities of the k rows most similar to vector, excluding
+        the row exclude, from the most to the least similar (ties in increasing row order).
+
+        Only the rows in the bucket of vector and in the probes buckets whose codes differ from it
+        in one of its least certain bits (those of the hyperplanes closest to vector) are compared
+        with vector, in each of the first num_tables tables.
+        """
+        num_tables = len(self.sorted_codes) if num_tables is None else num_tables
+        projections = (vector @ self.planes).reshape(-1, self.bits)[:num_tables]
+        powers = numpy.left_shift(numpy.int64(1), numpy.arange(self.bits, dtype=numpy.int64))
+        codes = ((projections > 0) * powers).sum(axis=1)
+        flips = powers[numpy.argsort(numpy.abs(projections), axis=1)[:, :probes]]
+        probe_codes = numpy.concatenate([codes[:, None], codes[:, None] ^ flips], axis=1)
+
+        candidates = []
+        for table in range(num_tables):
+            starts = numpy.searchsorted(self.sorted_codes[table], probe_codes[table], side='left')
+            ends = numpy.searchsorted(self.sorted_codes[table], probe_codes[table], side='right')
+            candidates.extend(self.bucket_rows[table, start:end] for start, end in zip(starts, ends))
+
+        return self._best(numpy.unique(numpy.concatenate(candidates)), vector, k, exclude)
+
+    def exact_query(self, vector: numpy.ndarray, k: int,
+                    exclude: int | None = None) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the same as query, but comparing vector with every row instead of only with the
+        rows sharing a bucket with it.
+        """
+        return self._best(numpy.arange(len(self.book_ids)), vector, k, exclude)
+
+    def neighbour_table(self, k: int = NUM_NEIGHBOURS) -> NeighbourTable:
+        """Return the table of the k most similar books of every book in this index, found with
+        every table of the index.
+        """
+        neighbours = numpy.full((len(self.book_ids), k), -1, dtype=numpy.int64)
+        scores = numpy.zeros((len(self.book_ids), k), dtype=numpy.float32)
+        for row in range(len(self.book_ids)):
+            rows, row_scores = self.query(self.vectors[row], k, exclude=row)
+            neighbours[row, :len(rows)] = self.book_ids[rows]
+            scores[row, :len(rows)] = row_scores
+
+        return NeighbourTable({'book_ids': self.book_ids, 'sorted_rows': self.sorted_rows,
+                               'neighbours': neighbours, 'scores': scores})
+
+    def _best(self, rows: numpy.ndarray, vector: numpy.ndarray, k: int,
+              exclude: int | None) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the k rows among rows most similar to vector, excluding the row exclude and the
+        rows with no similarity, and their similarities, from the most to the least similar.
+        """
+        scores = self.vectors[rows] @ vector
+        keep = scores > 0
+        if exclude is not None:
+            keep &= rows != exclude
+        rows, scores = rows[keep], scores[keep]
+
+        if len(rows) > k:
+            top = numpy.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = numpy.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def _codes(self, vectors: numpy.ndarray) -> numpy.ndarray:
+        """Return the hash code of every vector in every table, as an array with one row per table."""
+        signs = (vectors @ self.planes > 0).reshape(len(vectors), self.planes.shape[1] // self.bits, self.bits)
+        powers = numpy.left_shift(numpy.int64(1), numpy.arange(self.bits, dtype=numpy.int64))
+        return (signs * powers).sum(axis=2).T.astype(numpy.int64)
+
+
+class NeighbourTable:
+    """The precomputed most similar books of every book, saved to and read from disk.
+
+    The table is kept in the arrays book_ids, sorted_rows (the rows sorted by book ID),
+    neighbours and scores, where row i of neighbours holds the IDs of the most similar books
+    of the book with ID book_ids[i], padded with -1, and row i of scores their similarities.
+
+    Instance Attributes:
+        - arrays: a mapping from array name to the numpy array holding it
+    """
+    arrays: dict[str, numpy.ndarray]
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the table from its arrays, named as described above."""
+        self.arrays = arrays
+
+    def neighbours(self, book_id: int) -> list[tuple[int, float]]:
+        """Return the IDs and similarities of the most similar books of the book with book_id,
+        from the most to the least similar, or an empty list if the book is not in this table.
+        """
+        book_ids, sorted_rows = self.arrays['book_ids'], self.arrays['sorted_rows']
+        i = int(numpy.searchsorted(book_ids, book_id, sorter=sorted_rows))
+        if i == len(sorted_rows) or book_ids[sorted_rows[i]] != book_id:
+            return []
+
+        row = sorted_rows[i]
+        neighbours = self.arrays['neighbours'][row]
+        found = neighbours >= 0
+        return list(zip(neighbours[found].tolist(), self.arrays['scores'][row][found].tolist()))
+
+    def save(self, directory: str, sources: list[str]) -> None:
+        """Save this table in directory, as a snapshot of the given source files."""
+        save_snapshot(directory, self.arrays, sources)
+
+
+def load_neighbour_table(books: dict[int, Book], sources: list[str], directory: str = CONTENT_DIRECTORY,
+                         k: int = NUM_NEIGHBOURS) -> NeighbourTable:
+    """Return the neighbour table saved in directory if it is up to date with the source files
+    and has k neighbours per book, and otherwise build the table of books and save it there.
+    """
+    arrays = load_snapshot(directory, sources)
+    if arrays is not None and arrays['neighbours'].shape[1] == k:
+        return NeighbourTable(arrays)
+
+    table = ContentIndex.from_books(books).neighbour_table(k)
+    table.save(directory, sources)
+    return table
+
+
+def tfidf_features(books: dict[int, Book]) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray,
+                                                    numpy.ndarray, int]:
+    """Return the TF-IDF vectors of books as the arrays book_ids, indptr, features and weights and
+    the number of distinct features, where the book with ID book_ids[i] has the features
+    features[indptr[i]:indptr[i + 1]] with the corresponding weights.
+
+    The features are the words of the description, weighted by 1 + log(count), and the genres
+    and authors of the book. Every feature weight is multiplied by log(n / (1 + book count)) + 1,
+    the features of each group in FIELD_WEIGHTS are scaled to that group's weight, and every
+    vector has unit length.
+    """
+    vocabulary = {}
+    tokenized = {}
+    book_ids, lengths, rows_features, rows_weights, rows_groups = [], [], [], [], []
+    for book_id in books:
+        book = books[book_id]
+        if book.description not in tokenized:
+            words = numpy.array([vocabulary.setdefault(word, len(vocabulary)) for word in tokenize(book.description)],
+                                dtype=numpy.int64)
+            tokenized[book.description] = numpy.unique(words, return_counts=True)
+        words, counts = tokenized[book.description]
+        genres = [vocabulary.setdefault(f'genre:{genre}', len(vocabulary)) for genre in sorted(book.genres)]
+        authors = [vocabulary.setdefault(f'author:{author_id}', len(vocabulary)) for author_id in book.authors]
+
+        book_ids.append(book_id)
+        lengths.append(len(words) + len(genres) + len(authors))
+        rows_features.extend((words, genres, authors))
+        rows_weights.extend((1 + numpy.log(counts), numpy.ones(len(genres)), numpy.ones(len(authors))))
+        rows_groups.extend((numpy.zeros(len(words), dtype=numpy.int64), numpy.ones(len(genres), dtype=numpy.int64),
+                            numpy.full(len(authors), 2, dtype=numpy.int64)))
+
+    indptr = numpy.zeros(len(book_ids) + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.array(lengths, dtype=numpy.int64), out=indptr[1:])
+    if not book_ids:
+        return (numpy.zeros(0, dtype=numpy.int64), indptr, numpy.zeros(0, dtype=numpy.int64),
+                numpy.zeros(0), 0)
+    features = numpy.concatenate(rows_features).astype(numpy.int64)
+    weights = numpy.concatenate(rows_weights).astype(numpy.float64)
+    groups = numpy.concatenate(rows_groups)
+
+    doc_freqs = numpy.bincount(features, minlength=len(vocabulary))
+    weights *= numpy.log(len(book_ids) / (1 + doc_freqs[features])) + 1
+
+    rows = numpy.repeat(numpy.arange(len(book_ids)), numpy.diff(indptr))
+    for group, field_weight in enumerate(FIELD_WEIGHTS.values()):
+        in_group = groups == group
+        norms = numpy.sqrt(numpy.bincount(rows[in_group], weights=weights[in_group] ** 2, minlength=len(book_ids)))
+        weights[in_group] *= field_weight / numpy.maximum(norms[rows[in_group]], 1e-12)
+
+    norms = numpy.sqrt(numpy.bincount(rows, weights=weights ** 2, minlength=len(book_ids)))
+    weights /= numpy.maximum(norms[rows], 1e-12)
+    return numpy.array(book_ids, dtype=numpy.int64), indptr, features, weights, len(vocabulary)
+
+
+def project(indptr: numpy.ndarray, features: numpy.ndarray, weights: numpy.ndarray, num_features: int,
+            dimensions: int = DIMENSIONS, seed: int = SEED) -> numpy.ndarray:
+    """Return the unit-length random projections onto the given number of dimensions of the sparse
+    vectors given by indptr, features and weights, as returned by tfidf_features.
+
+    Every feature is mapped to NONZEROS_PER_FEATURE random dimensions with random signs, so the
+    projection never builds a dense matrix with one row per feature. Rows are projected
+    PROJECTION_CHUNK at a time to bound the memory used.
+    """
+    rng = numpy.random.default_rng(seed)
+    feature_dims = rng.integers(0, dimensions, size=(num_features, NONZEROS_PER_FEATURE))
+    feature_signs = rng.choice(numpy.array([-1.0, 1.0]), size=(num_features, NONZEROS_PER_FEATURE))
+
+    num_rows = len(indptr) - 1
+    vectors = numpy.zeros((num_rows, dimensions), dtype=numpy.float32)
+    for first in range(0, num_rows, PROJECTION_CHUNK):
+        last = min(first + PROJECTION_CHUNK, num_rows)
+        span = slice(indptr[first], indptr[last])
+        rows = numpy.repeat(numpy.arange(last - first), numpy.diff(indptr[first:last + 1]))
+        cells = (rows[:, None] * dimensions + feature_dims[features[span]]).reshape(-1)
+        values = (weights[span, None] * feature_signs[features[span]]).reshape(-1)
+        vectors[first:last] = numpy.bincount(cells, weights=values,
+                                             minlength=(last - first) * dimensions).reshape(-1, dimensions)
+
+    norms = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / numpy.maximum(norms, 1e-12)
+
+
+def measure_recall(index: ContentIndex, k: int = NUM_NEIGHBOURS, num_queries: int = 200,
+                   probes: tuple[int, ...] = (0, PROBES), seed: int = SEED) -> list[dict[str, Any]]:
+    """Return the recall, latency and number of compared books of the k nearest neighbours found
+    by index for num_queries random books, with every number of probes in probes and 1, 2, 4, ...
+    up to all of its tables, followed by the same for an exact search.
+
+    The recall is the fraction of the exact k nearest neighbours (by projected cosine similarity)
+    that are found, averaged over the queries.
+    """
+    rng = numpy.random.default_rng(seed)
+    queries = rng.choice(len(index), size=min(num_queries, len(index)), replace=False)
+
+    start = time.perf_counter()
+    exact = [set(index.exact_query(index.vectors[row], k, exclude=row)[0].tolist()) for row in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+    table_counts = sorted({min(1 << i, len(index.sorted_codes)) for i in range(len(index.sorted_codes).bit_length())})
+    results = []
+    for num_probes in probes:
+        for num_tables in table_counts:
+            start = time.perf_counter()
+            found = [index.query(index.vectors[row], k, num_tables, num_probes, exclude=row)[0] for row in queries]
+            ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+            recalls = [len(expected.intersection(rows.tolist())) / len(expected)
+                       for expected, rows in zip(exact, found) if expected]
+            # every book with a positive similarity that was compared is returned when k is len(index)
+            compared = [len(index.query(index.vectors[row], len(index), num_tables, num_probes, exclude=row)[0])
+                        for row in queries]
+            results.append({'tables': num_tables, 'probes': num_probes,
+                            'recall': round(float(numpy.mean(recalls)) if recalls else 1.0, 4),
+                            'ms_per_query': round(ms, 4), 'compared': round(float(numpy.mean(compared)), 1)})
+
+    results.append({'tables': 'exact', 'probes': 0, 'recall': 1.0, 'ms_per_query': round(exact_ms, 4),
+                    'compared': len(index)})
+    return results
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'typing', 'time', 'numpy', 'book', 'snapshot', 'text_search']
+    })
@@ -0,0 +1,180 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a customized class called FacetIndex that is used
+to keep the distinct values of the book attributes the user can choose
+from (the facets), together with the number of books having each value.
+The index is built once alongside the library, in a single pass over the
+books (or straight from the dictionary-encoded columns of a BookStore),
+and is saved in the library snapshot, so the GUI can list and rank the
+options without scanning the catalogue again.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections import Counter
+from collections.abc import Iterable
+import numpy
+from book import Book
+from book_store import BookStore, decode_strings
+
+
+FACETS = ('country', 'language', 'title', 'author', 'publisher', 'publication_year')
+# The facets stored as dictionary-encoded string columns in a BookStore.
+STRING_FACETS = ('country', 'language', 'title', 'publisher')
+ARRAY_PREFIX = 'facets.'
+
+
+class FacetIndex:
+    """The distinct values of every facet of a library and the number of books with each value.
+
+    The values of a facet are kept from the most to the least common, with ties in
+    alphabetical order, in three arrays stored in self.arrays under the names
+    facets.<facet>.data, facets.<facet>.offsets and facets.<facet>.counts: value i has the
+    utf-8 bytes data[offsets[i]:offsets[i + 1]] and counts[i] books. An author is written as
+    '<name> (ID <author id>)' and a publication year as a decimal string, as in the GUI.
+
+    Instance Attributes:
+        - arrays: a mapping from array name to the numpy array holding it
+        - decoded: the values of every facet that has been read so far, in the same order
+        - positions: a mapping from every value to its position, for every facet that has been
+          searched so far
+
+    Representation Invariants:
+        - all(f'{ARRAY_PREFIX}{facet}.counts' in self.arrays for facet in FACETS)
+    """
+    arrays: dict[str, numpy.ndarray]
+    decoded: dict[str, list[str]]
+    positions: dict[str, dict[str, int]]
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the index from its arrays, named as described above."""
+        self.arrays = arrays
+        self.decoded = {}
+        self.positions = {}
+
+    @classmethod
+    def from_books(cls, books: dict[int, Book]) -> FacetIndex:
+        """Return the facet index of books."""
+        if isinstance(books, BookStore):
+            return cls._from_columns(books.arrays)
+
+        counters = {facet: Counter() for facet in FACETS}
+        for book_id in books:
+            book = books[book_id]
+            counters['country'][book.country] += 1
+            counters['language'][book.language] += 1
+            counters['title'][book.title] += 1
+            counters['publisher'][book.publisher] += 1
+            counters['publication_year'][str(book.publication_year)] += 1
+            counters['author'].update(f'{name} (ID {author_id})' for author_id, name in book.authors.items())
+
+        arrays = {}
+        for facet, counter in counters.items():
+            arrays.update(_encode_facet(facet, counter.keys(), counter.values()))
+        return cls(arrays)
+
+    @classmethod
+    def _from_columns(cls, columns: dict[str, numpy.ndarray]) -> FacetIndex:
+        """Return the facet index of the books with the given BookStore columns, counting the
+        dictionary codes of the string columns instead of decoding every book's values.
+        """
+        arrays = {}
+        for facet in STRING_FACETS:
+            values = decode_strings(columns[f'{facet}.offsets'], columns[f'{facet}.data'])
+            arrays.update(_encode_facet(facet, values, numpy.bincount(columns[f'{facet}.codes'],
+                                                                      minlength=len(values)).tolist()))
+
+        years, counts = numpy.unique(columns['publication_year'], return_counts=True)
+        arrays.update(_encode_facet('publication_year', (str(year) for year in years.tolist()), counts.tolist()))
+
+        author_ids, first, counts = numpy.unique(columns['authors.ids'], return_index=True, return_counts=True)
+        name_codes, offsets, data = (columns['authors.names.codes'], columns['authors.names.offsets'],
+                                     columns['authors.names.data'])
+        names = (data[offsets[code]:offsets[code + 1]].tobytes().decode('utf-8') for code in name_codes[first])
+        labels = (f'{name} (ID {author_id})' for name, author_id in zip(names, author_ids.tolist()))
+        arrays.update(_encode_facet('author', labels, counts.tolist()))
+
+        return cls(arrays)
+
+    @classmethod
+    def from_snapshot(cls, arrays: dict[str, numpy.ndarray]) -> FacetIndex:
+        """Return the facet index among the arrays of a library snapshot."""
+        return cls({name: array for name, array in arrays.items() if name.startswith(ARRAY_PREFIX)})
+
+    def options(self, facet: str, by_count: bool = True) -> list[str]:
+        """Return the distinct values of facet, from the most to the least common book value
+        (ties in alphabetical order) if by_count is True, and in alphabetical order otherwise.
+
+        Preconditions:
+            - facet in FACETS
+        """
+        if facet not in self.decoded:
+            self.decoded[facet] = decode_strings(self.arrays[f'{ARRAY_PREFIX}{facet}.offsets'],
+                                          self.arrays[f'{ARRAY_PREFIX}{facet}.data'])
+
+        return list(self.decoded[facet]) if by_count else sorted(self.decoded[facet])
+
+    def counts(self, facet: str) -> numpy.ndarray:
+        """Return the number of books with each value of facet, in the same order as
+        self.options(facet).
+
+        Preconditions:
+            - facet in FACETS
+        """
+        return self.arrays[f'{ARRAY_PREFIX}{facet}.counts']
+
+    def count(self, facet: str, value: str) -> int:
+        """Return the number of books whose facet is value.
+
+        Preconditions:
+            - facet in FACETS
+        """
+        position = self._positions(facet).get(value)
+        return 0 if position is None else int(self.counts(facet)[position])
+
+    def __contains__(self, item: tuple[str, str]) -> bool:
+        """Return whether item, a (facet, value) pair, is the facet of at least one book."""
+        facet, value = item
+        return value in self._positions(facet)
+
+    def _positions(self, facet: str) -> dict[str, int]:
+        """Return a mapping from every value of facet to its position in self.options(facet)."""
+        if facet not in self.positions:
+            self.positions[facet] = {value: i for i, value in enumerate(self.options(facet))}
+        return self.positions[facet]
+
+
+def _encode_facet(facet: str, values: Iterable[str], counts: Iterable[int]) -> dict[str, numpy.ndarray]:
+    """Return the arrays of facet with the given values and counts, ordered from the most to
+    the least common value and then alphabetically.
+    """
+    ranked = sorted(zip(counts, values), key=lambda pair: (-pair[0], pair[1]))
+    encoded = [value.encode('utf-8') for _, value in ranked]
+    offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.array([len(value) for value in encoded], dtype=numpy.int64), out=offsets[1:])
+
+    return {f'{ARRAY_PREFIX}{facet}.data': numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8),
+            f'{ARRAY_PREFIX}{facet}.offsets': offsets,
+            f'{ARRAY_PREFIX}{facet}.counts': numpy.array([count for count, _ in ranked], dtype=numpy.int64)}
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'collections', 'collections.abc', 'numpy', 'book', 'book_store']
+    })
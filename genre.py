@@ -5,7 +5,10 @@ Descriptions and Instructions
 This module contains the genre filter used to assign genre tags to
 each book in the library constructed in library.py. The resulting
 genre tags are used for the purpose of displaying as part of the
-book description in the graphical user interface (GUI).
+book description in the graphical user interface (GUI). Every kept
+genre is assigned a bit of a genre mask, so that the genres of a book
+can be stored as a single integer and genre queries over many books
+become bitwise operations.
 
 Copyright and Usage Information
 ===============================
@@ -23,25 +26,166 @@ Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 
 
+from __future__ import annotations
+from collections.abc import Iterable, Mapping
+import numpy
+from book import Book
+
+
+# The fixed genre vocabulary. The genre GENRES[i] is represented by bit i of a genre mask.
+GENRES = (
+    'romance', 'fiction', 'young adult', 'high school', 'realistic fiction', 'mythology',
+    'suspense', 'survival', 'time travel', 'action', 'coming of age', 'post apocalyptic',
+    'humor', 'supernatural', 'fantasy', 'science fiction', 'nonfiction', 'teen', 'childrens',
+    'historical fiction', 'mystery', 'short stories', 'horror', 'magic', 'gay', 'lesbian',
+    'paranormal', 'middle grade', 'contemporary', 'dystopia', 'thriller', 'lgbt', 'queer',
+    'adventure', 'classics'
+)
+GENRE_BITS = {genre: 1 << i for i, genre in enumerate(GENRES)}
+# The number of set bits in every possible byte, used to count the set bits of masks in bulk.
+_BYTE_POPCOUNTS = numpy.array([bin(byte).count('1') for byte in range(256)], dtype=numpy.uint8)
+
+
 def filter_genres(genres: set[str]) -> set[str]:
     """Filter given book genres by removing unwanted genres (making them much
     more specific than shelf names).
     """
+    return {genre for genre in genres if genre in GENRE_BITS}
+
+
+def genres_to_mask(genres: Iterable[str]) -> int:
+    """Return the genre mask of the given genres, ignoring those that are not in GENRES."""
+    mask = 0
+    for genre in genres:
+        mask |= GENRE_BITS.get(genre, 0)
+    return mask
+
+
+def mask_to_genres(mask: int) -> set[str]:
+    """Return the genres represented by the given genre mask."""
+    return {genre for genre, bit in GENRE_BITS.items() if mask & bit}
+
+
+def genre_overlap(mask1: int, mask2: int) -> int:
+    """Return the number of genres shared by the genre masks mask1 and mask2."""
+    return (mask1 & mask2).bit_count()
+
+
+class GenreIndex:
+    """An index of the genres of a collection of books, answering genre queries with bitwise
+    operations on the genre masks of the books.
+
+    Instance Attributes:
+        - book_ids: the ids of the indexed books
+        - masks: the genre mask of every indexed book, in the same order as book_ids
+        - postings: a mapping from each genre in GENRES queried so far to the positions in
+          book_ids of the books that have that genre, in ascending order, built on first use
+        - sorted_positions: the positions in book_ids sorted by book id, used to find books by id
+
+    Representation Invariants:
+        - len(self.book_ids) == len(self.masks) == len(self.sorted_positions)
+    """
+    book_ids: numpy.ndarray
+    masks: numpy.ndarray
+    postings: dict[str, numpy.ndarray]
+    sorted_positions: numpy.ndarray
+
+    def __init__(self, book_ids: numpy.ndarray, masks: numpy.ndarray,
+                 sorted_positions: numpy.ndarray | None = None) -> None:
+        """Initialize the index of the books with the given ids and genre masks, where
+        sorted_positions are the positions of the books sorted by id, computed here if None.
+        """
+        self.book_ids = numpy.asarray(book_ids, dtype=numpy.int64)
+        self.masks = numpy.asarray(masks, dtype=numpy.uint64)
+        self.postings = {}
+        if sorted_positions is None:
+            sorted_positions = numpy.argsort(self.book_ids, kind='stable')
+        self.sorted_positions = sorted_positions
+
+    @classmethod
+    def from_books(cls, books: Mapping[int, Book]) -> GenreIndex:
+        """Return the genre index of the given mapping from book id to book."""
+        from book_store import BookStore  # book_store imports this module
+        if isinstance(books, BookStore):
+            return cls(books.arrays['book_id'], books.arrays['genres'], books.arrays['sorted_rows'])
+
+        return cls(numpy.fromiter(books, dtype=numpy.int64, count=len(books)),
+                   numpy.fromiter((genres_to_mask(books[book_id].genres) for book_id in books),
+                                  dtype=numpy.uint64, count=len(books)))
+
+    def books_with_genres(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+                          none_of: Iterable[str] = ()) -> set[int]:
+        """Return the ids of the books that have every genre in all_of, at least one genre in
+        any_of (unless any_of is empty) and no genre in none_of.
+
+        Genres that are not in GENRES are never had by any book.
+        """
+        all_of, any_of = set(all_of), set(any_of)
+        if not all_of.issubset(GENRE_BITS) or (any_of and not any_of & GENRE_BITS.keys()):
+            return set()
+
+        if all_of:
+            positions = min((self.posting(genre) for genre in all_of), key=len)
+        else:
+            positions = numpy.arange(len(self.masks))
+        masks = self.masks[positions]
+
+        all_mask, any_mask, none_mask = (numpy.uint64(genres_to_mask(genres))
+                                         for genres in (all_of, any_of, none_of))
+        keep = (masks & all_mask) == all_mask
+        if any_of:
+            keep &= (masks & any_mask) != 0
+        keep &= (masks & none_mask) == 0
+
+        return set(self.book_ids[positions[keep]].tolist())
+
+    def posting(self, genre: str) -> numpy.ndarray:
+        """Return the positions in self.book_ids of the books that have genre, in ascending order.
+
+        Preconditions:
+            - genre in GENRE_BITS
+        """
+        if genre not in self.postings:
+            self.postings[genre] = numpy.flatnonzero(self.masks & numpy.uint64(GENRE_BITS[genre]))
+        return self.postings[genre]
+
+    def positions(self, book_ids: Iterable[int]) -> numpy.ndarray:
+        """Return the positions in self.book_ids of the books with the given ids.
+
+        Preconditions:
+            - all(book_id in self.book_ids for book_id in book_ids)
+        """
+        book_ids = numpy.fromiter(book_ids, dtype=numpy.int64)
+        return self.sorted_positions[numpy.searchsorted(self.book_ids, book_ids, sorter=self.sorted_positions)]
+
+    def combined_mask(self, book_ids: Iterable[int]) -> int:
+        """Return the genre mask of every genre of at least one of the books with the given ids.
+
+        Preconditions:
+            - all(book_id in self.book_ids for book_id in book_ids)
+        """
+        return int(numpy.bitwise_or.reduce(self.masks[self.positions(book_ids)], initial=numpy.uint64(0)))
+
+    def shared_genres(self, book_ids: Iterable[int], mask: int) -> list[int]:
+        """Return the number of genres each of the books with the given ids shares with the genre
+        mask mask, in the same order.
 
-    genres_to_keep = {
-        'romance', 'fiction', 'young adult', 'high school', 'realistic fiction', 'mythology',
-        'suspense', 'survival', 'time travel', 'action', 'coming of age', 'post apocalyptic',
-        'humor', 'supernatural', 'fantasy', 'science fiction', 'nonfiction', 'teen', 'childrens',
-        'historical fiction', 'mystery', 'short stories', 'horror', 'magic', 'gay', 'lesbian',
-        'paranormal', 'middle grade', 'contemporary', 'dystopia', 'thriller', 'lgbt', 'queer',
-        'adventure', 'classics'
-    }
+        Preconditions:
+            - all(book_id in self.book_ids for book_id in book_ids)
+        """
+        return self.overlaps(mask)[self.positions(book_ids)].tolist()
 
-    return {genre for genre in genres if genre in genres_to_keep}
+    def overlaps(self, mask: int) -> numpy.ndarray:
+        """Return the number of genres every indexed book shares with the genre mask mask, in
+        the same order as self.book_ids.
+        """
+        shared = self.masks & numpy.uint64(mask)
+        return _BYTE_POPCOUNTS[shared.view(numpy.uint8)].reshape(-1, 8).sum(axis=1)
 
 
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
-        'max-line-length': 120
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'collections.abc', 'numpy', 'book', 'book_store']
     })
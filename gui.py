@@ -21,18 +21,27 @@ Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 
 from typing import Any
-import sys
 
 from PyQt6.QtWidgets import *
 from PyQt6.QtGui import *
 from PyQt6.QtCore import *
 
+from autocomplete import NUM_COMPLETIONS, AutocompleteIndex, build_indexes
 from book import Book
-from recommendation_system import RecommendationSystem, SimilarBookSystem
+from facets import FacetIndex
+from profile_store import DEFAULT_PROFILE, ProfileStore
+from recommendation_system import RecommendationSystem, SimilarBookSession, SimilarBookSystem
+from text_search import TextIndex
 
 APP_TITLE = 'Book Recommendation System'
 W_HEIGHT = 600
 W_WIDTH = 800
+SEARCH_RESULTS = 20
+# The categories of book preferences chosen from a list; titles, authors and publishers are
+# completed from autocomplete indexes instead, as there are too many of them to list.
+CATEGORY_NAMES = ('country', 'language', 'publication year')
+# The facet of the facet index holding each category of book preferences.
+CATEGORY_FACETS = {'country': 'country', 'language': 'language', 'publication year': 'publication_year'}
 
 
 class Platform:
@@ -45,14 +54,18 @@ class Platform:
     app: QApplication
     window: QMainWindow
 
-    def __init__(self, books: dict[int, Book]) -> None:
-        """Initialize the platform with the GUI.
+    def __init__(self, books: dict[int, Book], profile: str = DEFAULT_PROFILE,
+                 facets: FacetIndex | None = None, text_index: TextIndex | None = None) -> None:
+        """Initialize the platform with the GUI, showing the saved books of the given profile.
+
+        facets and text_index are the facet and full-text indexes of books, which are built in
+        the background if they are None.
 
         Representation Invariants:
             - books != {}
         """
         self.app = QApplication([])
-        self.window = Window(books)
+        self.window = Window(books, profile, facets, text_index)
 
     def run(self) -> None:
         """Run the GUI."""
@@ -61,20 +74,113 @@ class Platform:
         self.app.exec()
 
 
+class EngineBuilder(QObject):
+    """Builds the recommendation systems and the preference categories of a window in a
+    background thread, so that the window can be shown while they are built.
+
+    Instance Attributes:
+        - books: the repository of all books
+        - facets: the facet index of books, or None if it has to be built
+        - text_index: the full-text index of books, or None if it has to be built
+        - progress: signal emitted with the percentage done and a description of the next step
+        - built: signal emitted with the facet index, categories, autocomplete indexes, full-text index,
+          recommendation system, similar book system and similar book session once they are all built
+    """
+    books: dict[int, Book]
+    facets: FacetIndex | None
+    text_index: TextIndex | None
+    progress = pyqtSignal(int, str)
+    built = pyqtSignal(object, object, object, object, object, object, object)
+
+    def __init__(self, books: dict[int, Book], facets: FacetIndex | None, text_index: TextIndex | None) -> None:
+        """Initialize the builder for the given books, facet index and full-text index."""
+        super().__init__(None)
+        self.books = books
+        self.facets = facets
+        self.text_index = text_index
+
+    def run(self) -> None:
+        """Build everything, reporting the progress along the way.
+
+        If an interruption of the thread is requested, e.g. because the window is closed, stop
+        after the current step and quit the thread without emitting built.
+        """
+        self.progress.emit(0, 'Collecting book categories...')
+        facets = FacetIndex.from_books(self.books) if self.facets is None else self.facets
+        categories = collect_categories(facets)
+
+        self.progress.emit(10, 'Indexing titles, authors and publishers...')
+        completions = build_indexes(self.books)
+        if self.interrupted():
+            return
+
+        self.progress.emit(20, 'Indexing book descriptions...')
+        text_index = TextIndex.from_books(self.books) if self.text_index is None else self.text_index
+        if self.interrupted():
+            return
+
+        self.progress.emit(35, 'Building the recommendation system...')
+        rec_sys = RecommendationSystem(self.books)
+        rec_sys.initialize()
+        if self.interrupted():
+            return
+
+        self.progress.emit(75, 'Building the similar book system...')
+        sim_sys = SimilarBookSystem(self.books)
+        sim_sys.initialize()
+
+        self.progress.emit(100, 'Ready.')
+        self.built.emit(facets, categories, completions, text_index, rec_sys, sim_sys, SimilarBookSession(sim_sys))
+
+    def interrupted(self) -> bool:
+        """Return whether an interruption of the thread running this builder was requested,
+        quitting the thread if so.
+        """
+        thread = QThread.currentThread()
+        if thread.isInterruptionRequested():
+            thread.quit()
+            return True
+        return False
+
+
+def collect_categories(facets: FacetIndex) -> dict[str, list[Any]]:
+    """Return what the user can choose from for each category of book preferences, from the
+    most to the least common option, except for languages, which are in alphabetical order.
+    """
+    return {name: facets.options(CATEGORY_FACETS[name], by_count=name != 'language') for name in CATEGORY_NAMES}
+
+
 class Window(QMainWindow):
     """Main window of the program GUI.
 
+    The recommendation systems are built in a background thread once the first page is shown.
+    Until they are ready, the progress is shown in the status bar, the preference lists are
+    empty, the button submitting the preferences is disabled and no similar books are shown.
+
     Instance Attributes:
         - data: book preferences that user enter
         - categories: what the user can choose from for each category of book preferences
+        - facets: the facet index of books, or None until it is built
+        - completions: the autocomplete index of every field in autocomplete.COMPLETION_FIELDS, or an
+          empty dictionary until they are built
+        - text_index: the full-text index of books, or None until it is built
         - current_book: the ID of the book the user is currently viewing
         - books: the repository of all books
         - saved_books: ids of books saved by the user
+        - profiles: the store of the saved books of every user profile
+        - profile: the name of the user profile whose saved books are shown
         - similar_books: similar books based on the user's book preferences and saved books
         - current_window: the window the user is currently viewing (for the book preferences section)
         - num_windows: the total number of windows (for the book preferences section)
         - rec_sys: book recommendation system
         - sim_sys: similar book recommendation system
+        - sim_session: the similar books of the saved books, updated as books are saved and unsaved
+        - engines_ready: whether the recommendation systems and categories have been built
+        - engine_thread: the background thread building the recommendation systems
+        - engine_builder: the object building the recommendation systems in engine_thread
+        - progress_bar: status bar widget showing the progress of building the recommendation systems
+        - similar_page: the page showing the saved and similar books, if it is the current page
+        - preferences_page: the book preferences section, if it is the current page
         - book_id_src: text box for user to enter desired book id
         - book_lst: list that displays recommended books, saved books, and similar books
         - book_txt: giant text box that displays the chosen book's detailed information
@@ -91,18 +197,32 @@ class Window(QMainWindow):
         - pub_year_src: text box for user to enter desired book publication year
         - ebook_rad: radio button to choose whether the user wants books that are available in ebook format
         - btn_exit: program exit button
+        - btn_continue: button moving to the next window of the book preferences section, which submits
+          the preferences on the last window
     """
     data: dict[str, Any]
     categories: dict[str, list[Any]]
+    facets: FacetIndex | None
+    completions: dict[str, AutocompleteIndex]
+    text_index: TextIndex | None
     current_book: int
     books: dict[int, Book]
     recommended_books: dict[int, Book]
     saved_books: set[int]
+    profiles: ProfileStore
+    profile: str
     similar_books: set[int]
     current_window: int
     num_windows: int
-    rec_sys: RecommendationSystem
-    sim_sys: SimilarBookSystem
+    rec_sys: RecommendationSystem | None
+    sim_sys: SimilarBookSystem | None
+    sim_session: SimilarBookSession | None
+    engines_ready: bool
+    engine_thread: QThread
+    engine_builder: EngineBuilder
+    progress_bar: QProgressBar
+    similar_page: QWidget | None
+    preferences_page: QWidget | None
     book_id_src: QLineEdit
     book_lst: QListWidget
     book_txt: QTextEdit
@@ -119,9 +239,14 @@ class Window(QMainWindow):
     pub_year_src: QLineEdit
     ebook_rad: QRadioButton
     btn_exit: QPushButton
+    btn_continue: QPushButton
+
+    def __init__(self, books: dict[int, Book], profile: str = DEFAULT_PROFILE,
+                 facets: FacetIndex | None = None, text_index: TextIndex | None = None) -> None:
+        """Initialize the main window of the GUI, showing the saved books of the given profile.
 
-    def __init__(self, books: dict[int, Book]) -> None:
-        """Initialize the main window of the GUI.
+        facets and text_index are the facet and full-text indexes of books, which are built in
+        the background if they are None.
 
         Representation Invariants:
             - books != {}
@@ -129,31 +254,41 @@ class Window(QMainWindow):
         super().__init__(None)
 
         self.data = {}
-        self.categories = {
-            'country': list({books[book].country for book in books}),
-            'language': sorted(list({books[book].language for book in books})),
-            'title': list({books[book].title for book in books}),
-            'author': list({f'{books[book].authors[author]} (ID {author})'
-                            for book in books for author in books[book].authors}),
-            'publisher': list({books[book].publisher for book in books}),
-            'publication year': list({str(books[book].publication_year) for book in books})
-        }
+        self.categories = {name: [] for name in CATEGORY_NAMES}
+        self.facets = None
+        self.completions = {}
+        self.text_index = None
         self.current_book = 0
         self.books = books
         self.recommended_books = {}
         self.similar_books = set()
         self.saved_books = set()
+        self.profiles = ProfileStore()
+        self.profile = profile
 
-        self.rec_sys = RecommendationSystem(books)
-        self.rec_sys.initialize()
-        self.sim_sys = SimilarBookSystem(books)
-        self.sim_sys.initialize()
+        self.rec_sys = None
+        self.sim_sys = None
+        self.sim_session = None
+        self.engines_ready = False
+        self.similar_page = None
+        self.preferences_page = None
 
         self.current_window = 0
         self.num_windows = 0
         self.setWindowTitle(APP_TITLE)
         self.setFixedSize(QSize(W_WIDTH, W_HEIGHT))
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFixedWidth(200)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.engine_thread = QThread(self)
+        self.engine_builder = EngineBuilder(books, facets, text_index)
+        self.engine_builder.moveToThread(self.engine_thread)
+        self.engine_thread.started.connect(self.engine_builder.run)
+        self.engine_builder.progress.connect(self.show_progress)
+        self.engine_builder.built.connect(self.engines_built)
+        self.engine_builder.built.connect(self.engine_thread.quit)
+
         dialog = QMessageBox()
         dialog.setText('Do you want to get book recommendations?')
         dialog.setIcon(QMessageBox.Icon.Question)
@@ -166,20 +301,23 @@ class Window(QMainWindow):
             self.recommendation_search()
         else:
             self.similar_books_search()
+        # started only once the first page exists, so that engines_built always has a page to update
+        self.engine_thread.start()
 
     def similar_books_search(self) -> None:
         """Allow the user to searchfor similar books based on their library."""
         widget = QWidget(self)
+        self.similar_page = widget
+        self.preferences_page = None
         page_layout = QGridLayout(widget)
         page_layout.setContentsMargins(70, 70, 70, 70)
 
         self.book_id_src = QLineEdit()
-        self.book_id_src.setPlaceholderText('Enter Book ID')
+        self.book_id_src.setPlaceholderText('Enter Book ID or Search Words')
         self.book_id_src.setFont(QFont('Arial', 20))
         self.book_id_src.setTextMargins(5, 5, 5, 5)
-        book_id_cpl = QCompleter([str(book) for book in self.books.keys()], self.book_id_src)
-        book_id_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.book_id_src.setCompleter(book_id_cpl)
+        if self.engines_ready:
+            self.attach_completer(self.book_id_src, self.completions['book_id'])
 
         self.book_lst = QListWidget(None)
         self.book_lst.setFont(QFont('Arial', 16))
@@ -246,7 +384,9 @@ class Window(QMainWindow):
 
     def recommendation_search(self) -> None:
         """Allow the user to enter their preferences and receive book recommendations."""
+        self.similar_page = None
         self.current_window = 0
+        self.num_windows = 0
         windows = []
         page_layout = QVBoxLayout()
         self.window_layout = QStackedLayout()
@@ -333,7 +473,6 @@ class Window(QMainWindow):
         country_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.country_lst = QListWidget(None)
         self.country_lst.setFont(QFont('Arial', 18))
-        self.country_lst.addItems(self.categories['country'])
         self.country_lst.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
         self.country_lst.setFixedSize(300, 100)
         language_lbl = QLabel('Language')
@@ -342,7 +481,6 @@ class Window(QMainWindow):
         language_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.language_lst = QListWidget(None)
         self.language_lst.setFont(QFont('Arial', 18))
-        self.language_lst.addItems(self.categories['language'])
         self.language_lst.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
         self.language_lst.setFixedSize(300, 100)
         layout3.addWidget(country_lbl, 0, 1)
@@ -365,9 +503,6 @@ class Window(QMainWindow):
         self.title_src.setFont(QFont('Arial', 20))
         self.title_src.setFixedSize(250, 40)
         self.title_src.setTextMargins(5, 5, 5, 5)
-        title_cpl = QCompleter(self.categories['title'], self.title_src)
-        title_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.title_src.setCompleter(title_cpl)
         author_lbl = QLabel('Author')
         author_lbl.setFont(QFont('Times New Roman', 28))
         author_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -376,9 +511,6 @@ class Window(QMainWindow):
         self.author_src.setFont(QFont('Arial', 20))
         self.author_src.setFixedSize(250, 40)
         self.author_src.setTextMargins(5, 5, 5, 5)
-        author_cpl = QCompleter(self.categories['author'], self.author_src)
-        author_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.author_src.setCompleter(author_cpl)
         publisher_lbl = QLabel('Publisher')
         publisher_lbl.setFont(QFont('Times New Roman', 28))
         publisher_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -387,9 +519,6 @@ class Window(QMainWindow):
         self.publisher_src.setFont(QFont('Arial', 20))
         self.publisher_src.setFixedSize(250, 40)
         self.publisher_src.setTextMargins(5, 5, 5, 5)
-        publisher_cpl = QCompleter(self.categories['publisher'], self.publisher_src)
-        publisher_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.publisher_src.setCompleter(publisher_cpl)
         pub_year_lbl = QLabel('Publication Year')
         pub_year_lbl.setFont(QFont('Times New Roman', 28))
         pub_year_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -398,9 +527,6 @@ class Window(QMainWindow):
         self.pub_year_src.setFont(QFont('Arial', 20))
         self.pub_year_src.setFixedSize(250, 40)
         self.pub_year_src.setTextMargins(5, 5, 5, 5)
-        pub_year_cpl = QCompleter(self.categories['publication year'], self.pub_year_src)
-        pub_year_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.pub_year_src.setCompleter(pub_year_cpl)
         self.ebook_rad = QRadioButton('Ebook Available')
         self.ebook_rad.setFont(QFont('Arial', 20))
         self.ebook_rad.setStyleSheet('margin-top: 50px')
@@ -426,19 +552,24 @@ class Window(QMainWindow):
         button_layout.addWidget(self.btn_exit)
 
         # continue button
-        btn_continue = QPushButton('Continue')
-        btn_continue.setFont(QFont('Arial', 18))
-        btn_continue.setFixedSize(120, 50)
-        btn_continue.pressed.connect(self.activate_next_window)
-        button_layout.addWidget(btn_continue)
+        self.btn_continue = QPushButton('Continue')
+        self.btn_continue.setFont(QFont('Arial', 18))
+        self.btn_continue.setFixedSize(120, 50)
+        self.btn_continue.pressed.connect(self.activate_next_window)
+        button_layout.addWidget(self.btn_continue)
 
         # all windows
         for window in windows:
             self.window_layout.addWidget(window)
             self.num_windows += 1
 
+        if self.engines_ready:
+            self.fill_categories()
+        self.update_continue_button()
+
         widget = QWidget(self)
         widget.setLayout(page_layout)
+        self.preferences_page = widget
         self.setCentralWidget(widget)
 
     def activate_next_window(self) -> None:
@@ -489,19 +620,19 @@ class Window(QMainWindow):
                 dialog.exec()
 
         elif self.current_window == 3:
-            if self.title_src.text() in self.categories['title'] and self.title_src.text() != '':
+            if ('title', self.title_src.text()) in self.facets and self.title_src.text() != '':
                 self.data['title'] = self.title_src.text()
             else:
                 self.data['title'] = None
-            if self.author_src.text() in self.categories['author'] and self.author_src.text() != '':
+            if ('author', self.author_src.text()) in self.facets and self.author_src.text() != '':
                 self.data['author'] = int(self.author_src.text().split(' (ID')[1][:-1])
             else:
                 self.data['author'] = None
-            if self.publisher_src.text() in self.categories['publisher'] and self.publisher_src.text() != '':
+            if ('publisher', self.publisher_src.text()) in self.facets and self.publisher_src.text() != '':
                 self.data['publisher'] = self.publisher_src.text()
             else:
                 self.data['publisher'] = None
-            if self.pub_year_src.text() in self.categories['publication year'] and self.pub_year_src.text() != '':
+            if ('publication_year', self.pub_year_src.text()) in self.facets and self.pub_year_src.text() != '':
                 self.data['publication year'] = self.pub_year_src.text()
             else:
                 self.data['publication year'] = None
@@ -524,17 +655,94 @@ class Window(QMainWindow):
             index = (self.current_window + 1) % self.num_windows
             self.window_layout.setCurrentIndex(index)
             self.current_window = index
+            self.update_continue_button()
 
     def activate_prev_window(self) -> None:
         """Switch to next window."""
         if self.current_window == 0:
-            sys.exit()
+            self.close()
+            return
         elif self.current_window == 1:
             self.btn_exit.setText('Exit')
 
         index = (self.current_window - 1) % self.num_windows
         self.window_layout.setCurrentIndex(index)
         self.current_window = index
+        self.update_continue_button()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Close the window, or if the recommendation systems are still being built, hide it,
+        stop building them after the current step and close it once their thread has finished,
+        so that the thread is not destroyed while it is running and the GUI never waits for it.
+        """
+        if self.engine_thread.isRunning():
+            self.engine_thread.requestInterruption()
+            self.engine_thread.finished.connect(self.close)
+            self.hide()
+            event.ignore()
+        else:
+            super().closeEvent(event)
+
+    def show_progress(self, percent: int, message: str) -> None:
+        """Show the progress of building the recommendation systems in the status bar."""
+        self.progress_bar.setValue(percent)
+        self.statusBar().showMessage(message)
+
+    def engines_built(self, facets: FacetIndex, categories: dict[str, list[Any]],
+                      completions: dict[str, AutocompleteIndex], text_index: TextIndex,
+                      rec_sys: RecommendationSystem, sim_sys: SimilarBookSystem,
+                      sim_session: SimilarBookSession) -> None:
+        """Start using the recommendation systems, categories and indexes built in the background."""
+        self.facets = facets
+        self.categories = categories
+        self.completions = completions
+        self.text_index = text_index
+        self.rec_sys = rec_sys
+        self.sim_sys = sim_sys
+        self.sim_session = sim_session
+        self.engines_ready = True
+
+        self.statusBar().removeWidget(self.progress_bar)
+        self.statusBar().showMessage('Ready.', 3000)
+        if self.similar_page is not None:
+            self.similar_books_search()
+        elif self.preferences_page is not None:
+            self.fill_categories()
+            self.update_continue_button()
+
+    def fill_categories(self) -> None:
+        """Fill the preference lists and completers of the book preferences section with the categories."""
+        self.country_lst.addItems(self.categories['country'])
+        self.language_lst.addItems(self.categories['language'])
+        year_cpl = QCompleter(self.categories['publication year'], self.pub_year_src)
+        year_cpl.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.pub_year_src.setCompleter(year_cpl)
+        for source, field in [(self.title_src, 'title'), (self.author_src, 'author'),
+                              (self.publisher_src, 'publisher')]:
+            self.attach_completer(source, self.completions[field])
+
+    def attach_completer(self, source: QLineEdit, index: AutocompleteIndex) -> None:
+        """Complete what the user types into source with the most popular completions in index.
+
+        The completions are looked up in index every time the text is edited, so the completer
+        only ever holds NUM_COMPLETIONS of them.
+        """
+        model = QStringListModel(source)
+        completer = QCompleter(model, source)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        source.setCompleter(completer)
+
+        def update(text: str) -> None:
+            model.setStringList(index.complete(text, NUM_COMPLETIONS) if text.strip() != '' else [])
+            completer.complete()
+
+        source.textEdited.connect(update)
+
+    def update_continue_button(self) -> None:
+        """Enable the continue button unless it would submit the preferences before the
+        recommendation systems are ready.
+        """
+        self.btn_continue.setEnabled(self.engines_ready or self.current_window != self.num_windows - 1)
 
     def value_changed_min_pages(self, i: int) -> None:
         """Display the chosen minimum number of pages."""
@@ -551,10 +759,20 @@ class Window(QMainWindow):
         self.book_id_src.setText(book_info[3:index])
 
     def search_book(self) -> None:
-        """Display information of chosen book."""
-        if self.book_id_src.text().strip() in {str(book_id) for book_id in self.books}:
-            self.current_book = int(self.book_id_src.text())
+        """Display information of chosen book, or if the search bar does not hold a book ID,
+        list the books whose title and description best match the words in it.
+        """
+        text = self.book_id_src.text().strip()
+        if text.isdigit() and int(text) in self.books:
+            self.current_book = int(text)
             self.book_txt.setText(self.get_book_info())
+        elif text != '' and self.engines_ready:
+            results = self.text_index.search(text, SEARCH_RESULTS)
+            self.book_lst.clear()
+            self.book_lst.addItems([f'ID {book_id}: {self.books[book_id].title} (search result)'
+                                    for book_id, _ in results if book_id in self.books])
+            self.book_txt.setText(f'{len(results)} book(s) found for "{text}".\n\n'
+                                  'Click on a book and press "Search" to see its description.')
 
     def recommend_books(self, preferences: list[Any]) -> None:
         """Recommend books with a recommendation system based on user preferences.
@@ -599,15 +817,12 @@ class Window(QMainWindow):
 
     def update_book_status(self) -> None:
         """Generate saved books and similar books (using saved books)."""
-        try:
-            with open('data/book.txt', 'r+') as file:
-                lines = file.readlines()
-                saved_books = {int(line.strip('\n')) for line in lines if int(line.strip('\n')) in self.books}
-        except FileNotFoundError:
-            saved_books = {}
+        saved_books = {book for book in self.profiles.saved_books(self.profile) if book in self.books}
 
         self.saved_books = saved_books
-        self.similar_books = {book for book in self.sim_sys.recommend(saved_books) if book in self.books}
+        if self.engines_ready:
+            self.sim_session.update(saved_books)
+            self.similar_books = {book for book in self.sim_session.recommend() if book in self.books}
 
     def get_book_info(self) -> str:
         """Return the full information of the chosen book."""
@@ -621,7 +836,7 @@ class Window(QMainWindow):
             + str(book.ratings_count) + '\n\nDescription: \n\n' + book.description + '\n\nLink: ' + book.link
 
     def save_book_id(self) -> None:
-        """Save book ID by writing it to file."""
+        """Save book ID in the user's profile."""
         if self.current_book == 0:
             dialog = QMessageBox()
             dialog.setText('Please select a book (using the search button).')
@@ -631,29 +846,20 @@ class Window(QMainWindow):
             dialog.setWindowTitle('Warning!')
             dialog.exec()
         else:
-            try:
-                with open('data/book.txt', 'r+') as file:
-                    lines = file.readlines()
-                    book = str(self.current_book)
-                    if book not in [line.strip('\n') for line in lines]:
-                        file.write(book + '\n')
-            except FileNotFoundError:
-                with open('data/book.txt', 'w+') as file:
-                    book = str(self.current_book)
-                    file.write(book + '\n')
-            finally:
-                dialog = QMessageBox()
-                dialog.setText('This book has been saved.')
-                dialog.setIcon(QMessageBox.Icon.Information)
-                dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
-                dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
-                dialog.setWindowTitle('Successful!')
-                dialog.exec()
+            self.profiles.save(self.current_book, self.profile)
+
+            dialog = QMessageBox()
+            dialog.setText('This book has been saved.')
+            dialog.setIcon(QMessageBox.Icon.Information)
+            dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
+            dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
+            dialog.setWindowTitle('Successful!')
+            dialog.exec()
 
-                self.similar_books_search()
+            self.similar_books_search()
 
     def unsave_book_id(self) -> None:
-        """Unsave book ID by removing it from file."""
+        """Unsave book ID by removing it from the user's profile."""
         if self.current_book == 0:
             dialog = QMessageBox()
             dialog.setText('Please select a book (using the search button).')
@@ -662,32 +868,26 @@ class Window(QMainWindow):
             dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
             dialog.setWindowTitle('Warning!')
             dialog.exec()
+        elif not self.profiles.saved_books(self.profile):
+            dialog = QMessageBox()
+            dialog.setText('No books have yet been saved.')
+            dialog.setIcon(QMessageBox.Icon.Warning)
+            dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
+            dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
+            dialog.setWindowTitle('Warning!')
+            dialog.exec()
         else:
-            try:
-                with open('data/book.txt', 'r+') as file:
-                    book = str(self.current_book)
-                    lines = [line.strip('\n') for line in file.readlines() if line.strip('\n') != book]
-            except FileNotFoundError:
-                dialog = QMessageBox()
-                dialog.setText('No books have yet been saved.')
-                dialog.setIcon(QMessageBox.Icon.Warning)
-                dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
-                dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
-                dialog.setWindowTitle('Warning!')
-                dialog.exec()
-            else:
-                with open('data/book.txt', 'w+') as file:
-                    file.writelines([line + '\n' for line in lines])
+            self.profiles.unsave(self.current_book, self.profile)
 
-                dialog = QMessageBox()
-                dialog.setText('This book has been unsaved.')
-                dialog.setIcon(QMessageBox.Icon.Information)
-                dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
-                dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
-                dialog.setWindowTitle('Successful!')
-                dialog.exec()
+            dialog = QMessageBox()
+            dialog.setText('This book has been unsaved.')
+            dialog.setIcon(QMessageBox.Icon.Information)
+            dialog.setStandardButtons(QMessageBox.StandardButton.Cancel | QMessageBox.StandardButton.Ok)
+            dialog.setDefaultButton(QMessageBox.StandardButton.Ok)
+            dialog.setWindowTitle('Successful!')
+            dialog.exec()
 
-                self.similar_books_search()
+            self.similar_books_search()
 
 
 if __name__ == '__main__':
@@ -696,5 +896,5 @@ if __name__ == '__main__':
         'max-line-length': 120,
         'disable': ['forbidden-import', 'undefined-variable', 'wildcard-import',
                     'too-many-instance-attributes', 'too-many-locals', 'too-many-statements',
-                    'too-many-branches', 'forbidden-IO-function']
+                    'too-many-branches', 'too-many-public-methods', 'invalid-name', 'forbidden-IO-function']
     })
@@ -0,0 +1,81 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the functions used to parse the gzipped JSON-lines
+datasets with several processes. A single reader decompresses the data
+file and splits it into chunks of whole lines, a pool of worker processes
+parses the chunks, and the parsed chunks are returned in file order.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+import gzip
+
+
+CHUNK_SIZE = 1 << 22
+T = TypeVar('T')
+
+
+def read_chunks(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the decompressed contents of the gzipped file filename in chunks of roughly
+    chunk_size bytes, where every chunk ends at the end of a line.
+    """
+    rest = b''
+    with gzip.open(filename) as file:
+        block = file.read(chunk_size)
+        while block:
+            block = rest + block
+            end = block.rfind(b'\n') + 1
+            rest = block[end:]
+            if end > 0:
+                yield block[:end]
+            block = file.read(chunk_size)
+
+    if rest:
+        yield rest
+
+
+def parse_chunks(filename: str, parse_chunk: Callable[[bytes], T], workers: int,
+                 chunk_size: int = CHUNK_SIZE) -> Iterator[T]:
+    """Yield parse_chunk(chunk) for every chunk of the gzipped file filename, in file order.
+
+    The chunks are parsed by a pool of the given number of worker processes, while this
+    process keeps reading ahead at most two chunks per worker. parse_chunk must be a
+    module-level function so that it can be sent to the workers.
+
+    Preconditions:
+        - workers >= 1
+    """
+    pending = deque()
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in read_chunks(filename, chunk_size):
+            pending.append(pool.submit(parse_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['collections', 'collections.abc', 'concurrent.futures', 'typing', 'gzip']
+    })
@@ -21,10 +21,21 @@ This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
 Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 
-import pandas
+from __future__ import annotations
+from itertools import chain
+from typing import TYPE_CHECKING
+import numpy
 from book import Book
-from author import load_author_data
-from genre import filter_genres
+from book_store import BookStore
+from author import load_author_data, load_author_names
+from facets import FacetIndex
+from genre import GENRES, GenreIndex, filter_genres, genres_to_mask
+from text_search import TextIndex
+
+if TYPE_CHECKING:
+    # pandas is only needed for type checking, so that reading books from a snapshot does not import it
+    import pandas
+    from recommendation_system import CSRBookGraph
 
 
 class Library:
@@ -32,25 +43,68 @@ class Library:
 
     Instance Attributes:
         - books: a mapping from book id to the corresponding book, representing a repository of books
+        - columnar: whether the books are kept in a columnar BookStore once they are loaded
+        - facets: the facet index of the books, or None if no books have been loaded
+        - text_index: the full-text index of the books, or None if no books have been loaded
+        - genre_index: the genre index of the books, or None if no books have been loaded
+        - similar_graph: the graph connecting every book with its similar books, or None if it
+          has not been loaded
     """
-    books: dict[int, Book]
+    books: dict[int, Book] | BookStore
+    columnar: bool
+    facets: FacetIndex | None
+    text_index: TextIndex | None
+    genre_index: GenreIndex | None
+    similar_graph: CSRBookGraph | None
 
-    def __init__(self) -> None:
+    def __init__(self, columnar: bool = False) -> None:
         """Initialize the library."""
         self.books = {}
+        self.columnar = columnar
+        self.facets = None
+        self.text_index = None
+        self.genre_index = None
+        self.similar_graph = None
+
+    def load_books(self, df: pandas.DataFrame, workers: int = 1) -> None:
+        """Load books into the system given the books dataframe, parsing the author data with
+        the given number of worker processes, and build their facet, full-text and genre indexes.
+
+        The dataframe is read and converted one whole column at a time, and the authors
+        and genres of every book are resolved in the same pass, which gives the same books
+        as constructing Book(df, i) for every row and then calling load_book_authors and
+        load_book_genres.
 
-    def load_books(self, df: pandas.DataFrame) -> None:
-        """Load books into the system given the books dataframe."""
-        for i in range(len(df.index)):
-            book = Book(df, i)
-            self.books[book.book_id] = book
+        Preconditions:
+            - workers >= 1
+        """
+        author_ids = [[int(author['author_id']) for author in authors] for authors in df['authors']]
+        author_names = load_author_names(set(chain.from_iterable(author_ids)), workers)
+        columns = _read_columns(df, author_ids, author_names)
 
-        self.load_book_authors()
-        self.load_book_genres()
+        if self.columnar:
+            self.books = BookStore.from_columns(columns)
+        else:
+            for values in zip(*columns.values()):
+                book = Book.from_fields(dict(zip(columns, values)))
+                self.books[book.book_id] = book
+
+        self.facets = FacetIndex.from_books(self.books)
+        self.text_index = TextIndex.from_books(self.books)
+        self.genre_index = GenreIndex.from_books(self.books)
 
     def load_book_authors(self) -> None:
-        """Load book author for every book in the library."""
-        data = load_author_data()
+        """Load book author for every book in the library.
+
+        The books of a columnar library are read-only views, so their author names are
+        updated in the columns of the BookStore instead.
+        """
+        if isinstance(self.books, BookStore):
+            self.books.update_author_names(load_author_data(
+                author_ids=set(self.books.arrays['authors.ids'].tolist())))
+            return
+
+        data = load_author_data(author_ids={author for book in self.books.values() for author in book.authors})
 
         for book_id in self.books:
             book = self.books[book_id]
@@ -59,15 +113,49 @@ class Library:
                     book.authors[author] = data[author]
 
     def load_book_genres(self) -> None:
-        """Load book genre for every book in the library."""
+        """Load book genre for every book in the library.
+
+        The genre masks of a columnar library are filtered in place of the genres of each view.
+        """
+        if isinstance(self.books, BookStore):
+            self.books.arrays['genres'] = self.books.arrays['genres'] & numpy.uint64(genres_to_mask(GENRES))
+            return
+
         for book_id in self.books:
             book = self.books[book_id]
             book.genres = filter_genres(book.genres)
 
 
+def _read_columns(df: pandas.DataFrame, author_ids: list[list[int]],
+                  author_names: dict[int, str]) -> dict[str, list]:
+    """Return a mapping from each attribute of Book to the values of that attribute for every
+    book in df, in row order, where author_ids[i] are the author ids of row i and each author
+    is named using author_names.
+    """
+    return {
+        'book_id': df['book_id'].astype(numpy.int64).tolist(),
+        'title': df['title'].tolist(),
+        'is_ebook': df['is_ebook'].astype(bool).tolist(),
+        'authors': [{author_id: author_names.get(author_id, '') for author_id in authors} for authors in author_ids],
+        'publisher': df['publisher'].tolist(),
+        'publication_year': df['publication_year'].astype(numpy.int64).tolist(),
+        'country': df['country_code'].tolist(),
+        'language': df['language_code'].tolist(),
+        'num_pages': df['num_pages'].astype(numpy.int64).tolist(),
+        'genres': [filter_genres({shelf['name'] for shelf in shelves if int(shelf['count']) >= 10})
+                   for shelves in df['popular_shelves']],
+        'average_rating': df['average_rating'].astype(float).tolist(),
+        'ratings_count': df['ratings_count'].astype(numpy.int64).tolist(),
+        'description': df['description'].tolist(),
+        'similar_books': [{int(book_id) for book_id in similar_books} for similar_books in df['similar_books']],
+        'link': df['link'].tolist()
+    }
+
+
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['pandas', 'book', 'author', 'genre']
+        'extra-imports': ['__future__', 'itertools', 'typing', 'numpy', 'pandas', 'book', 'book_store', 'author',
+                          'facets', 'genre', 'recommendation_system', 'text_search']
     })
@@ -21,73 +21,178 @@ for CSC111, Winter 2023.
 This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
 Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
-
+from __future__ import annotations
+from array import array
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 import gzip
 import json
-import pandas
-from numpy import nan
+import os
+import numpy
+from author import DATA_FILENAME as AUTHOR_DATA_FILENAME
+from book_store import BookStore
+from facets import FacetIndex
+from genre import GenreIndex
+from ingest import parse_chunks
 from library import Library
-from gui import Platform
+from recommendation_system import CSRBookGraph
+from snapshot import SNAPSHOT_DIRECTORY, load_snapshot, save_snapshot
+from text_search import TextIndex
+
+if TYPE_CHECKING:
+    import pandas
 
 
 DATA_FILENAME = 'data/books.json.gz'
-DATAFRAME_FILENAME = 'data/dataframe.pkl'
+GRAPH_SNAPSHOT_DIRECTORY = os.path.join(SNAPSHOT_DIRECTORY, 'graph')
+INGEST_WORKERS = os.cpu_count() or 1
+
+# The fields of a book record that are kept, mapped to the array typecode of their column
+# (None for columns of Python objects), in the order _parse_book returns them.
+BOOK_COLUMNS = {
+    'book_id': 'q', 'title': None, 'is_ebook': 'b', 'authors': None, 'publisher': None,
+    'publication_year': 'q', 'country_code': None, 'language_code': None, 'num_pages': 'q',
+    'popular_shelves': None, 'average_rating': 'd', 'ratings_count': 'q', 'description': None,
+    'similar_books': None, 'link': None
+}
+# A book record is rejected if any of these fields is missing, null or empty.
+REQUIRED_FIELDS = tuple(BOOK_COLUMNS) + ('title_without_series',)
+TYPECODE_DTYPES = {'q': numpy.int64, 'd': numpy.float64, 'b': numpy.bool_}
+
+
+def load_data(workers: int = 1) -> pandas.DataFrame:
+    """Read book json data and store it into a Pandas dataframe.
+
+    The data file is decoded one line at a time, and only the fields used by Book are kept
+    from every accepted record, appended straight into typed column buffers. If workers > 1,
+    the lines are parsed in chunks by that many worker processes, which gives the same
+    dataframe as parsing them in this process.
+
+    Preconditions:
+        - workers >= 1
+    """
+    if workers == 1:
+        with gzip.open(DATA_FILENAME) as file:
+            columns = _parse_books(file)
+    else:
+        columns = _empty_columns()
+        for chunk_columns in parse_chunks(DATA_FILENAME, _parse_book_chunk, workers):
+            for column, chunk_column in zip(columns.values(), chunk_columns.values()):
+                column.extend(chunk_column)
+
+    return _columns_to_dataframe(columns)
+
+
+def _empty_columns() -> dict[str, array | list]:
+    """Return an empty column buffer for every field in BOOK_COLUMNS."""
+    return {field: [] if typecode is None else array(typecode) for field, typecode in BOOK_COLUMNS.items()}
 
 
-def load_data() -> pandas.DataFrame:
-    """Read book csv data and store it into a Pandas dataframe."""
-    data = []
-    with gzip.open(DATA_FILENAME) as file:
-        for i in file:
-            d = json.loads(i)
-            data.append(d)
+def _parse_books(lines: Iterable[bytes]) -> dict[str, array | list]:
+    """Return the column buffers holding the kept fields of the accepted book records in lines."""
+    columns = _empty_columns()
+    for line in lines:
+        fields = _parse_book(line)
+        if fields is not None:
+            for column, value in zip(columns.values(), fields):
+                column.append(value)
 
-    dataframe = pandas.DataFrame(data)
-    dataframe = polish_data(dataframe)
+    return columns
 
-    return dataframe
 
+def _parse_book_chunk(chunk: bytes) -> dict[str, array | list]:
+    """Return the column buffers holding the kept fields of the accepted book records in the
+    given chunk of whole lines.
+    """
+    return _parse_books(chunk.splitlines())
+
+
+def _parse_book(line: bytes) -> tuple | None:
+    """Return the kept fields of the book record on the given line in the order of BOOK_COLUMNS,
+    or None if the record is missing any of REQUIRED_FIELDS.
 
-def polish_data(dataframe: pandas.DataFrame) -> pandas.DataFrame:
-    """Remove unwanted data (useless information, null values, etc.) from the given dataframe
-    and return the new dataframe.
+    Only the author ids of the authors and the shelves with at least 10 votes are kept.
     """
-    columns_to_remove = ['isbn', 'text_reviews_count', 'series', 'asin', 'kindle_asin', 'format',
-                         'isbn13', 'publication_day', 'publication_month', 'edition_information', 'url',
-                         'work_id', 'image_url']
+    record = json.loads(line)
+    if any(record.get(field) in ('', None) for field in REQUIRED_FIELDS):
+        return None
+
+    return (int(record['book_id']),
+            record['title'],
+            record['is_ebook'] == 'true',
+            [{'author_id': author['author_id']} for author in record['authors']],
+            record['publisher'],
+            int(record['publication_year']),
+            record['country_code'],
+            record['language_code'],
+            int(record['num_pages']),
+            [shelf for shelf in record['popular_shelves'] if int(shelf['count']) >= 10],
+            float(record['average_rating']),
+            int(record['ratings_count']),
+            record['description'],
+            [int(book_id) for book_id in record['similar_books']],
+            record['link'])
+
+
+def _columns_to_dataframe(columns: dict[str, array | list]) -> pandas.DataFrame:
+    """Return a dataframe with the given column buffers, typed according to BOOK_COLUMNS."""
+    # pandas takes a while to import and is only needed when the library is built from the data files
+    import pandas
+
+    return pandas.DataFrame({
+        field: column if BOOK_COLUMNS[field] is None else numpy.frombuffer(column, TYPECODE_DTYPES[BOOK_COLUMNS[field]])
+        for field, column in columns.items()
+    })
+
 
-    dataframe = dataframe.drop(columns_to_remove, axis=1)
-    dataframe.replace('', nan, inplace=True)
-    dataframe.dropna(inplace=True)
+def load_library(workers: int = 1) -> Library:
+    """Return the fully built library, read from the snapshot of the library if it is up to date
+    with the data files, and otherwise built from the data files with the given number of worker
+    processes and saved as the new snapshot.
 
-    return dataframe
+    The snapshot holds the columns of the books and their facet and full-text indexes. The genre
+    index is read from the genre column of the books. The graph of similar books is kept in a
+    snapshot of its own, and is built from the books and saved whenever it is out of date.
 
+    Preconditions:
+        - workers >= 1
+    """
+    sources = [DATA_FILENAME, AUTHOR_DATA_FILENAME]
+    library = Library(columnar=True)
 
-def read_data() -> pandas.DataFrame:
-    """Read dataframe data from the saved pkl file."""
-    return pandas.read_pickle(DATAFRAME_FILENAME)
+    arrays = load_snapshot(SNAPSHOT_DIRECTORY, sources)
+    if arrays is None:
+        library.load_books(load_data(workers), workers)
+        save_snapshot(SNAPSHOT_DIRECTORY, {**library.books.arrays, **library.facets.arrays,
+                                           **library.text_index.arrays}, sources)
+    else:
+        library.facets = FacetIndex.from_snapshot(arrays)
+        library.text_index = TextIndex.from_snapshot(arrays)
+        library.books = BookStore({name: array for name, array in arrays.items()
+                                   if name not in library.facets.arrays and name not in library.text_index.arrays})
+        library.genre_index = GenreIndex.from_books(library.books)
 
+    library.similar_graph = CSRBookGraph.load(GRAPH_SNAPSHOT_DIRECTORY, sources)
+    if library.similar_graph is None:
+        library.similar_graph = CSRBookGraph.from_books(library.books)
+        library.similar_graph.save(GRAPH_SNAPSHOT_DIRECTORY, sources)
 
-def save_data(dataframe: pandas.DataFrame) -> None:
-    """Save dataframe data into a pkl file."""
-    dataframe.to_pickle(DATAFRAME_FILENAME)
+    return library
 
 
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['gzip', 'json', 'pandas', 'numpy', 'library', 'gui']
+        'extra-imports': ['__future__', 'array', 'collections.abc', 'typing', 'gzip', 'json', 'os', 'numpy', 'pandas',
+                          'author', 'book_store', 'facets', 'genre', 'ingest', 'library', 'recommendation_system',
+                          'snapshot', 'text_search', 'gui']
     })
 
-    try:
-        df = read_data()
-    except FileNotFoundError:
-        save_data(load_data())
-        df = read_data()
+    # the GUI is only imported here, so that the library can be loaded without PyQt6
+    from gui import Platform
 
-    library = Library()
-    library.load_books(df)
+    library = load_library(INGEST_WORKERS)
 
-    p = Platform(library.books)
+    p = Platform(library.books, facets=library.facets, text_index=library.text_index)
     p.run()
@@ -0,0 +1,146 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the functions used to compute personalized PageRank
+(random walk with restart) scores over the similar-books graph, seeded on
+the books saved by the user. Scores are computed either exactly by power
+iteration on the sparse transition matrix of the graph or approximately
+by simulating random walks, optionally in several worker processes. Both
+methods stop early once a given time budget is used up.
+
+The graph is given by the indptr and indices arrays of a CSRBookGraph. A
+walk at a book with no neighbours jumps back to a random seed book, so no
+score is lost at dead ends.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import time
+import numpy
+
+
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+WALK_BATCH_SIZE = 1 << 14
+
+
+def power_iteration(indptr: numpy.ndarray, indices: numpy.ndarray, seeds: numpy.ndarray,
+                    damping: float = DAMPING, tolerance: float = TOLERANCE, max_iterations: int = MAX_ITERATIONS,
+                    time_budget: float | None = None) -> numpy.ndarray:
+    """Return the personalized PageRank score of every book in the graph given by indptr and
+    indices, restarting at a uniformly random book in seeds.
+
+    Iteration stops once the L1 change between two iterations is below tolerance, after
+    max_iterations iterations, or once time_budget seconds have passed, whichever is first.
+
+    Preconditions:
+        - 0 <= damping < 1
+        - len(seeds) > 0
+        - all(0 <= seed < len(indptr) - 1 for seed in seeds)
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    num_books = len(indptr) - 1
+    degrees = numpy.diff(indptr)
+    sources = numpy.repeat(numpy.arange(num_books), degrees)
+    dangling = degrees == 0
+    inverse_degrees = numpy.divide(1.0, degrees, out=numpy.zeros(num_books), where=~dangling)
+
+    restart = numpy.zeros(num_books)
+    numpy.add.at(restart, seeds, 1 / len(seeds))
+    scores = restart.copy()
+
+    for _ in range(max_iterations):
+        spread = numpy.bincount(indices, weights=(scores * inverse_degrees)[sources], minlength=num_books)
+        new_scores = damping * (spread + scores[dangling].sum() * restart) + (1 - damping) * restart
+        change = numpy.abs(new_scores - scores).sum()
+        scores = new_scores
+        if change < tolerance or (deadline is not None and time.perf_counter() >= deadline):
+            break
+
+    return scores
+
+
+def monte_carlo(indptr: numpy.ndarray, indices: numpy.ndarray, seeds: numpy.ndarray, num_walks: int,
+                damping: float = DAMPING, workers: int = 1, seed: int | None = None,
+                time_budget: float | None = None) -> numpy.ndarray:
+    """Return an estimate of the personalized PageRank score of every book in the graph given
+    by indptr and indices, restarting at a uniformly random book in seeds, from num_walks
+    random walks.
+
+    Each walk starts at a random seed and stops after every step with probability 1 - damping;
+    the score of a book is the fraction of walks that stop there. The walks are split evenly
+    between the given number of worker processes, and each worker stops starting new batches
+    of walks once time_budget seconds have passed.
+
+    Preconditions:
+        - 0 <= damping < 1
+        - len(seeds) > 0
+        - num_walks >= 1
+        - workers >= 1
+    """
+    deadline = None if time_budget is None else time.time() + time_budget
+    streams = numpy.random.SeedSequence(seed).spawn(workers)
+    shares = [num_walks // workers + (i < num_walks % workers) for i in range(workers)]
+
+    if workers == 1:
+        counts, walks = _walk(indptr, indices, seeds, shares[0], damping, streams[0], deadline)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_walk, *zip(*((indptr, indices, seeds, share, damping, stream, deadline)
+                                                  for share, stream in zip(shares, streams)))))
+        counts, walks = sum(result[0] for result in results), sum(result[1] for result in results)
+
+    return counts / max(walks, 1)
+
+
+def _walk(indptr: numpy.ndarray, indices: numpy.ndarray, seeds: numpy.ndarray, num_walks: int, damping: float,
+          stream: numpy.random.SeedSequence, deadline: float | None) -> tuple[numpy.ndarray, int]:
+    """Return the number of the given random walks that stop at every book, and the number of
+    walks that were completed before the deadline (a time.time value).
+
+    The walks are run in batches of WALK_BATCH_SIZE, all steps of a batch at once.
+    """
+    rng = numpy.random.default_rng(stream)
+    degrees = numpy.diff(indptr)
+    counts = numpy.zeros(len(degrees), dtype=numpy.int64)
+    walks = 0
+
+    while walks < num_walks and (deadline is None or walks == 0 or time.time() < deadline):
+        positions = seeds[rng.integers(len(seeds), size=min(WALK_BATCH_SIZE, num_walks - walks))]
+        walks += len(positions)
+        while len(positions) > 0:
+            stopping = rng.random(len(positions)) >= damping
+            counts += numpy.bincount(positions[stopping], minlength=len(degrees))
+            positions = positions[~stopping]
+
+            moving = degrees[positions] > 0
+            walkers = positions[moving]
+            offsets = (rng.random(len(walkers)) * degrees[walkers]).astype(numpy.int64)
+            positions = seeds[rng.integers(len(seeds), size=len(positions))]
+            positions[moving] = indices[indptr[walkers] + offsets]
+
+    return counts, walks
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'concurrent.futures', 'time', 'numpy'],
+        'disable': ['too-many-arguments', 'too-many-locals']
+    })
@@ -0,0 +1,303 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a customized class called ProfileStore that is used
+to keep the saved books of several named user profiles. Every change is
+appended as one json line to a log file and applied to an in-memory index,
+so saving and unsaving a book never rewrites the file and the saved books
+of a profile are always read from memory. The log is replayed when the
+store is opened, ignoring a last line cut short by a crash, and it is
+compacted into one record per saved book once it grows much larger than
+the data it holds.
+
+Only one process at a time can open the store for writing: it holds an
+exclusive lock on a lock file next to the log until it closes the store.
+Any number of processes can open the store read-only at the same time.
+
+The saved books of the single implicit user of earlier versions, kept in
+data/book.txt, are imported into the default profile the first time the
+store is opened.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from typing import Any, BinaryIO, TextIO
+import json
+import os
+
+
+PROFILE_LOG_FILENAME = 'data/profiles.log'
+LEGACY_FILENAME = 'data/book.txt'
+DEFAULT_PROFILE = 'default'
+# The log is compacted once it has more than COMPACTION_RATIO records per live record
+# and at least COMPACTION_MIN_RECORDS records.
+COMPACTION_RATIO = 4
+COMPACTION_MIN_RECORDS = 1024
+
+
+class ProfileStore:
+    """A persistent store of the saved books of several named user profiles.
+
+    Instance Attributes:
+        - filename: the path of the log file of this store
+        - profiles: a mapping from the name of every profile to the IDs of its saved books
+        - num_records: the number of records in the log file
+        - num_live: the number of profiles plus the number of saved books over every profile,
+          which is the number of records in the log once it is compacted
+        - sync: whether every record is flushed to disk before the change returns
+        - read_only: whether this store only reads the log file, never creating or changing it
+        - file: the log file, opened for appending, or None if this store is read-only
+        - lock_file: the lock file held by this store while it is open for writing, or None if
+          this store is read-only
+
+    Representation Invariants:
+        - self.num_live == len(self.profiles) + sum(len(books) for books in self.profiles.values())
+    """
+    filename: str
+    profiles: dict[str, set[int]]
+    num_records: int
+    num_live: int
+    sync: bool
+    read_only: bool
+    file: TextIO | None
+    lock_file: BinaryIO | None
+
+    def __init__(self, filename: str = PROFILE_LOG_FILENAME, legacy_filename: str | None = LEGACY_FILENAME,
+                 sync: bool = True, read_only: bool = False) -> None:
+        """Open the store with the log file filename, creating it if it does not exist.
+
+        If there is no log file yet but there is a file legacy_filename with one saved book ID
+        per line, those books are imported into DEFAULT_PROFILE.
+
+        If read_only is True, the log file is neither created nor changed, the legacy books are
+        only imported into memory, and every change to the store raises ValueError.
+
+        Raise ValueError if a line of the log file other than the last one is not a valid record,
+        and BlockingIOError if the store is not read-only and another process has it open for writing.
+        """
+        self.filename = filename
+        self.profiles = {}
+        self.num_records = 0
+        self.num_live = 0
+        self.sync = sync
+        self.read_only = read_only
+        self.file = None
+        self.lock_file = None
+
+        if not read_only:
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.lock_file = open(filename + '.lock', 'ab')
+            try:
+                _lock(self.lock_file)
+            except OSError:
+                self.lock_file.close()
+                raise
+
+        if os.path.exists(filename):
+            self._replay()
+        elif legacy_filename is not None and os.path.exists(legacy_filename):
+            with open(legacy_filename) as file:
+                self.profiles[DEFAULT_PROFILE] = {int(line) for line in file if line.strip()}
+            self.num_live = 1 + len(self.profiles[DEFAULT_PROFILE])
+
+        if read_only:
+            return
+        if not os.path.exists(filename):
+            self.compact()
+        else:
+            self.file = open(filename, 'a')
+
+    def profile_names(self) -> list[str]:
+        """Return the names of the profiles in this store, in the order they were created."""
+        return list(self.profiles)
+
+    def saved_books(self, profile: str = DEFAULT_PROFILE) -> set[int]:
+        """Return the IDs of the books saved in profile, or an empty set if there is no such profile."""
+        return set(self.profiles.get(profile, ()))
+
+    def is_saved(self, book_id: int, profile: str = DEFAULT_PROFILE) -> bool:
+        """Return whether the book with book_id is saved in profile."""
+        return book_id in self.profiles.get(profile, ())
+
+    def create_profile(self, profile: str) -> None:
+        """Create an empty profile with the given name, if there is none yet."""
+        if profile not in self.profiles:
+            self._append({'op': 'create', 'profile': profile})
+
+    def delete_profile(self, profile: str) -> None:
+        """Delete the profile with the given name and its saved books, if there is one."""
+        if profile in self.profiles:
+            self._append({'op': 'delete', 'profile': profile})
+
+    def save(self, book_id: int, profile: str = DEFAULT_PROFILE) -> None:
+        """Save the book with book_id in profile, creating the profile if necessary."""
+        if not self.is_saved(book_id, profile):
+            self._append({'op': 'save', 'profile': profile, 'book_id': book_id})
+
+    def unsave(self, book_id: int, profile: str = DEFAULT_PROFILE) -> None:
+        """Remove the book with book_id from the saved books of profile, if it is saved there."""
+        if self.is_saved(book_id, profile):
+            self._append({'op': 'unsave', 'profile': profile, 'book_id': book_id})
+
+    def compact(self) -> None:
+        """Rewrite the log file with one record per profile and saved book.
+
+        The new log is written to a temporary file that then replaces the old one, so the
+        log on disk is always either the old or the new one.
+
+        Raise ValueError if this store is read-only.
+        """
+        if self.read_only:
+            raise ValueError(f'{self.filename} is opened read-only')
+        if self.file is not None:
+            self.file.close()
+
+        records = []
+        for profile, book_ids in self.profiles.items():
+            records.append({'op': 'create', 'profile': profile})
+            records.extend({'op': 'save', 'profile': profile, 'book_id': book_id} for book_id in sorted(book_ids))
+
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.filename + '.tmp', 'w') as file:
+            file.writelines(json.dumps(record) + '\n' for record in records)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.filename + '.tmp', self.filename)
+
+        self.num_records = len(records)
+        self.file = open(self.filename, 'a')
+
+    def close(self) -> None:
+        """Close the log file of this store and release its lock."""
+        if self.file is not None:
+            self.file.close()
+        if self.lock_file is not None:
+            self.lock_file.close()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Append record to the log file and then apply it to this store, compacting the log if
+        it has grown too large.
+
+        If the record cannot be written, this store is left unchanged, and the log is rewritten
+        from it so that it does not end with part of the record.
+
+        Raise ValueError if this store is read-only.
+        """
+        if self.read_only:
+            raise ValueError(f'{self.filename} is opened read-only')
+        try:
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+        except OSError:
+            self.compact()
+            raise
+        self.num_records += 1
+        self._apply(record)
+
+        if self.num_records >= max(COMPACTION_MIN_RECORDS, COMPACTION_RATIO * self.num_live):
+            self.compact()
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply record to the in-memory index of this store and its count of live records."""
+        profile = record['profile']
+        if record['op'] == 'delete':
+            if profile in self.profiles:
+                self.num_live -= 1 + len(self.profiles.pop(profile))
+            return
+
+        if profile not in self.profiles:
+            self.profiles[profile] = set()
+            self.num_live += 1
+        book_ids = self.profiles[profile]
+        if record['op'] == 'save' and record['book_id'] not in book_ids:
+            book_ids.add(record['book_id'])
+            self.num_live += 1
+        elif record['op'] == 'unsave' and record['book_id'] in book_ids:
+            book_ids.remove(record['book_id'])
+            self.num_live -= 1
+
+    def _replay(self) -> None:
+        """Apply every record in the log file to this store.
+
+        A last line that was only partly written, e.g. because of a crash, is removed from
+        the log file, or only ignored if this store is read-only. Raise ValueError if any other
+        line is not a valid record, leaving the log file unchanged, since the records after it
+        cannot be trusted to apply.
+        """
+        with open(self.filename, 'rb' if self.read_only else 'rb+') as file:
+            end = 0
+            bad_line = None
+            for number, line in enumerate(file, 1):
+                if bad_line is not None:
+                    raise ValueError(f'{self.filename}: line {bad_line} is not a valid record')
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    bad_line = number
+                    continue
+                if not line.endswith(b'\n') or not _is_record(record):
+                    bad_line = number
+                    continue
+                self._apply(record)
+                self.num_records += 1
+                end += len(line)
+            if not self.read_only:
+                file.truncate(end)
+
+
+def _lock(file: BinaryIO) -> None:
+    """Take an exclusive lock on file, which is held until file is closed.
+
+    Raise BlockingIOError if another process holds the lock.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt  # Windows has no fcntl
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError as error:
+            raise BlockingIOError(f'{file.name} is locked by another process') from error
+        return
+
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError as error:
+        raise BlockingIOError(f'{file.name} is locked by another process') from error
+
+
+def _is_record(record: Any) -> bool:
+    """Return whether record is a valid record of a profile log."""
+    if not isinstance(record, dict) or not isinstance(record.get('profile'), str):
+        return False
+    if record.get('op') in ('create', 'delete'):
+        return True
+    return record.get('op') in ('save', 'unsave') and isinstance(record.get('book_id'), int)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'typing', 'json', 'os', 'fcntl', 'msvcrt'],
+        'disable': ['forbidden-IO-function', 'consider-using-with', 'import-outside-toplevel']
+    })
@@ -22,13 +22,28 @@ This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
 Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
 """
 from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any
+import heapq
 import random
+import numpy
 from book import Book
+from book_store import BookStore
+import pagerank
+from snapshot import load_snapshot, save_snapshot
 
 
 SYSTEM_START = '*'
 RELEVANCE_FACTOR = 50
+SESSION_CACHE_SIZE = 32
+NUM_ATTRIBUTES = 9
+# The attributes in Book.get_attributes other than the number of pages and the authors
+# whose values are compared by equality.
+CODED_ATTRIBUTES = (1, 2, 3, 5, 6, 7)
+# The engine answering the batches of recommend_many in a worker process, set when the process starts.
+_worker_engine = None
 
 
 ##################################################################
@@ -38,16 +53,29 @@ class RecommendationSystem:
     """A recommendation system based on the decision tree. This system is used when
     either the user has no account recorded or the user wants to explore books of genres
     which haven't appeared in this user's past reading activities.
+
+    Instance Attributes:
+        - item: the attribute value at this node of the tree
+        - subsystems: the children of this node, keyed by their items
+        - books: a dictionary that maps each book's ID to the corresponding Book object
+        - attributes: the attribute table used to score the candidate books, or None if this
+          system has not been initialized or is not the root of the tree
+        - page_index: the index of the page counts of the children of this node, or None if
+          this system has not been initialized or is not the root of the tree
     """
     item: Any
     subsystems: dict[Any, RecommendationSystem]
     books: dict[int, Book]
+    attributes: _AttributeTable | None
+    page_index: _PageIndex | None
 
     def __init__(self, books: dict[int, Book], root: Any = SYSTEM_START) -> None:
         """Initialize this recommendation system."""
         self.item = root
         self.subsystems = {}
         self.books = books
+        self.attributes = None
+        self.page_index = None
 
     def add_subsystem(self, subsystem: RecommendationSystem) -> None:
         """Add subsystem to this recommendation system."""
@@ -81,30 +109,47 @@ class RecommendationSystem:
                 attributes_copy = attributes[:4] + tuple([author_id]) + attributes[5:]
                 self.insert_attributes(attributes_copy)
 
-    def recommend(self, responses: list) -> set[int]:
+        self.attributes = _AttributeTable(self.books)
+        self.page_index = _PageIndex(self.subsystems)
+
+    def recommend(self, responses: list, rng: random.Random | None = None) -> set[int]:
         """Return a set of IDs of the recommended books based on the responses to a series
         of questions provided by the user.
 
+        Books whose number of pages is within the range given by the first response are
+        preferred, and if there are no such books, the books whose number of pages is
+        nearest to that range are preferred instead. If too many books match equally well,
+        they are sampled with rng, or with the random module if rng is None.
+
         Preconditions:
             - len(responses) == 8
         """
-        possible_recommended = self._recommend_util(responses, 0)
-        max_match = max(
-            possible_recommended,
-            key=lambda x: _get_match_score(self.books[x].get_attributes(), responses)
-        )
-
-        recommended = []
-        for book in possible_recommended:
-            curr_match_score = _get_match_score(self.books[book].get_attributes(), responses)
-            max_match_score = _get_match_score(self.books[max_match].get_attributes(), responses)
-            if curr_match_score == max_match_score:
-                recommended.append(book)
-
-        if len(recommended) > 60:
-            return set(random.sample(recommended, 60))
-        else:
-            return set(recommended)
+        if self.attributes is None:
+            self.attributes = _AttributeTable(self.books)
+        return _best_matches(self.attributes, self._recommend_util(responses, 0), responses, rng)
+
+    def recommend_many(self, profiles: list[list], workers: int = 1, seed: int | None = None) -> list[set[int]]:
+        """Return the set of IDs of the recommended books for every list of responses in
+        profiles, in the same order.
+
+        Profiles with different page ranges are split into groups answered by the given number
+        of worker processes. If seed is not None, the recommendations for profiles[i] are the
+        same as those of self.recommend(profiles[i], random.Random(profile_seeds(seed, len(profiles))[i])),
+        whatever the number of workers.
+
+        Preconditions:
+            - all(len(responses) == 8 for responses in profiles)
+            - workers >= 1
+        """
+        return _recommend_many(self, profiles, workers, seed)
+
+    def recommend_batch(self, profiles: list[list], seeds: list[int | None]) -> list[set[int]]:
+        """Return the recommendations for every list of responses in profiles, in the same order,
+        where the recommendations for profiles[i] are sampled with random.Random(seeds[i]) (or the
+        random module if seeds[i] is None).
+        """
+        return [self.recommend(responses, None if profile_seed is None else random.Random(profile_seed))
+                for responses, profile_seed in zip(profiles, seeds)]
 
     def _recommend_util(self, responses: list, start: int) -> list[int]:
         """A helper method for RecommendationSystem.recommend."""
@@ -115,11 +160,12 @@ class RecommendationSystem:
         attribute = responses[start]
         found = False
         if start == 0:
+            if self.page_index is None:
+                self.page_index = _PageIndex(self.subsystems)
             min_pages, max_pages = attribute
-            for subsystem in self.subsystems:
-                if min_pages <= self.subsystems[subsystem].item <= max_pages:
-                    found = True
-                    all_recommended.extend(self.subsystems[subsystem]._recommend_util(responses, start + 1))
+            for subsystem in self.page_index.select(min_pages, max_pages):
+                found = True
+                all_recommended.extend(subsystem._recommend_util(responses, start + 1))
         else:
             for subsystem in self.subsystems:
                 if attribute == self.subsystems[subsystem].item:
@@ -133,6 +179,450 @@ class RecommendationSystem:
         return all_recommended
 
 
+class IndexedRecommendationSystem:
+    """A recommendation system that gives the same recommendations as RecommendationSystem,
+    but finds the candidate books with binary search and posting lists instead of walking
+    a tree.
+
+    Every path from the root of a RecommendationSystem to one of its leaves corresponds to
+    one (book, author) pair. This system stores those paths as the rows of a table, in the
+    order in which RecommendationSystem._recommend_util would visit them, where column k
+    holds the level-k attribute of each path (the attribute compared with responses[k]).
+    For every level, the rows of the paths that have each attribute value form a posting
+    list, and the attribute is matched within each tree node by intersecting the posting
+    list with the remaining paths below that node.
+
+    Instance Attributes:
+        - books: a dictionary that maps each book's ID to the corresponding Book object
+        - attributes: the attribute table used to score the candidate books
+        - book_ids: the ID of the book of each path
+        - codes: codes[k][p] is the code of the level-k attribute of path p, for 1 <= k < 8
+        - vocabularies: vocabularies[k] maps each level-k attribute value to its code
+        - parents: parents[k][p] identifies the tree node that path p passes through just
+          before reaching level k, so paths with equal parents[k] share that node
+        - sorted_pages: the number of pages of every path, in ascending order
+        - page_order: page_order[i] is the path with sorted_pages[i] pages
+        - postings: postings[k][offsets[k][c]:offsets[k][c + 1]] are the paths whose
+          level-k attribute has code c, in ascending order
+        - offsets: the start of each posting list in postings[k], for 1 <= k < 8
+    """
+    books: dict[int, Book]
+    attributes: _AttributeTable
+    book_ids: numpy.ndarray
+    codes: list[numpy.ndarray]
+    vocabularies: list[dict[Any, int]]
+    parents: list[numpy.ndarray]
+    sorted_pages: numpy.ndarray
+    page_order: numpy.ndarray
+    postings: list[numpy.ndarray]
+    offsets: list[numpy.ndarray]
+
+    def __init__(self, books: dict[int, Book]) -> None:
+        """Initialize this recommendation system."""
+        self.books = books
+        self.attributes = _AttributeTable({})
+        self.book_ids = numpy.zeros(0, dtype=numpy.int64)
+        self.codes, self.vocabularies, self.parents, self.postings, self.offsets = [], [], [], [], []
+        self.sorted_pages = numpy.zeros(0, dtype=numpy.int64)
+        self.page_order = numpy.zeros(0, dtype=numpy.int64)
+
+    def initialize(self) -> None:
+        """Initialize this recommendation system with every book in self.books."""
+        values = [[] for _ in range(NUM_ATTRIBUTES)]
+        for book_id in self.books:
+            attributes = self.books[book_id].get_attributes()
+            for author_id in attributes[4]:
+                for level, value in enumerate(attributes[:4] + (author_id,) + attributes[5:]):
+                    values[level].append(value)
+
+        self.vocabularies = [{} for _ in range(NUM_ATTRIBUTES)]
+        codes = [numpy.fromiter((vocabulary.setdefault(value, len(vocabulary)) for value in level_values),
+                                dtype=numpy.int64, count=len(level_values))
+                 for vocabulary, level_values in zip(self.vocabularies, values)]
+
+        # Number the tree nodes at every level, and order the paths by when the node they pass
+        # through at each level was first inserted, which is the order of a walk through the tree.
+        nodes = numpy.zeros(len(codes[0]), dtype=numpy.int64)
+        parents, first_inserted = [], []
+        for level in range(NUM_ATTRIBUTES):
+            parents.append(nodes)
+            _, first, nodes = numpy.unique(nodes * len(self.vocabularies[level]) + codes[level],
+                                           return_index=True, return_inverse=True)
+            nodes = nodes.reshape(-1)
+            first_inserted.append(first[nodes])
+        order = numpy.lexsort(first_inserted[::-1])
+
+        self.book_ids = numpy.asarray(values[-1], dtype=numpy.int64)[order]
+        self.codes = [level_codes[order] for level_codes in codes[:-1]]
+        self.parents = [level_parents[order] for level_parents in parents[:-1]]
+
+        pages = numpy.asarray(values[0], dtype=numpy.int64)[order]
+        self.page_order = numpy.argsort(pages, kind='stable')
+        self.sorted_pages = pages[self.page_order]
+
+        self.postings, self.offsets = [], []
+        for level, level_codes in enumerate(self.codes):
+            self.postings.append(numpy.argsort(level_codes, kind='stable'))
+            self.offsets.append(numpy.searchsorted(level_codes[self.postings[-1]],
+                                                   numpy.arange(len(self.vocabularies[level]) + 1)))
+
+        self.attributes = _AttributeTable(self.books)
+
+    def recommend(self, responses: list, rng: random.Random | None = None,
+                  allowed: set[int] | None = None) -> set[int]:
+        """Return a set of IDs of the recommended books based on the responses to a series
+        of questions provided by the user, sampled with rng (or the random module if rng is
+        None) if too many books match equally well.
+
+        If allowed is not None, only the candidate books with IDs in allowed are recommended,
+        e.g. the books of some genres as given by GenreIndex.books_with_genres.
+
+        Preconditions:
+            - len(responses) == 8
+        """
+        candidates = self._candidates(responses)
+        if allowed is not None:
+            candidates = [book_id for book_id in candidates if book_id in allowed]
+            if not candidates:
+                return set()
+        return _best_matches(self.attributes, candidates, responses, rng)
+
+    def recommend_many(self, profiles: list[list], workers: int = 1, seed: int | None = None) -> list[set[int]]:
+        """Return the set of IDs of the recommended books for every list of responses in
+        profiles, in the same order.
+
+        The candidate paths matched for a prefix of responses are computed once and shared by
+        every profile starting with that prefix, and the match scores are computed once for
+        every distinct profile. Profiles with different page ranges share nothing, so they are
+        split into groups answered by the given number of worker processes.
+
+        If seed is not None, the recommendations for profiles[i] are the same as those of
+        self.recommend(profiles[i], random.Random(profile_seeds(seed, len(profiles))[i])),
+        whatever the number of workers.
+
+        Preconditions:
+            - all(len(responses) == 8 for responses in profiles)
+            - workers >= 1
+        """
+        return _recommend_many(self, profiles, workers, seed)
+
+    def recommend_batch(self, profiles: list[list], seeds: list[int | None]) -> list[set[int]]:
+        """Return the recommendations for every list of responses in profiles, in the same order,
+        where the recommendations for profiles[i] are sampled with random.Random(seeds[i]) (or the
+        random module if seeds[i] is None).
+        """
+        results = [set() for _ in profiles]
+
+        def match(indices: list[int], level: int, paths: numpy.ndarray | None) -> None:
+            """Recommend books for the profiles with the given indices, which all have the same
+            responses before level and the remaining candidate paths paths.
+            """
+            if level == NUM_ATTRIBUTES - 1:
+                best = _top_matches(self.attributes, self.book_ids[paths].tolist(), profiles[indices[0]])
+                for i in indices:
+                    results[i] = _sample(best, None if seeds[i] is None else random.Random(seeds[i]))
+                return
+
+            groups = {}
+            for i in indices:
+                groups.setdefault(_response_key(profiles[i][level]), []).append(i)
+            for group in groups.values():
+                attribute = profiles[group[0]][level]
+                if level == 0:
+                    match(group, 1, self._page_paths(attribute))
+                else:
+                    match(group, level + 1, self._match_level(paths, level, attribute))
+
+        if profiles:
+            match(list(range(len(profiles))), 0, None)
+        return results
+
+    def _candidates(self, responses: list) -> list[int]:
+        """Return the IDs of the candidate books for the given responses, in the same order and
+        with the same repetitions as RecommendationSystem._recommend_util(responses, 0).
+        """
+        paths = self._page_paths(responses[0])
+        for level in range(1, len(responses)):
+            paths = self._match_level(paths, level, responses[level])
+
+        return self.book_ids[paths].tolist()
+
+    def _page_paths(self, page_range: tuple[int, int]) -> numpy.ndarray:
+        """Return the sorted paths whose number of pages is in page_range, or nearest to it if
+        there are none, as selected at the root of the tree.
+        """
+        start, end = _page_range(self.sorted_pages, *page_range)
+        return numpy.sort(self.page_order[start:end])
+
+    def _match_level(self, paths: numpy.ndarray, level: int, attribute: Any) -> numpy.ndarray:
+        """Return the paths that remain of the given sorted paths after matching the level-k
+        attribute with attribute: below every tree node at this level that has a child equal
+        to attribute, only the paths through that child remain.
+        """
+        try:
+            code = self.vocabularies[level].get(attribute)
+        except TypeError:
+            code = None
+        if code is None:
+            return paths
+
+        posting = self.postings[level][self.offsets[level][code]:self.offsets[level][code + 1]]
+        matched = numpy.intersect1d(paths, posting, assume_unique=True)
+        if len(matched) == 0:
+            return paths
+
+        parents = self.parents[level]
+        unmatched = paths[~numpy.isin(parents[paths], parents[matched])]
+        return numpy.union1d(matched, unmatched)
+
+
+class _PageIndex:
+    """The page counts of the children of the root of a RecommendationSystem, kept in a
+    sorted array so that page range queries are answered by binary search.
+
+    Instance Attributes:
+        - sorted_pages: the page counts of the children, in ascending order
+        - children: children[i] is the child whose item is sorted_pages[i]
+        - ranks: ranks[i] is the position of children[i] in the insertion order of the children
+    """
+    sorted_pages: numpy.ndarray
+    children: list[RecommendationSystem]
+    ranks: list[int]
+
+    def __init__(self, subsystems: dict[int, RecommendationSystem]) -> None:
+        """Initialize the page index of the given children, keyed by their page counts."""
+        pages = list(subsystems)
+        order = sorted(range(len(pages)), key=lambda i: pages[i])
+        self.sorted_pages = numpy.asarray([pages[i] for i in order], dtype=numpy.int64)
+        self.children = [subsystems[pages[i]] for i in order]
+        self.ranks = order
+
+    def select(self, min_pages: int, max_pages: int) -> list[RecommendationSystem]:
+        """Return the children whose page counts are in the range [min_pages, max_pages], or
+        if there are none, those whose page counts are nearest to that range, in insertion order.
+        """
+        start, end = _page_range(self.sorted_pages, min_pages, max_pages)
+        return [self.children[i] for i in sorted(range(start, end), key=lambda i: self.ranks[i])]
+
+
+def _page_range(sorted_pages: numpy.ndarray, min_pages: int, max_pages: int) -> tuple[int, int]:
+    """Return the bounds start and end of the slice sorted_pages[start:end] of the page counts
+    in the range [min_pages, max_pages].
+
+    If there are no such page counts, return the slice of the page counts nearest to the range
+    instead: those equal to the largest page count below min_pages or the smallest one above
+    max_pages, whichever is closer (or both if they are equally close). If min_pages > max_pages,
+    return the whole array.
+
+    Preconditions:
+        - sorted_pages is sorted in ascending order
+    """
+    start = int(numpy.searchsorted(sorted_pages, min_pages, side='left'))
+    end = int(numpy.searchsorted(sorted_pages, max_pages, side='right'))
+    if start < end:
+        return start, end
+    elif min_pages > max_pages or len(sorted_pages) == 0:
+        return 0, len(sorted_pages)
+
+    below = min_pages - sorted_pages[start - 1] if start > 0 else float('inf')
+    above = sorted_pages[end] - max_pages if end < len(sorted_pages) else float('inf')
+    if below <= above:
+        start = int(numpy.searchsorted(sorted_pages, sorted_pages[start - 1], side='left'))
+    if above <= below:
+        end = int(numpy.searchsorted(sorted_pages, sorted_pages[end], side='right'))
+
+    return start, end
+
+
+class _AttributeTable:
+    """The attributes of a collection of books, as returned by Book.get_attributes, stored
+    as one column per attribute so that the match scores of many books with the same
+    responses can be computed at once.
+
+    Every attribute other than the number of pages and the authors is stored as a column of
+    codes, where equal codes stand for equal values.
+
+    Instance Attributes:
+        - book_ids: the ID of the book in each row, in ascending order
+        - pages: the number of pages of the book in each row
+        - codes: codes[i][row] is the code of attribute i of the book in row, for i in
+          CODED_ATTRIBUTES
+        - vocabularies: vocabularies[i] maps each value of attribute i to its code, for i in
+          CODED_ATTRIBUTES and for i == 4 (the authors)
+        - author_postings: author_postings[author_offsets[c]:author_offsets[c + 1]] are the rows
+          of the books by the author with code c, in ascending order
+        - author_offsets: the start of the posting list of each author code in author_postings
+    """
+    book_ids: numpy.ndarray
+    pages: numpy.ndarray
+    codes: dict[int, numpy.ndarray]
+    vocabularies: dict[int, dict[Any, int]]
+    author_postings: numpy.ndarray
+    author_offsets: numpy.ndarray
+
+    def __init__(self, books: dict[int, Book]) -> None:
+        """Initialize the attribute table of the given books."""
+        book_ids = sorted(books)
+        attributes = [books[book_id].get_attributes() for book_id in book_ids]
+        self.book_ids = numpy.asarray(book_ids, dtype=numpy.int64)
+        self.pages = numpy.asarray([attribute[0] for attribute in attributes], dtype=numpy.int64)
+
+        self.vocabularies = {i: {} for i in CODED_ATTRIBUTES + (4,)}
+        self.codes = {i: numpy.fromiter((self.vocabularies[i].setdefault(attribute[i], len(self.vocabularies[i]))
+                                         for attribute in attributes), dtype=numpy.int64, count=len(attributes))
+                      for i in CODED_ATTRIBUTES}
+
+        authors = self.vocabularies[4]
+        author_codes = numpy.fromiter((authors.setdefault(author, len(authors))
+                                       for attribute in attributes for author in attribute[4]), dtype=numpy.int64)
+        author_rows = numpy.repeat(numpy.arange(len(attributes)), [len(attribute[4]) for attribute in attributes])
+        order = numpy.argsort(author_codes, kind='stable')
+        self.author_postings = author_rows[order]
+        self.author_offsets = numpy.searchsorted(author_codes[order], numpy.arange(len(authors) + 1))
+
+    def rows(self, book_ids: list[int]) -> numpy.ndarray:
+        """Return the rows of the books with the given IDs.
+
+        Preconditions:
+            - all(book_id in self.book_ids for book_id in book_ids)
+        """
+        return numpy.searchsorted(self.book_ids, numpy.asarray(book_ids, dtype=numpy.int64))
+
+    def match_scores(self, rows: numpy.ndarray, responses: list) -> numpy.ndarray:
+        """Return the match score (as defined in _get_match_score) between the attributes of the
+        book in each of the given rows and responses.
+
+        Preconditions:
+            - len(responses) == 8
+        """
+        min_pages, max_pages = responses[0]
+        pages = self.pages[rows]
+        scores = 10 * ((min_pages <= pages) & (pages <= max_pages))
+
+        for i in (1, 2):
+            allowed = [code for code in (_lookup_code(self.vocabularies[i], response) for response in responses[i])
+                       if code is not None]
+            scores += 10 * numpy.isin(self.codes[i][rows], allowed)
+
+        for i in (3, 5, 6, 7):
+            code = _lookup_code(self.vocabularies[i], responses[i])
+            if code is not None:
+                scores += self.codes[i][rows] == code
+
+        code = _lookup_code(self.vocabularies[4], responses[4])
+        if code is not None:
+            # only the given rows are looked up in the author's posting list
+            postings = self.author_postings[self.author_offsets[code]:self.author_offsets[code + 1]]
+            positions = numpy.minimum(numpy.searchsorted(postings, rows), len(postings) - 1)
+            scores += postings[positions] == rows
+
+        return scores
+
+
+def _lookup_code(vocabulary: dict[Any, int], value: Any) -> int | None:
+    """Return the code of the attribute value equal to value in vocabulary, or None if there is none."""
+    try:
+        return vocabulary.get(value)
+    except TypeError:
+        return None
+
+
+def _best_matches(attributes: _AttributeTable, candidates: list[int], responses: list,
+                  rng: random.Random | None = None) -> set[int]:
+    """Return the IDs of at most 60 of the candidate books whose attributes have the highest
+    match score with responses, sampled at random with rng (or the random module if rng is None)
+    if there are more than 60 of them.
+
+    Preconditions:
+        - candidates != []
+        - all(book_id in attributes.book_ids for book_id in candidates)
+    """
+    return _sample(_top_matches(attributes, candidates, responses), rng)
+
+
+def _top_matches(attributes: _AttributeTable, candidates: list[int], responses: list) -> list[int]:
+    """Return the candidate books whose attributes have the highest match score with responses,
+    in the same order and with the same repetitions as in candidates.
+
+    The match scores of all candidates are computed at once from the attribute table.
+
+    Preconditions:
+        - candidates != []
+        - all(book_id in attributes.book_ids for book_id in candidates)
+    """
+    scores = attributes.match_scores(attributes.rows(candidates), responses)
+    return numpy.asarray(candidates, dtype=numpy.int64)[scores == scores.max()].tolist()
+
+
+def _sample(recommended: list[int], rng: random.Random | None) -> set[int]:
+    """Return the IDs in recommended, or 60 of them sampled with rng (or the random module if rng
+    is None) if there are more than 60 of them.
+    """
+    if len(recommended) > 60:
+        return set((random if rng is None else rng).sample(recommended, 60))
+    else:
+        return set(recommended)
+
+
+def _recommend_many(engine: RecommendationSystem | IndexedRecommendationSystem, profiles: list[list],
+                    workers: int, seed: int | None) -> list[set[int]]:
+    """Return engine.recommend_batch for every profile in profiles with the seeds given by
+    profile_seeds(seed, len(profiles)), splitting the profiles by page range into batches answered
+    by the given number of worker processes.
+
+    The engine is given to each worker process once, when the process starts, rather than with
+    every batch.
+
+    Preconditions:
+        - all(len(responses) == 8 for responses in profiles)
+        - workers >= 1
+    """
+    seeds = [None] * len(profiles) if seed is None else profile_seeds(seed, len(profiles))
+    groups = {}
+    for i, responses in enumerate(profiles):
+        groups.setdefault(_response_key(responses[0]), []).append(i)
+    if workers == 1 or len(groups) <= 1:
+        return engine.recommend_batch(profiles, seeds)
+
+    # give the largest groups out first, each to the worker with the fewest profiles so far
+    batches = [[] for _ in range(min(workers, len(groups)))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(batches, key=len).extend(group)
+
+    results = [set() for _ in profiles]
+    with ProcessPoolExecutor(len(batches), initializer=_set_worker_engine, initargs=(engine,)) as pool:
+        answers = pool.map(_recommend_worker_batch, [[profiles[i] for i in batch] for batch in batches],
+                           [[seeds[i] for i in batch] for batch in batches])
+        for batch, answer in zip(batches, answers):
+            for i, recommended in zip(batch, answer):
+                results[i] = recommended
+
+    return results
+
+
+def _set_worker_engine(engine: RecommendationSystem | IndexedRecommendationSystem) -> None:
+    """Keep engine as the engine answering the batches of this worker process of _recommend_many."""
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _recommend_worker_batch(profiles: list[list], seeds: list[int | None]) -> list[set[int]]:
+    """Return the recommendations of the engine of this worker process for a batch of _recommend_many."""
+    return _worker_engine.recommend_batch(profiles, seeds)
+
+
+def profile_seeds(seed: int, count: int) -> list[int]:
+    """Return the seeds of the random number generators of count profiles recommended together
+    with IndexedRecommendationSystem.recommend_many with the given seed.
+    """
+    return numpy.random.SeedSequence(seed).generate_state(count, dtype=numpy.uint64).tolist()
+
+
+def _response_key(response: Any) -> Any:
+    """Return a hashable key of response, equal for responses that are matched the same way."""
+    return tuple(response) if isinstance(response, list) else response
+
+
 def _get_match_score(attributes: tuple, responses: list) -> int:
     """Return the match score between attributes and responses.
 
@@ -229,6 +719,147 @@ class BookGraph:
         book1.similar_books.add(book2)
         book2.similar_books.add(book1)
 
+    def disconnect_books(self, book_id1: int, book_id2: int) -> None:
+        """Remove the edge between the books with book_id1 and book_id2 from this book graph,
+        if there is one.
+        """
+        if book_id1 in self.books and book_id2 in self.books:
+            book1 = self.books[book_id1]
+            book2 = self.books[book_id2]
+            book1.similar_books.discard(book2)
+            book2.similar_books.discard(book1)
+
+
+class CSRBookGraph:
+    """A BookGraph stored in compressed sparse row (CSR) form, which keeps the edges of the
+    graph in two flat arrays instead of one Python set per book, so that neighbourhoods can be
+    processed in bulk and the graph can be saved to disk and memory-mapped back.
+
+    Every book in the graph has a dense index, its position in book_ids. The books adjacent to
+    the book with index i have the indices indices[indptr[i]:indptr[i + 1]], in ascending order.
+
+    Instance Attributes:
+        - book_ids: the IDs of the books in this graph, in ascending order
+        - indptr: the start of the neighbours of every book in indices, followed by len(indices)
+        - indices: the dense indices of the neighbours of every book, one book after another
+
+    Representation Invariants:
+        - len(self.indptr) == len(self.book_ids) + 1
+        - every edge appears in the neighbours of both of its endpoints
+    """
+    book_ids: numpy.ndarray
+    indptr: numpy.ndarray
+    indices: numpy.ndarray
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the graph from the arrays returned by CSRBookGraph.arrays."""
+        self.book_ids = arrays['book_ids']
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+
+    @classmethod
+    def from_edges(cls, book_ids: numpy.ndarray, sources: numpy.ndarray, targets: numpy.ndarray) -> CSRBookGraph:
+        """Return the graph of the books in book_ids, sources and targets, in which the books
+        sources[i] and targets[i] are connected for every i.
+
+        Repeated edges and edges from a book to itself are ignored.
+        """
+        vertices = numpy.unique(numpy.concatenate([book_ids, sources, targets]).astype(numpy.int64))
+        sources, targets = numpy.searchsorted(vertices, sources), numpy.searchsorted(vertices, targets)
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+
+        edges = numpy.unique(numpy.concatenate([sources * len(vertices) + targets,
+                                                targets * len(vertices) + sources]))
+        index_type = numpy.int32 if len(vertices) < 2 ** 31 else numpy.int64
+        indptr = numpy.zeros(len(vertices) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(edges // len(vertices), minlength=len(vertices)), out=indptr[1:])
+
+        return cls({'book_ids': vertices, 'indptr': indptr, 'indices': (edges % len(vertices)).astype(index_type)})
+
+    @classmethod
+    def from_books(cls, books: dict[int, Book]) -> CSRBookGraph:
+        """Return the graph connecting every book in books with each of its similar books."""
+        if isinstance(books, BookStore):
+            book_ids = books.arrays['book_id']
+            sources = numpy.repeat(book_ids, numpy.diff(books.arrays['similar_books.offsets']))
+            return cls.from_edges(book_ids, sources, books.arrays['similar_books.ids'])
+
+        sources, targets = [], []
+        for book_id in books:
+            for similar_book_id in books[book_id].similar_books:
+                sources.append(book_id)
+                targets.append(similar_book_id)
+
+        return cls.from_edges(numpy.fromiter(books, dtype=numpy.int64, count=len(books)),
+                              numpy.asarray(sources, dtype=numpy.int64), numpy.asarray(targets, dtype=numpy.int64))
+
+    @classmethod
+    def load(cls, directory: str, sources: list[str]) -> CSRBookGraph | None:
+        """Return the graph saved in directory, memory-mapped read-only, or None if there is no
+        graph saved there or it was built from different source files.
+        """
+        arrays = load_snapshot(directory, sources)
+        return None if arrays is None else cls(arrays)
+
+    def save(self, directory: str, sources: list[str]) -> None:
+        """Save this graph in directory, recording the source files it was built from."""
+        save_snapshot(directory, self.arrays(), sources)
+
+    def arrays(self) -> dict[str, numpy.ndarray]:
+        """Return the arrays this graph is stored in."""
+        return {'book_ids': self.book_ids, 'indptr': self.indptr, 'indices': self.indices}
+
+    def __contains__(self, book_id: int) -> bool:
+        """Return whether book_id is in this graph."""
+        i = numpy.searchsorted(self.book_ids, book_id)
+        return bool(i < len(self.book_ids) and self.book_ids[i] == book_id)
+
+    def __len__(self) -> int:
+        """Return the number of books in this graph."""
+        return len(self.book_ids)
+
+    def index_of(self, book_ids: Iterable[int]) -> numpy.ndarray:
+        """Return the dense indices of the books with the given IDs that are in this graph."""
+        book_ids = numpy.fromiter(book_ids, dtype=numpy.int64)
+        if len(self.book_ids) == 0:
+            return numpy.zeros(0, dtype=numpy.int64)
+
+        positions = numpy.minimum(numpy.searchsorted(self.book_ids, book_ids), len(self.book_ids) - 1)
+        return positions[self.book_ids[positions] == book_ids]
+
+    def degrees(self) -> numpy.ndarray:
+        """Return the number of neighbours of every book, in the order of self.book_ids."""
+        return numpy.diff(self.indptr)
+
+    def degree(self, book_id: int) -> int:
+        """Return the number of books adjacent to the book with book_id, or 0 if it is not in this graph."""
+        indices = self.index_of([book_id])
+        return int(self.indptr[indices[0] + 1] - self.indptr[indices[0]]) if len(indices) else 0
+
+    def neighbours(self, book_id: int) -> numpy.ndarray:
+        """Return the IDs of the books adjacent to the book with book_id, in ascending order."""
+        indices = self.index_of([book_id])
+        if len(indices) == 0:
+            return numpy.zeros(0, dtype=numpy.int64)
+        return self.book_ids[self.indices[self.indptr[indices[0]]:self.indptr[indices[0] + 1]]]
+
+    def expand(self, indices: numpy.ndarray) -> numpy.ndarray:
+        """Return the dense indices of the neighbours of every book with one of the given dense
+        indices, one book after another (so a book adjacent to several of them is repeated).
+        """
+        starts, ends = self.indptr[indices], self.indptr[numpy.asarray(indices) + 1]
+        lengths = ends - starts
+        positions = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(lengths.sum())
+        return self.indices[positions]
+
+    def expand_books(self, book_ids: Iterable[int]) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the IDs of the books adjacent to at least one of the books with the given IDs,
+        in ascending order, and the number of those books each of them is adjacent to.
+        """
+        neighbours, counts = numpy.unique(self.expand(self.index_of(set(book_ids))), return_counts=True)
+        return self.book_ids[neighbours], counts
+
 
 class SimilarBookSystem:
     """A SimilarBookSystem class that represents a recommendation system that searches
@@ -237,17 +868,41 @@ class SimilarBookSystem:
     Books that are similar to each other are connected by an edge in this system's book
     graph.
 
+    The book graph is either a BookGraph, which can be updated one edge at a time and suits
+    books that are edited interactively, or a CSRBookGraph, which is much more compact but
+    read-mostly: adding or removing a book only marks it stale, and it is rebuilt from the
+    books in one pass the next time a query needs it, so a run of edits costs one rebuild.
+
     Instance Attributes:
         - book_graph: a book graph in this system that connects each pair of similar books
         - books: a dictionary that maps each book's ID to the corresponding Book object
+        - in_degrees: a mapping from the ID of every book that is similar to at least one book
+          in books to the number of books in books it is similar to
+        - csr_graph: book_graph in CSR form if it has been needed since the books last changed,
+          otherwise None
+        - is_stale: whether book_graph is a CSRBookGraph that the books have changed since
+
+    Representation Invariants:
+        - not self.is_stale or isinstance(self.book_graph, CSRBookGraph)
     """
-    book_graph: BookGraph
+    book_graph: BookGraph | CSRBookGraph
     books: dict[int, Book]
+    in_degrees: dict[int, int]
+    csr_graph: CSRBookGraph | None
+    is_stale: bool
 
-    def __init__(self, books: dict[int, Book]) -> None:
-        """..."""
-        self.book_graph = BookGraph()
+    def __init__(self, books: dict[int, Book], book_graph: BookGraph | CSRBookGraph | None = None) -> None:
+        """Initialize this similar book system with the given book graph, or with an empty
+        BookGraph if book_graph is None.
+
+        A CSRBookGraph given here, e.g. one loaded with CSRBookGraph.load, is used as is and
+        is not rebuilt by initialize unless it is empty.
+        """
+        self.book_graph = BookGraph() if book_graph is None else book_graph
         self.books = books
+        self.in_degrees = {}
+        self.csr_graph = None
+        self.is_stale = False
 
     def initialize(self) -> None:
         """Initialize this similar book system.
@@ -255,42 +910,352 @@ class SimilarBookSystem:
         Preconditions:
             - self is empty an empty graph
         """
-        for book_id in self.books:
+        if isinstance(self.book_graph, BookGraph):
+            for book_id in self.books:
+                self._index_book(book_id)
+            return
+
+        if len(self.book_graph) == 0:
+            self.book_graph = CSRBookGraph.from_books(self.books)
+        self.in_degrees = _count_in_degrees(self.books)
+
+    def add_book(self, book: Book) -> None:
+        """Add book to the books of this system and update the similar book index.
+
+        Preconditions:
+            - book.book_id not in self.books
+            - self.books supports item assignment
+        """
+        self.books[book.book_id] = book
+        self._index_book(book.book_id)
+        self.csr_graph = None
+        self.is_stale = isinstance(self.book_graph, CSRBookGraph)
+
+    def remove_book(self, book_id: int) -> None:
+        """Remove the book with book_id from the books of this system and update the similar
+        book index.
+
+        Preconditions:
+            - book_id in self.books
+            - self.books supports item deletion
+        """
+        for similar_book_id in self.books[book_id].similar_books:
+            self.in_degrees[similar_book_id] -= 1
+            if self.in_degrees[similar_book_id] == 0:
+                del self.in_degrees[similar_book_id]
+            if isinstance(self.book_graph, BookGraph) and (
+                    similar_book_id not in self.books or book_id not in self.books[similar_book_id].similar_books):
+                self.book_graph.disconnect_books(book_id, similar_book_id)
+
+        del self.books[book_id]
+        self.csr_graph = None
+        self.is_stale = isinstance(self.book_graph, CSRBookGraph)
+
+    def _index_book(self, book_id: int) -> None:
+        """Count the book with book_id in self.books towards the in-degree of every book it is
+        similar to, and add it and its edges to the book graph if it is a BookGraph.
+        """
+        is_book_graph = isinstance(self.book_graph, BookGraph)
+        if is_book_graph and book_id not in self.book_graph:
             self.book_graph.add_book(book_id)
-            similar_books = self.books[book_id].similar_books
-            for similar_book_id in similar_books:
-                self.book_graph.add_book(similar_book_id)
+        for similar_book_id in self.books[book_id].similar_books:
+            if is_book_graph:
                 self.book_graph.connect_books(book_id, similar_book_id)
+            self.in_degrees[similar_book_id] = self.in_degrees.get(similar_book_id, 0) + 1
 
     def recommend(self, books: set[int]) -> set[int]:
         """Return a set of IDs of books that are similar to those in books.
         Every book in the returned set cannot appear in books.
+
+        A book is only returned if at least RELEVANCE_FACTOR books in the library are
+        similar to it, which is looked up in the precomputed in-degrees.
         """
-        counter = {}
         similar_books = set()
 
         for book_id in books:
             similar_books.update(self.books[book_id].similar_books)
 
-        for book_id in similar_books:
-            for lib_book in self.books:
-                if book_id in self.books[lib_book].similar_books:
-                    if book_id not in counter:
-                        counter[book_id] = 1
-                    else:
-                        counter[book_id] += 1
+        return {book for book in similar_books
+                if self.in_degrees.get(book, 0) >= RELEVANCE_FACTOR and book not in books}
+
+    def get_csr_graph(self) -> CSRBookGraph:
+        """Return the book graph of this system in CSR form, rebuilding it first if it is stale."""
+        if self.is_stale:
+            self.book_graph = CSRBookGraph.from_books(self.books)
+            self.is_stale = False
+        if isinstance(self.book_graph, CSRBookGraph):
+            return self.book_graph
+        if self.csr_graph is None:
+            self.csr_graph = CSRBookGraph.from_books(self.books)
+        return self.csr_graph
+
+    def recommend_top_k(self, saved_ids: Iterable[int], k: int,
+                        scorer: str | Callable = 'common_neighbours') -> list[tuple[int, float]]:
+        """Return the IDs and scores of the k books in self.books that are most similar to the
+        books with the given saved_ids, from the highest score to the lowest (ties are broken by
+        the lower ID), excluding the saved books themselves.
+
+        The saved books are treated as the neighbourhood of a single query vertex, and every
+        book adjacent to at least one saved book is scored against it by scorer, which is either
+        a key of SCORERS or a function with the same signature as the functions in SCORERS.
+        Only the neighbourhoods of the saved books are visited, so the time taken depends on
+        their size and on k, not on the number of books.
+
+        Preconditions:
+            - k >= 0
+            - isinstance(scorer, Callable) or scorer in SCORERS
+        """
+        graph = self.get_csr_graph()
+        score = SCORERS[scorer] if isinstance(scorer, str) else scorer
+        saved = graph.index_of(set(saved_ids))
+        candidates, scores = score(graph, saved)
+
+        keep = ~numpy.isin(candidates, saved)
+        ranked = zip(scores[keep].tolist(), graph.book_ids[candidates[keep]].tolist())
+        top_k = heapq.nlargest(k, (pair for pair in ranked if pair[1] in self.books), key=lambda p: (p[0], -p[1]))
+
+        return [(book_id, book_score) for book_score, book_id in top_k]
+
+    def recommend_pagerank(self, saved_ids: Iterable[int], k: int, damping: float = pagerank.DAMPING,
+                           tolerance: float = pagerank.TOLERANCE, max_iterations: int = pagerank.MAX_ITERATIONS,
+                           time_budget: float | None = None, num_walks: int | None = None, workers: int = 1,
+                           seed: int | None = None) -> list[tuple[int, float]]:
+        """Return the IDs and personalized PageRank scores of the k books in self.books with the
+        highest scores for a random walk that restarts at the books with the given saved_ids,
+        from the highest score to the lowest (ties are broken by the lower ID), excluding the
+        saved books themselves.
+
+        Unlike recommend, this reaches books more than one step away from the saved books, so
+        it still finds books when only a few or rarely connected books are saved. The scores
+        are computed by power iteration, stopping once they change by less than tolerance,
+        after max_iterations iterations or after time_budget seconds. If num_walks is given,
+        they are instead estimated from num_walks random walks run by the given number of
+        worker processes, seeded with seed.
+
+        Preconditions:
+            - k >= 0
+            - 0 <= damping < 1
+            - num_walks is None or num_walks >= 1
+            - workers >= 1
+        """
+        graph = self.get_csr_graph()
+        saved = graph.index_of(set(saved_ids))
+        if len(saved) == 0 or k == 0:
+            return []
+
+        if num_walks is None:
+            scores = pagerank.power_iteration(graph.indptr, graph.indices, saved, damping, tolerance,
+                                              max_iterations, time_budget)
+        else:
+            scores = pagerank.monte_carlo(graph.indptr, graph.indices, saved, num_walks, damping, workers, seed,
+                                          time_budget)
+        scores[saved] = 0
+
+        return _top_scores(graph.book_ids, scores, k, self.books)
+
+
+class SimilarBookSession:
+    """A SimilarBookSession class that keeps the similar books of one user's saved books up to
+    date as books are saved and unsaved, without recomputing them from scratch.
+
+    The session keeps, for every book similar to a saved book, the number of saved books it
+    is similar to, so saving or unsaving a book only visits that book's similar books. The
+    recommendations for the most recently used saved sets are kept in a least recently used
+    cache, so switching back to a recent saved set costs nothing.
+
+    The session assumes that the books of system do not change while it is used.
+
+    Instance Attributes:
+        - system: the similar book system whose books and in-degrees are used
+        - saved_books: the IDs of the books currently saved
+        - counts: a mapping from the ID of every book similar to at least one saved book to
+          the number of saved books it is similar to
+        - cache: a mapping from recently used saved sets to their recommendations, from the
+          least to the most recently used
+        - cache_size: the maximum number of saved sets in cache
+
+    Representation Invariants:
+        - all(book_id in self.system.books for book_id in self.saved_books)
+        - all(count > 0 for count in self.counts.values())
+        - len(self.cache) <= self.cache_size
+    """
+    system: SimilarBookSystem
+    saved_books: set[int]
+    counts: dict[int, int]
+    cache: OrderedDict[frozenset[int], frozenset[int]]
+    cache_size: int
+
+    def __init__(self, system: SimilarBookSystem, cache_size: int = SESSION_CACHE_SIZE) -> None:
+        """Initialize a session with no saved books over the given initialized system.
+
+        Preconditions:
+            - cache_size >= 1
+        """
+        self.system = system
+        self.saved_books = set()
+        self.counts = {}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def save(self, book_id: int) -> None:
+        """Add the book with book_id to the saved books, if it is not already saved.
+
+        Preconditions:
+            - book_id in self.system.books
+        """
+        if book_id not in self.saved_books:
+            self.saved_books.add(book_id)
+            for similar_book_id in self.system.books[book_id].similar_books:
+                self.counts[similar_book_id] = self.counts.get(similar_book_id, 0) + 1
+
+    def unsave(self, book_id: int) -> None:
+        """Remove the book with book_id from the saved books, if it is saved."""
+        if book_id in self.saved_books:
+            self.saved_books.remove(book_id)
+            for similar_book_id in self.system.books[book_id].similar_books:
+                self.counts[similar_book_id] -= 1
+                if self.counts[similar_book_id] == 0:
+                    del self.counts[similar_book_id]
+
+    def update(self, saved_books: Iterable[int]) -> None:
+        """Make saved_books the saved books of this session, saving and unsaving only the books
+        that differ from the ones currently saved.
+
+        Preconditions:
+            - all(book_id in self.system.books for book_id in saved_books)
+        """
+        saved_books = set(saved_books)
+        for book_id in self.saved_books - saved_books:
+            self.unsave(book_id)
+        for book_id in saved_books - self.saved_books:
+            self.save(book_id)
+
+    def recommend(self) -> set[int]:
+        """Return the same set of IDs as self.system.recommend(self.saved_books)."""
+        key = frozenset(self.saved_books)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return set(self.cache[key])
+
+        in_degrees = self.system.in_degrees
+        similar_books = frozenset(book for book in self.counts
+                                  if in_degrees.get(book, 0) >= RELEVANCE_FACTOR and book not in key)
+        self.cache[key] = similar_books
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return set(similar_books)
+
+
+def _accumulate(graph: CSRBookGraph, saved: numpy.ndarray,
+                weights: numpy.ndarray | None = None) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the dense indices of the books adjacent to at least one of the books with dense
+    indices saved, in ascending order, and for each of them the sum of weights[i] over every
+    saved[i] it is adjacent to (or the number of those books if weights is None).
+    """
+    neighbours = graph.expand(saved)
+    if weights is not None:
+        weights = numpy.repeat(weights, graph.indptr[saved + 1] - graph.indptr[saved])
+    candidates, inverse = numpy.unique(neighbours, return_inverse=True)
+
+    return candidates, numpy.bincount(inverse.reshape(-1), weights=weights, minlength=len(candidates))
+
+
+def common_neighbours_score(graph: CSRBookGraph, saved: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the dense indices of the books adjacent to at least one of the saved books, and
+    the number of saved books each of them is adjacent to.
+    """
+    return _accumulate(graph, saved)
+
+
+def jaccard_score(graph: CSRBookGraph, saved: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the dense indices of the books adjacent to at least one of the saved books, and
+    the Jaccard similarity between the neighbourhood of each of them and the saved books.
+    """
+    candidates, common = _accumulate(graph, saved)
+    degrees = graph.indptr[candidates + 1] - graph.indptr[candidates]
+    return candidates, common / (len(saved) + degrees - common)
+
+
+def adamic_adar_score(graph: CSRBookGraph, saved: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the dense indices of the books adjacent to at least one of the saved books, and
+    the Adamic-Adar score of each of them: the sum of 1 / log(1 + degree) over the saved books
+    adjacent to it, so that saved books with fewer neighbours count more.
+    """
+    # a saved book with no neighbours contributes nothing, so its weight only has to be finite
+    degrees = numpy.maximum(graph.indptr[saved + 1] - graph.indptr[saved], 1)
+    return _accumulate(graph, saved, 1 / numpy.log1p(degrees))
+
+
+def cosine_score(graph: CSRBookGraph, saved: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the dense indices of the books adjacent to at least one of the saved books, and
+    the cosine similarity between the neighbourhood of each of them and the saved books.
+    """
+    candidates, common = _accumulate(graph, saved)
+    degrees = graph.indptr[candidates + 1] - graph.indptr[candidates]
+    return candidates, common / numpy.sqrt(len(saved) * degrees)
+
+
+SCORERS = {
+    'common_neighbours': common_neighbours_score,
+    'jaccard': jaccard_score,
+    'adamic_adar': adamic_adar_score,
+    'cosine': cosine_score
+}
+
+
+def _top_scores(book_ids: numpy.ndarray, scores: numpy.ndarray, k: int,
+                books: dict[int, Book]) -> list[tuple[int, float]]:
+    """Return the IDs and scores of the k books in books with the highest positive scores, where
+    scores[i] is the score of the book with ID book_ids[i], from the highest score to the lowest
+    (ties are broken by the lower ID).
+
+    Only the highest scores are sorted: the number of books taken from the top is doubled
+    until k of them are in books.
+
+    Preconditions:
+        - k >= 1
+    """
+    candidates = numpy.flatnonzero(scores > 0)
+    top_k = []
+    width = k
+    while len(candidates) > 0 and len(top_k) < k:
+        if width < len(candidates):
+            threshold = numpy.partition(scores[candidates], -width)[-width]
+            batch = candidates[scores[candidates] >= threshold]
+            candidates = candidates[scores[candidates] < threshold]
+        else:
+            batch, candidates = candidates, candidates[:0]
+
+        batch = batch[numpy.lexsort((book_ids[batch], -scores[batch]))]
+        top_k.extend((book_id, score) for book_id, score in zip(book_ids[batch].tolist(), scores[batch].tolist())
+                     if book_id in books)
+        width *= 2
+
+    return top_k[:k]
+
+
+def _count_in_degrees(books: dict[int, Book]) -> dict[int, int]:
+    """Return a mapping from the ID of every book that is similar to at least one book in books
+    to the number of books in books it is similar to.
+    """
+    if isinstance(books, BookStore):
+        similar_book_ids, counts = numpy.unique(books.arrays['similar_books.ids'], return_counts=True)
+        return dict(zip(similar_book_ids.tolist(), counts.tolist()))
 
-        counter = list(counter.items())
-        counter.sort(reverse=True, key=lambda tup: tup[1])
+    in_degrees = {}
+    for book_id in books:
+        for similar_book_id in books[book_id].similar_books:
+            in_degrees[similar_book_id] = in_degrees.get(similar_book_id, 0) + 1
 
-        return {book for book, book_freq in counter
-                if book_freq >= RELEVANCE_FACTOR and book not in books}
+    return in_degrees
 
 
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'extra-imports': ['__future__', 'typing', 'book', 'random'],
-        'disable': ['too-many-nested-blocks']
+        'extra-imports': ['__future__', 'collections', 'collections.abc', 'concurrent.futures', 'typing', 'heapq',
+                          'random', 'numpy', 'book', 'book_store', 'pagerank', 'snapshot'],
+        'disable': ['too-many-nested-blocks', 'global-statement']
     })
@@ -0,0 +1,415 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a headless HTTP/JSON server for our book
+recommendation system, built on asyncio and the standard library. The
+library is loaded once, and the queries are answered by a pool of worker
+processes, each given the recommendation systems once when it starts, so
+that the event loop keeps accepting connections while they run and the
+queries run in parallel rather than one at a time under the GIL. Every
+response reports how long the request took to answer.
+
+The server exposes the following endpoints, all of which return json:
+
+    - POST /recommend with {"responses": [...]}: the books recommended for the
+      eight responses taken by RecommendationSystem.recommend
+    - POST /similar with {"saved_ids": [...]}: the books similar to the saved books
+    - GET /books/<id>: the book with the given id
+    - GET /search?q=<text>&k=<count>: the k books whose title and description best match
+      the words of text, with their BM25 scores
+
+Run the main block of this module to start the server on HOST:PORT.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import json
+import time
+from book import Book
+from recommendation_system import CSRBookGraph, IndexedRecommendationSystem, SimilarBookSystem
+from text_search import TextIndex
+
+
+HOST = '127.0.0.1'
+PORT = 8000
+SERVER_WORKERS = 4
+SEARCH_RESULTS = 10
+MAX_BODY_SIZE = 1 << 20
+
+# The service answering the queries of a worker process of a RecommendationServer.
+_worker_service = None
+
+
+class RequestError(Exception):
+    """An error in a request, answered with the given HTTP status and message.
+
+    Instance Attributes:
+        - status: the HTTP status of the response to the request
+        - message: the description of the error sent in the response
+    """
+    status: HTTPStatus
+    message: str
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        """Initialize the error with the given status and message."""
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+    def __reduce__(self) -> tuple[type, tuple[HTTPStatus, str]]:
+        """Return how to pickle this error, so that it can be raised in a worker process."""
+        return RequestError, (self.status, self.message)
+
+
+class BookService:
+    """The queries answered by the server, over one library of books.
+
+    Every query only reads the recommendation systems, so every worker process of a server
+    answers them with its own copy of the service.
+
+    Instance Attributes:
+        - books: a mapping from each book's ID to the corresponding Book object
+        - rec_sys: the system answering /recommend
+        - sim_sys: the system answering /similar
+        - text_index: the full-text index answering /search
+
+    Representation Invariants:
+        - len(self.text_index) == len(self.books)
+    """
+    books: dict[int, Book]
+    rec_sys: IndexedRecommendationSystem
+    sim_sys: SimilarBookSystem
+    text_index: TextIndex
+
+    def __init__(self, books: dict[int, Book], text_index: TextIndex | None = None,
+                 similar_graph: CSRBookGraph | None = None) -> None:
+        """Initialize the service and build its recommendation systems over books.
+
+        text_index is the full-text index of books, which is built here if it is None, and
+        similar_graph is the graph of similar books of books, e.g. the one loaded by
+        main.load_library, which is built here if it is None.
+        """
+        self.books = books
+        self.rec_sys = IndexedRecommendationSystem(books)
+        self.rec_sys.initialize()
+        self.sim_sys = SimilarBookSystem(books, similar_graph)
+        self.sim_sys.initialize()
+        self.text_index = TextIndex.from_books(books) if text_index is None else text_index
+
+    def recommend(self, responses: list) -> dict[str, Any]:
+        """Return the books recommended for responses, from the best to the worst rated.
+
+        Preconditions:
+            - len(responses) == 8
+        """
+        responses = [tuple(responses[0])] + list(responses[1:])
+        book_ids = self.rec_sys.recommend(responses)
+        return {'books': self._summaries(sorted(book_ids, key=self._rating_key))}
+
+    def similar(self, saved_ids: list[int]) -> dict[str, Any]:
+        """Return the books similar to the books with saved_ids, from the best to the worst rated."""
+        saved_ids = {book_id for book_id in saved_ids if book_id in self.books}
+        book_ids = [book_id for book_id in self.sim_sys.recommend(saved_ids) if book_id in self.books]
+        return {'books': self._summaries(sorted(book_ids, key=self._rating_key))}
+
+    def lookup(self, book_id: int) -> dict[str, Any]:
+        """Return every attribute of the book with book_id.
+
+        Raise RequestError if there is no such book.
+        """
+        if book_id not in self.books:
+            raise RequestError(HTTPStatus.NOT_FOUND, f'no book with id {book_id}')
+        return self.books[book_id].to_dict()
+
+    def search(self, query: str, k: int) -> dict[str, Any]:
+        """Return the k books whose title and description best match the words of query,
+        from the best to the worst match, with their BM25 scores.
+        """
+        results = self.text_index.search(query, k)
+        books = self._summaries([book_id for book_id, _ in results])
+        for book, (_, score) in zip(books, results):
+            book['score'] = round(score, 6)
+        return {'books': books}
+
+    def _rating_key(self, book_id: int) -> tuple[float, int]:
+        """Return the key that orders book IDs from the best to the worst rated book, as in the GUI."""
+        book = self.books[book_id]
+        return -book.average_rating, -book.ratings_count
+
+    def _summaries(self, book_ids: list[int]) -> list[dict[str, Any]]:
+        """Return the ID and title of every book with one of book_ids, in the same order."""
+        return [{'book_id': book_id, 'title': self.books[book_id].title} for book_id in book_ids]
+
+
+class RecommendationServer:
+    """An asyncio HTTP server answering the queries of a BookService with json.
+
+    Instance Attributes:
+        - service: the service answering the queries
+        - executor: the pool of worker processes the queries run in, each holding a copy of service
+    """
+    service: BookService
+    executor: ProcessPoolExecutor
+
+    def __init__(self, service: BookService, workers: int = SERVER_WORKERS) -> None:
+        """Initialize the server with the given service and number of worker processes.
+
+        The service is given to each worker process once, when the process starts, rather than
+        with every query.
+
+        Preconditions:
+            - workers >= 1
+        """
+        self.service = service
+        self.executor = ProcessPoolExecutor(workers, initializer=_set_worker_service, initargs=(service,))
+
+    async def start(self, host: str = HOST, port: int = PORT) -> asyncio.Server:
+        """Start accepting connections on host:port and return the asyncio server doing so.
+
+        If port is 0, a free port is chosen, which can be read from the sockets of the returned server.
+
+        The worker processes are started first, so that they never inherit the socket of a
+        connection, which would keep it open after the server closes it.
+        """
+        if not await asyncio.get_running_loop().run_in_executor(self.executor, _is_worker_ready):
+            raise RuntimeError('the worker processes have no service')
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self) -> None:
+        """Stop the worker processes of this server."""
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer every request sent over one connection until the client closes it or asks
+        for it to be closed.
+        """
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as error:
+                    await _write_response(writer, error.status, {'error': error.message}, False)
+                    break
+                if request is None:
+                    break
+
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                start = time.perf_counter()
+                try:
+                    status, payload = HTTPStatus.OK, await self.route(method, target, body)
+                except RequestError as error:
+                    status, payload = error.status, {'error': error.message}
+                except Exception:
+                    # a failure in a query is answered, rather than dropping the connection
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'internal server error'}
+                payload['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+                await _write_response(writer, status, payload, keep_alive)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, target: str, body: bytes) -> dict[str, Any]:
+        """Return the response payload of the request for target with the given method and body.
+
+        Raise RequestError if the request is invalid.
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip('/')
+
+        if path == '/recommend':
+            data = _json_body(method, body)
+            responses = data.get('responses')
+            _check_responses(responses)
+            return await self._run('recommend', responses)
+
+        if path == '/similar':
+            saved_ids = _json_body(method, body).get('saved_ids')
+            if not isinstance(saved_ids, list) or not all(isinstance(book_id, int) for book_id in saved_ids):
+                raise RequestError(HTTPStatus.BAD_REQUEST, 'saved_ids must be a list of book ids')
+            return await self._run('similar', saved_ids)
+
+        if path.startswith('/books/'):
+            _check_method(method, 'GET')
+            book_id = _parse_count(path[len('/books/'):])
+            if book_id is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, f'no book with id {path[len("/books/"):]}')
+            return await self._run('lookup', book_id)
+
+        if path == '/search':
+            _check_method(method, 'GET')
+            query = parse_qs(url.query)
+            k = _parse_count(query.get('k', [str(SEARCH_RESULTS)])[0])
+            if k is None:
+                raise RequestError(HTTPStatus.BAD_REQUEST, 'k must be a non-negative integer')
+            return await self._run('search', query.get('q', [''])[0], k)
+
+        raise RequestError(HTTPStatus.NOT_FOUND, f'no endpoint {url.path}')
+
+    async def _run(self, query: str, *args: Any) -> dict[str, Any]:
+        """Return the answer of the method of BookService named query to args, run in a worker
+        process of this server.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, _answer, query, args)
+
+
+def _set_worker_service(service: BookService) -> None:
+    """Keep service as the service answering the queries of this worker process."""
+    global _worker_service
+    _worker_service = service
+
+
+def _is_worker_ready() -> bool:
+    """Return whether this worker process has a service to answer queries with."""
+    return _worker_service is not None
+
+
+def _answer(query: str, args: tuple) -> dict[str, Any]:
+    """Return the answer of the method of the service of this worker process named query to args."""
+    return getattr(_worker_service, query)(*args)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str], bytes] | None:
+    """Return the method, target, headers (with lower-case names) and body of the next request
+    read from reader, or None if the connection was closed before another complete request.
+
+    Raise RequestError if the request is malformed.
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError as error:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'request head is too large') from error
+
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3:
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'malformed request line')
+
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name:
+            headers[name.strip().lower()] = value.strip()
+
+    length = _parse_count(headers.get('content-length', '0'))
+    if length is None or length > MAX_BODY_SIZE:
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'invalid content length')
+
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return parts[0], parts[1], headers, body
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict[str, Any],
+                          keep_alive: bool) -> None:
+    """Write a json response with the given status and payload to writer."""
+    body = json.dumps(payload).encode('utf-8')
+    head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'X-Response-Time-Ms: {payload.get("latency_ms", 0)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+def _parse_count(text: str) -> int | None:
+    """Return the non-negative integer written in ASCII decimal digits in text, or None if text
+    is not one, e.g. because it has other Unicode digits such as '²', which int does not accept.
+    """
+    if text == '' or not text.isascii() or not text.isdecimal():
+        return None
+    return int(text)
+
+
+def _check_method(method: str, allowed: str) -> None:
+    """Raise RequestError if method is not the allowed method of an endpoint."""
+    if method != allowed:
+        raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f'use {allowed} for this endpoint')
+
+
+def _check_responses(responses: Any) -> None:
+    """Raise RequestError if responses is not a list of 8 responses as taken by
+    RecommendationSystem.recommend in json: a list of two integers (the page range), two lists
+    of strings (the countries and languages) and five strings, numbers, booleans or nulls.
+    """
+    if not isinstance(responses, list) or len(responses) != 8:
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'responses must be a list of 8 responses')
+    page_range = responses[0]
+    if not (isinstance(page_range, list) and len(page_range) == 2
+            and all(isinstance(pages, int) and not isinstance(pages, bool) for pages in page_range)):
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'responses[0] must be a list of two integers')
+    for i in (1, 2):
+        if not isinstance(responses[i], list) or not all(isinstance(value, str) for value in responses[i]):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'responses[{i}] must be a list of strings')
+    for i in range(3, 8):
+        if responses[i] is not None and not isinstance(responses[i], (str, int, float, bool)):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'responses[{i}] must be a string, number, boolean or null')
+
+
+def _json_body(method: str, body: bytes) -> dict[str, Any]:
+    """Return the json object in the body of a POST request.
+
+    Raise RequestError if the request is not a POST request or its body is not a json object.
+    """
+    _check_method(method, 'POST')
+    try:
+        data = json.loads(body)
+    except ValueError as error:
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'body must be a json object') from error
+    if not isinstance(data, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'body must be a json object')
+    return data
+
+
+async def serve(books: dict[int, Book], host: str = HOST, port: int = PORT, workers: int = SERVER_WORKERS,
+                text_index: TextIndex | None = None, similar_graph: CSRBookGraph | None = None) -> None:
+    """Serve the queries of a BookService over books, with the full-text index text_index and the
+    graph of similar books similar_graph (built if they are None), on host:port with the given
+    number of worker processes until cancelled.
+    """
+    recommendation_server = RecommendationServer(BookService(books, text_index, similar_graph), workers)
+    try:
+        server = await recommendation_server.start(host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        recommendation_server.close()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'concurrent.futures', 'http', 'typing', 'urllib.parse', 'asyncio', 'json',
+                          'time', 'book', 'recommendation_system', 'text_search', 'main'],
+        'disable': ['forbidden-IO-function', 'broad-exception-caught', 'global-statement']
+    })
+
+    from main import INGEST_WORKERS, load_library
+    library = load_library(INGEST_WORKERS)
+    asyncio.run(serve(library.books, text_index=library.text_index, similar_graph=library.similar_graph))
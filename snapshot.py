@@ -0,0 +1,135 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the functions used to save the fully built library
+to disk and to read it back. A snapshot is a directory holding one .npy
+file per column array, which is memory-mapped when it is read so that
+only the parts of a column that are used get paged in, and a small json
+header recording the schema version of the snapshot and a content hash
+of every source data file it was built from. A snapshot whose header
+does not match the current schema version or source files is stale and
+is not loaded.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from typing import Any
+import hashlib
+import json
+import os
+import numpy
+
+
+SNAPSHOT_DIRECTORY = 'data/snapshot'
+SCHEMA_VERSION = 4
+HEADER_FILENAME = 'header.json'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def save_snapshot(directory: str, arrays: dict[str, numpy.ndarray], sources: list[str]) -> None:
+    """Save arrays as a snapshot in directory, recording the current content of the source files.
+
+    The header is removed first and written last, so an interrupted save never leaves a
+    snapshot behind that looks valid. Every array is written to a temporary file that then
+    replaces the old one, so the arrays of an earlier load_snapshot stay readable.
+    """
+    os.makedirs(directory, exist_ok=True)
+    header_path = os.path.join(directory, HEADER_FILENAME)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+
+    for name, array in arrays.items():
+        path = os.path.join(directory, name + '.npy')
+        with open(path + '.tmp', 'wb') as file:
+            numpy.save(file, numpy.ascontiguousarray(array), allow_pickle=False)
+        os.replace(path + '.tmp', path)
+
+    _write_header(directory, {
+        'schema_version': SCHEMA_VERSION,
+        'sources': {source: _fingerprint(source) for source in sources},
+        'arrays': sorted(arrays)
+    })
+
+
+def load_snapshot(directory: str, sources: list[str]) -> dict[str, numpy.ndarray] | None:
+    """Return the arrays of the snapshot in directory, memory-mapped read-only, or None if there
+    is no complete snapshot there or it is stale.
+
+    A snapshot is stale if it has a different schema version or if the content of any of the
+    source files differs from when it was saved. The content hash of a source file is only
+    recomputed when its size or modification time has changed.
+    """
+    try:
+        with open(os.path.join(directory, HEADER_FILENAME)) as file:
+            header = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if header.get('schema_version') != SCHEMA_VERSION or set(header.get('sources', {})) != set(sources):
+        return None
+
+    for source in sources:
+        recorded = header['sources'][source]
+        if not os.path.exists(source):
+            return None
+        stat = os.stat(source)
+        if (recorded['size'], recorded['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            fingerprint = _fingerprint(source)
+            if fingerprint['sha256'] != recorded['sha256']:
+                return None
+            header['sources'][source] = fingerprint
+            _write_header(directory, header)
+
+    return {name: _load_array(os.path.join(directory, name + '.npy')) for name in header['arrays']}
+
+
+def _load_array(path: str) -> numpy.ndarray:
+    """Return the array saved at path, memory-mapped read-only unless it is empty."""
+    try:
+        return numpy.load(path, mmap_mode='r', allow_pickle=False)
+    except ValueError:
+        # empty arrays cannot be memory-mapped
+        return numpy.load(path, allow_pickle=False)
+
+
+def _fingerprint(source: str) -> dict[str, Any]:
+    """Return the size, modification time and sha256 content hash of the file source."""
+    digest = hashlib.sha256()
+    with open(source, 'rb') as file:
+        block = file.read(HASH_BLOCK_SIZE)
+        while block:
+            digest.update(block)
+            block = file.read(HASH_BLOCK_SIZE)
+
+    stat = os.stat(source)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def _write_header(directory: str, header: dict[str, Any]) -> None:
+    """Atomically write header as the header of the snapshot in directory."""
+    path = os.path.join(directory, HEADER_FILENAME)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(header, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'typing', 'hashlib', 'json', 'os', 'numpy'],
+        'disable': ['forbidden-IO-function']
+    })
@@ -0,0 +1,232 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module generates synthetic book and author data files in the same
+format as the Goodreads data files read by main.py and author.py, so that
+the system can be run and measured without the real data and at any size.
+
+The generated catalogue is random but reproducible from a seed, and has
+the skewed distributions of real catalogues: a few authors and publishers
+write most of the books, description words follow a Zipf law, the number
+of ratings is log-normal, most books have only a few similar books while
+some have many, and popular books are listed as similar books much more
+often than others. A small fraction of the records is missing a required
+field, so that they are rejected when the data is read, as in the real data.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from typing import Any
+import gzip
+import json
+import os
+import numpy
+from genre import GENRES
+
+
+BOOKS_FILENAME = 'books.json.gz'
+AUTHORS_FILENAME = 'authors.json.gz'
+SEED = 111
+CHUNK_SIZE = 10000
+# Writing the files is dominated by compression, so the fastest gzip level is used.
+COMPRESS_LEVEL = 1
+
+BOOKS_PER_AUTHOR = 4
+BOOKS_PER_PUBLISHER = 50
+VOCABULARY_SIZE = 20000
+# Exponents of the Zipf laws followed by the popularity of authors, publishers, description
+# words and similar books.
+AUTHOR_SKEW = 1.1
+PUBLISHER_SKEW = 1.2
+WORD_SKEW = 1.05
+SIMILAR_SKEW = 0.8
+# The fraction of books without similar books, and the fraction of similar book IDs that are
+# not in the catalogue.
+NO_SIMILAR_BOOKS = 0.3
+UNKNOWN_SIMILAR_BOOKS = 0.1
+MAX_SIMILAR_BOOKS = 60
+# The fraction of records missing a required field.
+REJECTED = 0.03
+SERIES = 0.1
+
+COUNTRIES = {'US': 0.7, 'GB': 0.12, 'CA': 0.08, 'AU': 0.05, 'IN': 0.05}
+LANGUAGES = {'eng': 0.6, 'en-US': 0.15, 'en-GB': 0.07, 'spa': 0.05, 'fre': 0.04, 'ger': 0.03, 'ita': 0.02,
+             'jpn': 0.02, 'por': 0.02}
+OTHER_SHELVES = ('to-read', 'currently-reading', 'favorites', 'owned', 'books-i-own', 'kindle', 'library',
+                 'default')
+SYLLABLES = ('ka', 'lo', 'mi', 'ren', 'tha', 'vor', 'el', 'dan', 'shi', 'qu', 'ar', 'bel', 'cor', 'den', 'fi', 'gal',
+             'hor', 'is', 'jun', 'kel', 'lis', 'mor', 'nal', 'os', 'pra', 'ril', 'sol', 'tur', 'ul', 'ven', 'zar')
+FIRST_NAMES = ('Anna', 'Ben', 'Chloe', 'David', 'Emma', 'Farah', 'George', 'Hana', 'Ivan', 'Julia', 'Kenji', 'Laura',
+               'Mohamed', 'Nina', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Tara', 'Uma', 'Victor', 'Wei', 'Yara')
+LAST_NAMES = ('Adams', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Hughes', 'Ito', 'Jones', 'Khan', 'Lee',
+              'Martin', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Smith', 'Tanaka', 'Walker', 'Young', 'Zhang')
+
+
+def generate_catalogue(num_books: int, directory: str, seed: int = SEED) -> dict[str, Any]:
+    """Write a synthetic catalogue of num_books books, generated from seed, to the files
+    BOOKS_FILENAME and AUTHORS_FILENAME in directory, and return a summary of it.
+
+    The same num_books and seed always give the same files.
+
+    Preconditions:
+        - num_books >= 1
+    """
+    rng = numpy.random.default_rng(seed)
+    num_authors = max(1, num_books // BOOKS_PER_AUTHOR)
+    num_publishers = max(1, num_books // BOOKS_PER_PUBLISHER)
+
+    book_ids = rng.choice(10 * num_books, size=num_books, replace=False) + 1
+    author_ids = rng.choice(10 * num_authors, size=num_authors, replace=False) + 1
+    vocabulary = _vocabulary(rng, VOCABULARY_SIZE)
+    publishers = [f'{_capitalized(vocabulary[i])} {suffix}' for i, suffix in
+                  zip(rng.integers(0, len(vocabulary), num_publishers), rng.choice(['Press', 'Books', 'Publishing'],
+                                                                                   num_publishers))]
+    # books are popular in a random order, independent of their IDs
+    popularity = rng.permutation(num_books)
+
+    os.makedirs(directory, exist_ok=True)
+    num_records = 0
+    with gzip.open(os.path.join(directory, BOOKS_FILENAME), 'wt', encoding='utf-8',
+                   compresslevel=COMPRESS_LEVEL) as file:
+        for start in range(0, num_books, CHUNK_SIZE):
+            records = _book_records(rng, start, min(start + CHUNK_SIZE, num_books), book_ids, popularity,
+                                    author_ids, publishers, vocabulary)
+            file.writelines(json.dumps(record) + '\n' for record in records)
+            num_records += len(records)
+
+    with gzip.open(os.path.join(directory, AUTHORS_FILENAME), 'wt', encoding='utf-8',
+                   compresslevel=COMPRESS_LEVEL) as file:
+        first_names = rng.choice(FIRST_NAMES, num_authors)
+        last_names = rng.choice(LAST_NAMES, num_authors)
+        for author_id, first_name, last_name in zip(author_ids.tolist(), first_names, last_names):
+            file.write(json.dumps({'average_rating': f'{rng.normal(3.9, 0.3):.2f}', 'author_id': str(author_id),
+                                   'text_reviews_count': str(int(rng.lognormal(3, 1.5))),
+                                   'name': f'{first_name} {last_name}',
+                                   'ratings_count': str(int(rng.lognormal(5, 2)))}) + '\n')
+
+    return {'books': num_records, 'authors': num_authors, 'publishers': num_publishers, 'seed': seed}
+
+
+def _book_records(rng: numpy.random.Generator, start: int, end: int, book_ids: numpy.ndarray,
+                  popularity: numpy.ndarray, author_ids: numpy.ndarray, publishers: list[str],
+                  vocabulary: list[str]) -> list[dict[str, Any]]:
+    """Return the json records of the books with the given indexes start to end - 1 in book_ids."""
+    count = end - start
+    ratings_counts = numpy.minimum(rng.lognormal(4, 2, count), 5e6).astype(numpy.int64)
+    average_ratings = numpy.clip(rng.normal(3.9, 0.35, count), 1, 5)
+    num_pages = numpy.clip(rng.lognormal(5.6, 0.5, count), 10, 3000).astype(numpy.int64)
+    years = numpy.maximum(2017 - rng.exponential(12, count).astype(numpy.int64), 1800)
+    num_authors = numpy.minimum(rng.geometric(0.7, count), 4)
+    authors = _zipf_choice(rng, len(author_ids), AUTHOR_SKEW, int(num_authors.sum()))
+    book_publishers = _zipf_choice(rng, len(publishers), PUBLISHER_SKEW, count)
+    countries = rng.choice(list(COUNTRIES), count, p=list(COUNTRIES.values()))
+    languages = rng.choice(list(LANGUAGES), count, p=list(LANGUAGES.values()))
+    description_lengths = rng.integers(15, 150, count)
+    words = _zipf_choice(rng, len(vocabulary), WORD_SKEW, int(description_lengths.sum()))
+    title_lengths = rng.integers(1, 5, count)
+    title_words = _zipf_choice(rng, len(vocabulary), WORD_SKEW, int(title_lengths.sum()))
+
+    num_similar = numpy.where(rng.random(count) < NO_SIMILAR_BOOKS, 0,
+                              numpy.minimum(rng.lognormal(1.5, 0.8, count).astype(numpy.int64) + 1, MAX_SIMILAR_BOOKS))
+    similar = popularity[_zipf_choice(rng, len(book_ids), SIMILAR_SKEW, int(num_similar.sum()))]
+    similar_ids = numpy.where(rng.random(len(similar)) < UNKNOWN_SIMILAR_BOOKS,
+                              rng.integers(10 * len(book_ids) + 1, 20 * len(book_ids), len(similar)),
+                              book_ids[similar])
+
+    series = numpy.where(rng.random(count) < SERIES, rng.integers(1, 8, count), 0)
+    is_ebook = rng.random(count) < 0.3
+    # every book is on a random subset of the shelves, with log-normal counts of users
+    num_shelves = rng.integers(3, 16, count)
+    shelves = numpy.argsort(rng.random((count, len(GENRES) + len(OTHER_SHELVES))), axis=1)
+    shelf_counts = rng.lognormal(2.5, 1.5, (count, shelves.shape[1])).astype(numpy.int64)
+    missing = rng.random(count) < REJECTED
+
+    records = []
+    author_start, word_start, title_start, similar_start = 0, 0, 0, 0
+    for i in range(count):
+        title = ' '.join(_capitalized(vocabulary[word]) for word in
+                         title_words[title_start:title_start + title_lengths[i]].tolist())
+        title_start += title_lengths[i]
+        if series[i] != 0:
+            title = f'{title} (Book {series[i]})'
+        description = ' '.join(vocabulary[word] for word in words[word_start:word_start + description_lengths[i]]
+                               .tolist()) + '.'
+        word_start += description_lengths[i]
+        book_authors = author_ids[authors[author_start:author_start + num_authors[i]]].tolist()
+        author_start += num_authors[i]
+        book_similar = similar_ids[similar_start:similar_start + num_similar[i]].tolist()
+        similar_start += num_similar[i]
+
+        book_id = int(book_ids[start + i])
+        records.append({
+            'book_id': str(book_id),
+            'title': title,
+            'title_without_series': title.split(' (Book')[0],
+            'is_ebook': 'true' if is_ebook[i] else 'false',
+            'authors': [{'author_id': str(author_id), 'role': ''} for author_id in dict.fromkeys(book_authors)],
+            'publisher': publishers[book_publishers[i]],
+            'publication_year': str(years[i]),
+            'country_code': str(countries[i]),
+            'language_code': '' if missing[i] else str(languages[i]),
+            'num_pages': str(num_pages[i]),
+            'popular_shelves': [{'count': str(shelf_count), 'name': _shelf_name(shelf)} for shelf, shelf_count
+                                in zip(shelves[i, :num_shelves[i]].tolist(), shelf_counts[i].tolist())],
+            'average_rating': f'{average_ratings[i]:.2f}',
+            'ratings_count': str(ratings_counts[i]),
+            'description': description,
+            'similar_books': [str(similar_id) for similar_id in book_similar],
+            'link': f'https://www.goodreads.com/book/show/{book_id}'
+        })
+
+    return records
+
+
+def _zipf_choice(rng: numpy.random.Generator, n: int, skew: float, size: int) -> numpy.ndarray:
+    """Return size random integers from 0 to n - 1, where i is drawn with a probability
+    proportional to 1 / (i + 1) ** skew.
+    """
+    weights = 1 / numpy.arange(1, n + 1, dtype=numpy.float64) ** skew
+    cumulative = numpy.cumsum(weights)
+    return numpy.minimum(numpy.searchsorted(cumulative, rng.random(size) * cumulative[-1], side='right'), n - 1)
+
+
+def _vocabulary(rng: numpy.random.Generator, size: int) -> list[str]:
+    """Return size distinct made-up words of two to four syllables, in a random order."""
+    words = set()
+    while len(words) < size:
+        lengths = rng.integers(2, 5, size)
+        syllables = rng.integers(0, len(SYLLABLES), (size, 4))
+        words.update(''.join(SYLLABLES[s] for s in row[:length]) for row, length in zip(syllables.tolist(), lengths))
+    return rng.permutation(sorted(words)[:size]).tolist()
+
+
+def _capitalized(word: str) -> str:
+    """Return word with its first letter in upper case."""
+    return word[:1].upper() + word[1:]
+
+
+def _shelf_name(shelf: int) -> str:
+    """Return the name of the shelf with the given index among GENRES and OTHER_SHELVES."""
+    return GENRES[shelf] if shelf < len(GENRES) else OTHER_SHELVES[shelf - len(GENRES)]
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'typing', 'gzip', 'json', 'os', 'numpy', 'genre'],
+        'disable': ['forbidden-IO-function', 'too-many-locals']
+    })
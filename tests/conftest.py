@@ -0,0 +1,61 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the pytest fixtures shared by our tests. The tests
+run on a small synthetic catalogue written by synthetic_data.py to a
+temporary directory, so they never read or change the real data files.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections.abc import Iterator
+import os
+import pytest
+from synthetic_data import generate_catalogue
+
+
+NUM_BOOKS = 2000
+
+
+@pytest.fixture(scope='session')
+def catalogue_directory(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Return a directory holding a synthetic catalogue of NUM_BOOKS books in its data
+    subdirectory, where main.py and author.py look for the data files.
+    """
+    directory = tmp_path_factory.mktemp('catalogue')
+    generate_catalogue(NUM_BOOKS, str(directory / 'data'))
+    return str(directory)
+
+
+@pytest.fixture
+def in_catalogue(catalogue_directory: str) -> Iterator[str]:
+    """Run the test in catalogue_directory, so that the data files are read from the synthetic
+    catalogue, and return to the previous working directory afterwards.
+    """
+    working_directory = os.getcwd()
+    os.chdir(catalogue_directory)
+    try:
+        yield catalogue_directory
+    finally:
+        os.chdir(working_directory)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'collections.abc', 'os', 'pytest', 'synthetic_data']
+    })
@@ -0,0 +1,110 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of autocomplete.py, run with pytest over
+the synthetic catalogue of conftest.py. The completions of every prefix
+are checked against a brute force scan of all completions, both when
+they are ranked directly and when the completions are visited from the
+most popular one.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import random
+import autocomplete
+from autocomplete import COMPLETION_FIELDS, AutocompleteIndex, build_indexes
+from book import Book
+from library import Library
+from main import load_data
+import pytest
+
+
+def all_completions(books: dict[int, Book]) -> dict[str, list[tuple[str, str, int]]]:
+    """Return the key, label and score of every completion of every field in COMPLETION_FIELDS."""
+    totals = {'title': {}, 'publisher': {}, 'author': {}}
+    for book in books.values():
+        for field, value in (('title', book.title), ('publisher', book.publisher)):
+            totals[field][(value, value)] = totals[field].get((value, value), 0) + book.ratings_count
+        for author_id, name in book.authors.items():
+            label = (name, f'{name} (ID {author_id})')
+            totals['author'][label] = totals['author'].get(label, 0) + book.ratings_count
+
+    completions = {field: [(key, label, score) for (key, label), score in totals[field].items()] for field in totals}
+    completions['book_id'] = [(str(book.book_id), str(book.book_id), book.ratings_count) for book in books.values()]
+    return completions
+
+
+def brute_force_complete(completions: list[tuple[str, str, int]], prefix: str, n: int) -> list[str]:
+    """Return what AutocompleteIndex.complete should return, by scanning every completion."""
+    matches = [(key.casefold(), label, score) for key, label, score in completions
+               if key.casefold().startswith(prefix.casefold())]
+    matches.sort(key=lambda match: (-match[2], match[0], match[1]))
+    return [label for _, label, _ in matches[:n]]
+
+
+def random_prefixes(completions: list[tuple[str, str, int]], rng: random.Random) -> list[str]:
+    """Return prefixes of random keys of completions, of every length, some of them in upper case,
+    together with the empty prefix, single characters and a prefix of no key.
+    """
+    prefixes = ['', 'a', 'T', '1', 'zzzzzz']
+    for key, _, _ in rng.sample(completions, 30):
+        prefix = key[:rng.randint(1, len(key))]
+        prefixes.append(prefix.upper() if rng.random() < 0.3 else prefix)
+    return prefixes
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+@pytest.mark.parametrize('rank_limit', [autocomplete.RANK_LIMIT, 0, 20])
+def test_complete_matches_brute_force(in_catalogue: str, monkeypatch: pytest.MonkeyPatch, columnar: bool,
+                                      rank_limit: int) -> None:
+    """Test that complete gives the same labels as a brute force scan for random prefixes, when
+    the matching completions are ranked directly and when they are found by walking the
+    completions from the most popular one, over chunks smaller than the index.
+    """
+    monkeypatch.setattr(autocomplete, 'RANK_LIMIT', rank_limit)
+    monkeypatch.setattr(autocomplete, 'SCAN_CHUNK', 7)
+    library = Library(columnar=columnar)
+    library.load_books(load_data())
+    indexes = build_indexes(library.books)
+    completions = all_completions(library.books)
+    rng = random.Random(121)
+
+    assert sorted(indexes) == sorted(COMPLETION_FIELDS)
+    for field in COMPLETION_FIELDS:
+        assert len(indexes[field]) == len(completions[field])
+        for prefix in random_prefixes(completions[field], rng):
+            for n in (0, 1, 10, len(completions[field])):
+                assert indexes[field].complete(prefix, n) == brute_force_complete(completions[field], prefix, n)
+
+
+def test_complete_breaks_ties_by_key() -> None:
+    """Test that completions with the same score are returned in key order, ignoring case,
+    whichever way they are found.
+    """
+    keys = ['beta', 'Alpha', 'alpine', 'ALTO', 'b']
+    index = AutocompleteIndex(keys, keys, [5, 5, 9, 5, 5])
+    assert index.complete('al') == ['alpine', 'Alpha', 'ALTO']
+    assert index.complete('') == ['alpine', 'Alpha', 'ALTO', 'b', 'beta']
+    assert index.complete('B', 1) == ['b']
+    assert index.complete('c') == []
+
+    assert index._scan(0, len(index), 10).tolist() == [1, 0, 2, 3, 4]
+    assert index._scan(2, 5, 1).tolist() == [2]
+    assert index._scan(0, len(index), 0).tolist() == []
+
+
+if __name__ == '__main__':
+    pytest.main(['test_autocomplete.py'])
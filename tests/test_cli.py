@@ -0,0 +1,94 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of cli.py, run with pytest on the
+synthetic catalogue of conftest.py.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import json
+import os
+import subprocess
+import sys
+import time
+import pytest
+import cli
+
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lookup_startup_is_within_budget(in_catalogue: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a lookup run in a new process answers within cli.STARTUP_BUDGET seconds and
+    imports none of cli.HEAVY_MODULES, once the library snapshot is built.
+    """
+    assert cli.main(['--workers', '1', 'build-cache']) == 0
+    capsys.readouterr()
+    book_id = _first_book_id()
+
+    environment = {**os.environ, 'PYTHONPATH': PROJECT_DIRECTORY}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'cli', 'lookup', str(book_id)],
+                            capture_output=True, text=True, check=False, env=environment)
+    seconds = time.perf_counter() - start
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)['book_id'] == book_id
+    imported = {line.rsplit('|', 1)[-1].strip().split('.')[0] for line in result.stderr.splitlines()
+                if line.startswith('import time:')}
+    assert not imported & set(cli.HEAVY_MODULES)
+    assert seconds <= cli.STARTUP_BUDGET
+
+
+def test_recommend_year_changes_the_scoring(in_catalogue: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that recommend with --year only prints books of that year, since they score higher
+    than the other books of the same country and language.
+    """
+    from main import load_library
+    books = load_library().books
+    book = next(books[book_id] for book_id in books if books[book_id].num_pages <= 1000)
+    arguments = ['recommend', '--country', book.country, '--language', book.language]
+
+    assert cli.main(arguments + ['--year', str(book.publication_year)]) == 0
+    recommended = [summary['book_id'] for summary in json.loads(capsys.readouterr().out)['books']]
+    assert book.book_id in recommended or len(recommended) == 60
+    assert all(books[book_id].publication_year == book.publication_year for book_id in recommended)
+
+    assert cli.main(arguments) == 0
+    recommended = [summary['book_id'] for summary in json.loads(capsys.readouterr().out)['books']]
+    assert any(books[book_id].publication_year != book.publication_year for book_id in recommended)
+
+
+def test_similar_profile_does_not_create_the_profile_log(in_catalogue: str,
+                                                         capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that similar --profile reads the profile store without creating its log file."""
+    from profile_store import PROFILE_LOG_FILENAME
+    assert not os.path.exists(PROFILE_LOG_FILENAME)
+
+    assert cli.main(['similar', str(_first_book_id()), '--profile', 'default']) == 0
+    assert 'books' in json.loads(capsys.readouterr().out)
+    assert not os.path.exists(PROFILE_LOG_FILENAME)
+
+
+def _first_book_id() -> int:
+    """Return the ID of the first book in the library snapshot of the working directory."""
+    from main import load_library
+    return next(iter(load_library().books))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_cli.py'])
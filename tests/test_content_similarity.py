@@ -0,0 +1,129 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of content_similarity.py, run with pytest
+over the synthetic catalogue of conftest.py. The neighbours found by the
+LSH index are checked against an exact search, and the neighbour table
+against the one read back from disk.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import os
+import numpy
+from book import Book
+import content_similarity
+from content_similarity import ContentIndex, load_neighbour_table
+from library import Library
+from main import load_data
+import pytest
+
+
+@pytest.fixture(scope='module')
+def books(catalogue_directory: str) -> dict[int, Book]:
+    """Return the books of the synthetic catalogue."""
+    working_directory = os.getcwd()
+    os.chdir(catalogue_directory)
+    try:
+        library = Library()
+        library.load_books(load_data())
+        return library.books
+    finally:
+        os.chdir(working_directory)
+
+
+@pytest.fixture(scope='module')
+def index(books: dict[int, Book]) -> ContentIndex:
+    """Return the content index of the books of the synthetic catalogue."""
+    return ContentIndex.from_books(books)
+
+
+def test_query_finds_the_exact_neighbours_among_the_compared_rows(index: ContentIndex) -> None:
+    """Test that query returns the exact similarities of the rows it finds, and the same rows as
+    exact_query once every row shares a probed bucket with the query.
+    """
+    assert numpy.allclose(numpy.linalg.norm(index.vectors, axis=1), 1, atol=1e-5)
+    one_bucket = ContentIndex(index.book_ids, index.vectors, num_tables=2, bits=1)
+
+    for row in range(0, len(index), 97):
+        vector = index.vectors[row]
+        rows, scores = index.query(vector, 10, exclude=row)
+        assert row not in rows.tolist() and numpy.all(scores > 0)
+        assert numpy.allclose(scores, index.vectors[rows] @ vector)
+        assert numpy.all(scores[:-1] >= scores[1:])
+
+        exact_rows, exact_scores = index.exact_query(vector, 10, exclude=row)
+        assert numpy.all(scores <= exact_scores[:len(scores)] + 1e-6)
+        found_rows, found_scores = one_bucket.query(vector, 10, probes=1, exclude=row)
+        assert found_rows.tolist() == exact_rows.tolist()
+        assert numpy.allclose(found_scores, exact_scores)
+
+
+def test_neighbour_table_round_trip(books: dict[int, Book], index: ContentIndex, tmp_path: str) -> None:
+    """Test that the neighbour table read back from disk has the same arrays as the table built
+    from the index, and gives the neighbours found by the index for every book.
+    """
+    source = os.path.join(tmp_path, 'books.txt')
+    with open(source, 'w') as file:
+        file.write('books\n')
+    directory = os.path.join(tmp_path, 'neighbours')
+
+    table = load_neighbour_table(books, [source], directory, k=5)
+    loaded = load_neighbour_table(books, [source], directory, k=5)
+    assert sorted(loaded.arrays) == sorted(table.arrays)
+    for name, array in table.arrays.items():
+        assert numpy.array_equal(loaded.arrays[name], array)
+
+    for book_id in books:
+        assert loaded.neighbours(book_id) == pytest.approx(index.neighbours(book_id, 5))
+    assert loaded.neighbours(-1) == []
+
+
+def test_neighbour_table_is_rebuilt_when_stale(books: dict[int, Book], tmp_path: str,
+                                               monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the saved neighbour table is only rebuilt once its source file changes or a
+    different number of neighbours is asked for.
+    """
+    source = os.path.join(tmp_path, 'books.txt')
+    with open(source, 'w') as file:
+        file.write('books\n')
+    directory = os.path.join(tmp_path, 'neighbours')
+    builds = []
+    from_books = ContentIndex.from_books
+
+    def counting_from_books(*args: object) -> ContentIndex:
+        """Build the content index as ContentIndex.from_books does, counting the builds."""
+        builds.append(args)
+        return from_books(*args)
+
+    monkeypatch.setattr(content_similarity.ContentIndex, 'from_books', counting_from_books)
+    load_neighbour_table(books, [source], directory, k=3)
+    load_neighbour_table(books, [source], directory, k=3)
+    assert len(builds) == 1
+
+    table = load_neighbour_table(books, [source], directory, k=4)
+    assert len(builds) == 2 and table.arrays['neighbours'].shape[1] == 4
+
+    with open(source, 'w') as file:
+        file.write('more books\n')
+    load_neighbour_table(books, [source], directory, k=4)
+    assert len(builds) == 3
+    load_neighbour_table(books, [source], directory, k=4)
+    assert len(builds) == 3
+
+
+if __name__ == '__main__':
+    pytest.main(['test_content_similarity.py'])
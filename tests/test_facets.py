@@ -0,0 +1,78 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of facets.py, run with pytest over the
+synthetic catalogue of conftest.py. The facets are checked against the
+values of every book counted one book at a time.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections import Counter
+import numpy
+from book import Book
+from facets import FACETS, FacetIndex
+from library import Library
+from main import load_data
+import pytest
+
+
+def count_facets(books: dict[int, Book]) -> dict[str, Counter]:
+    """Return the number of books with every value of every facet, as labelled in the GUI."""
+    counters = {facet: Counter() for facet in FACETS}
+    for book in books.values():
+        for facet in ('country', 'language', 'title', 'publisher'):
+            counters[facet][getattr(book, facet)] += 1
+        counters['publication_year'][str(book.publication_year)] += 1
+        for author_id, name in book.authors.items():
+            counters['author'][f'{name} (ID {author_id})'] += 1
+    return counters
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_facets_match_counter(in_catalogue: str, columnar: bool) -> None:
+    """Test that the options and counts of every facet are those of the books, counted one book
+    at a time, from the most to the least common value with ties in alphabetical order.
+    """
+    library = Library(columnar=columnar)
+    library.load_books(load_data())
+    facets = library.facets
+
+    for facet, counter in count_facets(library.books).items():
+        expected = sorted(counter, key=lambda value: (-counter[value], value))
+        assert facets.options(facet) == expected
+        assert facets.counts(facet).tolist() == [counter[value] for value in expected]
+        assert facets.options(facet, by_count=False) == sorted(counter)
+        assert all(facets.count(facet, value) == counter[value] and (facet, value) in facets for value in counter)
+        assert facets.count(facet, 'No Such Value') == 0 and (facet, 'No Such Value') not in facets
+
+
+def test_facets_from_snapshot(in_catalogue: str) -> None:
+    """Test that the facet index read back from the arrays of a library snapshot keeps only
+    its own arrays and gives the same options and counts.
+    """
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    facets = FacetIndex.from_snapshot({**library.books.arrays, **library.facets.arrays})
+
+    assert sorted(facets.arrays) == sorted(library.facets.arrays)
+    for facet in FACETS:
+        assert facets.options(facet) == library.facets.options(facet)
+        assert numpy.array_equal(facets.counts(facet), library.facets.counts(facet))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_facets.py'])
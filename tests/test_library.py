@@ -0,0 +1,106 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of library.py, run with pytest on the
+synthetic catalogue of conftest.py.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import pytest
+from book import Book
+import book_store
+from book_store import BOOK_FIELDS
+from library import Library
+from main import load_data
+
+
+def per_row_library() -> Library:
+    """Return the library built one row at a time with Book(df, i), then completed with
+    load_book_authors and load_book_genres, as before the books were loaded in bulk.
+    """
+    df = load_data()
+    library = Library()
+    for i in range(len(df.index)):
+        book = Book(df, i)
+        library.books[book.book_id] = book
+    library.load_book_authors()
+    library.load_book_genres()
+    return library
+
+
+def test_bulk_loader_matches_per_row_loader(in_catalogue: str) -> None:
+    """Test that Library.load_books gives the same books, in the same order and with the same
+    attribute values and types, as the per-row loader, whether or not the library is columnar.
+    """
+    expected = per_row_library().books
+    for columnar in (False, True):
+        library = Library(columnar=columnar)
+        library.load_books(load_data())
+        assert list(library.books) == list(expected)
+
+        for book_id, expected_book in expected.items():
+            book = library.books[book_id]
+            for field in BOOK_FIELDS:
+                value, expected_value = getattr(book, field), getattr(expected_book, field)
+                assert value == expected_value and type(value) is type(expected_value), (book_id, field)
+            assert list(book.authors) == list(expected_book.authors)
+
+
+def test_columnar_library_loads_authors_and_genres(in_catalogue: str) -> None:
+    """Test that load_book_authors and load_book_genres leave the books of a columnar library
+    as they are after load_books, which already resolved their authors and genres.
+    """
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    before = {book_id: library.books[book_id].to_dict() for book_id in library.books}
+
+    library.load_book_authors()
+    library.load_book_genres()
+    assert {book_id: library.books[book_id].to_dict() for book_id in library.books} == before
+
+
+def test_books_and_views_have_no_instance_dict(in_catalogue: str) -> None:
+    """Test that neither books nor the book views of a columnar library have a __dict__, so their
+    attributes live in slots.
+    """
+    for columnar in (False, True):
+        library = Library(columnar=columnar)
+        library.load_books(load_data())
+        book = library.books[next(iter(library.books))]
+        assert not hasattr(book, '__dict__')
+        with pytest.raises(AttributeError):
+            book.pages = 0
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 4096])
+def test_store_iterates_in_chunks(in_catalogue: str, monkeypatch: pytest.MonkeyPatch, chunk: int) -> None:
+    """Test that iterating over a store gives every book id once, as an int, in insertion order,
+    whatever the number of ids converted at a time.
+    """
+    monkeypatch.setattr(book_store, 'ITER_CHUNK', chunk)
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    book_ids = list(library.books)
+
+    assert book_ids == library.books.arrays['book_id'].tolist()
+    assert all(type(book_id) is int for book_id in book_ids)
+    iterator = iter(library.books)
+    assert [next(iterator) for _ in range(3)] == book_ids[:3]
+
+
+if __name__ == '__main__':
+    pytest.main(['test_library.py'])
@@ -0,0 +1,106 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of pagerank.py and of the personalized
+PageRank recommendations of SimilarBookSystem, run with pytest on small
+random graphs whose scores are also computed by a dense linear solve.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import numpy
+import pytest
+from pagerank import DAMPING, monte_carlo, power_iteration
+from recommendation_system import CSRBookGraph, SimilarBookSystem
+
+
+NUM_BOOKS = 40
+
+
+def random_graph(seed: int) -> CSRBookGraph:
+    """Return a random graph of NUM_BOOKS books, some of which have no neighbours."""
+    rng = numpy.random.default_rng(seed)
+    sources, targets = rng.integers(NUM_BOOKS - 8, size=(2, 3 * NUM_BOOKS))
+    return CSRBookGraph.from_edges(numpy.arange(NUM_BOOKS), sources, targets)
+
+
+def dense_pagerank(graph: CSRBookGraph, seeds: numpy.ndarray, damping: float) -> numpy.ndarray:
+    """Return the personalized PageRank scores of the books of graph, restarting at seeds, by
+    solving the linear system they satisfy, where a walk at a book with no neighbours restarts.
+    """
+    num_books = len(graph.book_ids)
+    restart = numpy.zeros(num_books)
+    numpy.add.at(restart, seeds, 1 / len(seeds))
+    transitions = numpy.zeros((num_books, num_books))
+    for book in range(num_books):
+        neighbours = graph.indices[graph.indptr[book]:graph.indptr[book + 1]]
+        if len(neighbours) == 0:
+            transitions[:, book] = restart
+        else:
+            transitions[neighbours, book] = 1 / len(neighbours)
+    return numpy.linalg.solve(numpy.eye(num_books) - damping * transitions, (1 - damping) * restart)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('damping', [0.5, DAMPING])
+def test_power_iteration_matches_dense_solve(seed: int, damping: float) -> None:
+    """Test that power_iteration converges to the scores of the dense solve, on graphs with
+    books that have no neighbours, some of which are seeds.
+    """
+    graph = random_graph(seed)
+    degrees = graph.degrees()
+    assert (degrees == 0).sum() >= 8
+    rng = numpy.random.default_rng(seed)
+    seeds = rng.choice(NUM_BOOKS, size=4, replace=False)
+    seeds[0] = numpy.flatnonzero(degrees == 0)[seed]
+
+    scores = power_iteration(graph.indptr, graph.indices, seeds, damping, tolerance=1e-12, max_iterations=1000)
+    expected = dense_pagerank(graph, seeds, damping)
+    assert scores.sum() == pytest.approx(1)
+    assert scores == pytest.approx(expected, abs=1e-9)
+
+
+def test_monte_carlo_estimates_the_scores() -> None:
+    """Test that monte_carlo estimates the scores of the dense solve, whatever the number of workers."""
+    graph = random_graph(0)
+    seeds = numpy.array([0, 1, NUM_BOOKS - 1])
+    expected = dense_pagerank(graph, seeds, DAMPING)
+    for workers in (1, 2):
+        scores = monte_carlo(graph.indptr, graph.indices, seeds, 200_000, DAMPING, workers, seed=114)
+        assert numpy.abs(scores - expected).max() < 0.01
+
+
+def test_recommend_pagerank_breaks_ties_by_lower_id() -> None:
+    """Test that recommend_pagerank ranks books with equal scores by their IDs, and leaves out
+    the saved books, the books that are not in the library and the books with no score.
+    """
+    # book 1 is the only neighbour of books 50, 30, 40 and 90, which is not in the library, so all
+    # four have the same score; books 70 and 80 have no neighbours
+    books = dict.fromkeys([1, 30, 40, 50, 70, 80])
+    graph = CSRBookGraph.from_edges(numpy.array(list(books)), numpy.array([1, 1, 1, 1]),
+                                    numpy.array([50, 30, 90, 40]))
+    system = SimilarBookSystem(books, graph)
+
+    recommended = system.recommend_pagerank({1, 70}, k=10, tolerance=1e-12, max_iterations=1000)
+    assert [book_id for book_id, _ in recommended] == [30, 40, 50]
+    assert recommended[0][1] == recommended[1][1] == recommended[2][1] > 0
+    assert [book_id for book_id, _ in system.recommend_pagerank({1}, k=2)] == [30, 40]
+    assert system.recommend_pagerank({80}, k=10) == []
+    assert system.recommend_pagerank({1}, k=0) == []
+
+
+if __name__ == '__main__':
+    pytest.main(['test_pagerank.py'])
@@ -0,0 +1,251 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of profile_store.py, run with pytest on
+log files in a temporary directory. Every store is checked against a
+model of its profiles, changed by the same random operations.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import os
+import random
+import pytest
+import profile_store
+from profile_store import DEFAULT_PROFILE, ProfileStore
+
+
+PROFILES = ('default', 'alice', 'bob')
+NUM_OPERATIONS = 500
+
+
+def apply_random_operation(store: ProfileStore, model: dict[str, set[int]], rng: random.Random) -> None:
+    """Apply the same random operation to store and to model, a mapping from the name of every
+    profile to the IDs of its saved books.
+    """
+    profile = rng.choice(PROFILES)
+    operation = rng.choices(['create', 'delete', 'save', 'unsave'], [1, 1, 6, 3])[0]
+    book_id = rng.randrange(40)
+    if operation == 'create':
+        store.create_profile(profile)
+        model.setdefault(profile, set())
+    elif operation == 'delete':
+        store.delete_profile(profile)
+        model.pop(profile, None)
+    elif operation == 'save':
+        store.save(book_id, profile)
+        model.setdefault(profile, set()).add(book_id)
+    else:
+        store.unsave(book_id, profile)
+        model.get(profile, set()).discard(book_id)
+
+
+def assert_matches(store: ProfileStore, model: dict[str, set[int]]) -> None:
+    """Assert that store holds the profiles of model and satisfies its representation invariants."""
+    assert store.profiles == model
+    assert store.num_live == len(model) + sum(len(book_ids) for book_ids in model.values())
+
+
+def count_lines(filename: str) -> int:
+    """Return the number of lines of the file filename."""
+    with open(filename, 'rb') as file:
+        return sum(1 for _ in file)
+
+
+def test_replay_matches_model(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a store reopened after random operations, some of which compact the log, holds
+    the same profiles as the model, with one record per line of the log.
+    """
+    monkeypatch.setattr(profile_store, 'COMPACTION_MIN_RECORDS', 32)
+    filename = os.path.join(tmp_path, 'profiles.log')
+    rng = random.Random(116)
+    model = {}
+
+    for _ in range(5):
+        store = ProfileStore(filename, None, sync=False)
+        assert_matches(store, model)
+        for _ in range(NUM_OPERATIONS // 5):
+            apply_random_operation(store, model, rng)
+            assert_matches(store, model)
+        store.close()
+        assert count_lines(filename) == store.num_records
+
+
+def test_compaction_keeps_the_log_small(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that saving and unsaving one book many times compacts the log, keeping its records."""
+    monkeypatch.setattr(profile_store, 'COMPACTION_MIN_RECORDS', 16)
+    filename = os.path.join(tmp_path, 'profiles.log')
+    store = ProfileStore(filename, None, sync=False)
+    store.save(1)
+    for _ in range(100):
+        store.save(2)
+        store.unsave(2)
+    store.close()
+
+    assert count_lines(filename) < 16
+    reopened = ProfileStore(filename, None, sync=False)
+    assert_matches(reopened, {DEFAULT_PROFILE: {1}})
+    reopened.close()
+
+
+@pytest.mark.parametrize('cut', [1, 5])
+def test_torn_last_line_is_truncated(tmp_path: str, cut: int) -> None:
+    """Test that a last line cut short by a crash is ignored and removed from the log, and that
+    the store keeps working afterwards.
+    """
+    filename = os.path.join(tmp_path, 'profiles.log')
+    rng = random.Random(117)
+    store = ProfileStore(filename, None, sync=False)
+    model = {}
+    for _ in range(50):
+        apply_random_operation(store, model, rng)
+    expected = {profile: set(book_ids) for profile, book_ids in model.items()}
+    store.save(1000, 'alice')
+    model.setdefault('alice', set()).add(1000)
+    store.close()
+
+    size = os.path.getsize(filename)
+    with open(filename, 'rb+') as file:
+        file.truncate(size - cut)
+
+    store = ProfileStore(filename, None, sync=False)
+    assert_matches(store, expected)
+    assert count_lines(filename) == store.num_records
+    with open(filename, 'rb') as file:
+        assert file.read().endswith(b'\n')
+
+    for _ in range(50):
+        apply_random_operation(store, expected, rng)
+    store.close()
+    store = ProfileStore(filename, None, sync=False)
+    assert_matches(store, expected)
+    store.close()
+
+
+def test_corrupt_line_before_the_end_raises(tmp_path: str) -> None:
+    """Test that a store whose log has an invalid line before its last line cannot be opened,
+    and that the log is left unchanged.
+    """
+    filename = os.path.join(tmp_path, 'profiles.log')
+    store = ProfileStore(filename, None, sync=False)
+    for book_id in range(10):
+        store.save(book_id)
+    store.close()
+
+    with open(filename, 'rb') as file:
+        lines = file.readlines()
+    for bad_line in (b'{"op": "save", "profi\n', b'{"op": "save", "profile": "default"}\n', b'[]\n'):
+        content = b''.join(lines[:4] + [bad_line] + lines[4:])
+        with open(filename, 'wb') as file:
+            file.write(content)
+        with pytest.raises(ValueError):
+            ProfileStore(filename, None, sync=False)
+        with open(filename, 'rb') as file:
+            assert file.read() == content
+
+
+def test_legacy_books_are_imported_once(tmp_path: str) -> None:
+    """Test that the books of the legacy file are imported into the default profile of a new log,
+    and that they are not imported again once the log exists.
+    """
+    filename = os.path.join(tmp_path, 'profiles.log')
+    legacy_filename = os.path.join(tmp_path, 'book.txt')
+    with open(legacy_filename, 'w') as file:
+        file.write('3\n1\n\n2\n')
+
+    store = ProfileStore(filename, legacy_filename, sync=False)
+    assert_matches(store, {DEFAULT_PROFILE: {1, 2, 3}})
+    store.unsave(2)
+    store.close()
+
+    store = ProfileStore(filename, legacy_filename, sync=False)
+    assert_matches(store, {DEFAULT_PROFILE: {1, 3}})
+    store.close()
+
+
+def test_read_only_store_never_writes(tmp_path: str) -> None:
+    """Test that a read-only store reads the legacy books and a torn log without creating or
+    changing any file, and that changing it raises ValueError.
+    """
+    filename = os.path.join(tmp_path, 'profiles.log')
+    legacy_filename = os.path.join(tmp_path, 'book.txt')
+    with open(legacy_filename, 'w') as file:
+        file.write('7\n')
+
+    store = ProfileStore(filename, legacy_filename, read_only=True)
+    assert store.saved_books() == {7}
+    with pytest.raises(ValueError):
+        store.save(8)
+    store.close()
+    assert sorted(os.listdir(tmp_path)) == ['book.txt']
+
+    writer = ProfileStore(filename, None, sync=False)
+    writer.save(8)
+    writer.close()
+    with open(filename, 'ab') as file:
+        file.write(b'{"op": "sa')
+    size = os.path.getsize(filename)
+
+    store = ProfileStore(filename, None, read_only=True)
+    assert store.saved_books() == {8}
+    store.close()
+    assert os.path.getsize(filename) == size
+
+
+def test_only_one_writer(tmp_path: str) -> None:
+    """Test that a store cannot be opened for writing while it is open for writing elsewhere,
+    but can be opened read-only, and can be opened for writing again once it is closed.
+    """
+    filename = os.path.join(tmp_path, 'profiles.log')
+    store = ProfileStore(filename, None, sync=False)
+    store.save(1)
+    with pytest.raises(BlockingIOError):
+        ProfileStore(filename, None, sync=False)
+
+    reader = ProfileStore(filename, None, read_only=True)
+    assert reader.saved_books() == {1}
+    reader.close()
+    store.close()
+
+    store = ProfileStore(filename, None, sync=False)
+    assert store.saved_books() == {1}
+    store.close()
+
+
+def test_failed_write_leaves_the_store_unchanged(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a change whose record cannot be written is not applied to the store."""
+    filename = os.path.join(tmp_path, 'profiles.log')
+    store = ProfileStore(filename, None, sync=False)
+    store.save(1)
+
+    def fail(_: str) -> int:
+        """Raise OSError, as when the disk is full."""
+        raise OSError('no space left on device')
+
+    monkeypatch.setattr(store.file, 'write', fail)
+    with pytest.raises(OSError):
+        store.save(2)
+    assert_matches(store, {DEFAULT_PROFILE: {1}})
+
+    store.save(3)
+    store.close()
+    store = ProfileStore(filename, None, sync=False)
+    assert_matches(store, {DEFAULT_PROFILE: {1, 3}})
+    store.close()
+
+
+if __name__ == '__main__':
+    pytest.main(['test_profile_store.py'])
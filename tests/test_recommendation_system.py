@@ -0,0 +1,299 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of recommendation_system.py, run with
+pytest on the synthetic catalogue of conftest.py.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import math
+import os
+import random
+import numpy
+from author import DATA_FILENAME as AUTHOR_DATA_FILENAME
+from book import Book
+from library import Library
+from main import DATA_FILENAME, GRAPH_SNAPSHOT_DIRECTORY, load_data, load_library
+import pytest
+from recommendation_system import (SCORERS, CSRBookGraph, IndexedRecommendationSystem, RecommendationSystem,
+                                   SimilarBookSystem, _AttributeTable, _PageIndex, _get_match_score, _page_range,
+                                   profile_seeds)
+
+
+NUM_PROFILES = 200
+
+
+def random_profile(books: dict[int, Book], rng: random.Random) -> list:
+    """Return random responses to the recommendation questions, where every response either
+    matches a random book in books, matches no book, or is left unanswered.
+    """
+    book = books[rng.choice(list(books))]
+    min_pages = rng.randint(0, 600)
+    return [(min_pages, min_pages + rng.randint(0, 400)),
+            rng.sample(['US', 'GB', 'CA', 'AU', 'IN', 'XX'], rng.randint(0, 3)),
+            rng.sample(['eng', 'en-US', 'en-GB', 'spa', 'fre', 'xxx'], rng.randint(0, 3)),
+            rng.choice([book.title, 'No Such Title', None]),
+            rng.choice([next(iter(book.authors)), -1, None]),
+            rng.choice([book.publisher, 'No Such Publisher', None]),
+            rng.choice([book.publication_year, 0, None]),
+            rng.choice([book.is_ebook, True, None])]
+
+
+def test_match_scores_equal_get_match_score(in_catalogue: str) -> None:
+    """Test that _AttributeTable.match_scores gives the same score as _get_match_score for every
+    book and random responses.
+    """
+    library = Library()
+    library.load_books(load_data())
+    books = library.books
+    table = _AttributeTable(books)
+    book_ids = list(books)
+    rows = table.rows(book_ids)
+    rng = random.Random(111)
+
+    for _ in range(NUM_PROFILES):
+        responses = random_profile(books, rng)
+        expected = [_get_match_score(books[book_id].get_attributes(), responses) for book_id in book_ids]
+        assert table.match_scores(rows, responses).tolist() == expected
+
+
+def test_match_scores_of_a_subset_of_rows(in_catalogue: str) -> None:
+    """Test that the match scores of a few rows, in any order and with repetitions, are the same
+    as their scores among all rows.
+    """
+    library = Library()
+    library.load_books(load_data())
+    table = _AttributeTable(library.books)
+    all_rows = table.rows(list(library.books))
+    rng = random.Random(112)
+
+    for _ in range(NUM_PROFILES):
+        responses = random_profile(library.books, rng)
+        all_scores = table.match_scores(all_rows, responses)
+        rows = [rng.randrange(len(all_rows)) for _ in range(rng.randint(1, 20))]
+        assert table.match_scores(all_rows[rows], responses).tolist() == all_scores[rows].tolist()
+
+
+@pytest.mark.parametrize('page_range, expected', [
+    ((120, 300), [150, 200, 300]),
+    ((150, 150), [150]),
+    ((0, 50), [100]),
+    ((-10, -1), [100]),
+    ((400, 900), [300]),
+    ((240, 260), [200, 300]),
+    ((120, 130), [100, 150]),
+    ((260, 270), [300]),
+    ((300, 100), [100, 150, 200, 300])
+])
+def test_page_range(page_range: tuple[int, int], expected: list[int]) -> None:
+    """Test that _page_range selects the page counts in the range, or if there are none, the
+    nearest ones below the minimum or above the maximum, both if they are equally near, and all
+    of them if the range is empty.
+    """
+    sorted_pages = numpy.array([100, 150, 200, 300])
+    start, end = _page_range(sorted_pages, *page_range)
+    assert sorted_pages[start:end].tolist() == expected
+
+
+@pytest.mark.parametrize('page_range', [(0, 10), (50, 50), (60, 90), (90, 10)])
+def test_page_range_of_a_single_page_count(page_range: tuple[int, int]) -> None:
+    """Test that the only page count is selected whatever the range."""
+    assert _page_range(numpy.array([50]), *page_range) == (0, 1)
+    assert _page_range(numpy.array([], dtype=numpy.int64), *page_range) == (0, 0)
+
+
+def test_page_index_select_keeps_insertion_order() -> None:
+    """Test that _PageIndex.select returns the selected children in insertion order, including
+    the nearest children of a range holding no page count and a single child.
+    """
+    children = {pages: RecommendationSystem({}, pages) for pages in (300, 100, 250, 150)}
+    index = _PageIndex(children)
+    assert [child.item for child in index.select(100, 260)] == [100, 250, 150]
+    assert [child.item for child in index.select(200, 200)] == [250, 150]
+    assert [child.item for child in index.select(500, 600)] == [300]
+    assert [child.item for child in index.select(0, 0)] == [100]
+    assert [child.item for child in index.select(260, 200)] == [300, 100, 250, 150]
+    assert [child.item for child in _PageIndex({7: RecommendationSystem({}, 7)}).select(8, 9)] == [7]
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_candidates_equal_tree_walk(in_catalogue: str, columnar: bool) -> None:
+    """Test that IndexedRecommendationSystem._candidates gives the same candidate books, in the
+    same order and with the same repetitions, as the tree walk of RecommendationSystem, for random
+    responses and for page ranges that are empty, hold no page count or hold exactly one.
+    """
+    library = Library(columnar=columnar)
+    library.load_books(load_data())
+    tree = RecommendationSystem(library.books)
+    tree.initialize()
+    indexed = IndexedRecommendationSystem(library.books)
+    indexed.initialize()
+    rng = random.Random(108)
+    pages = sorted({library.books[book_id].num_pages for book_id in library.books})
+
+    profiles = [random_profile(library.books, rng) for _ in range(NUM_PROFILES)]
+    for page_range in ((500, 100), (pages[-1] + 1, pages[-1] + 50), (-50, pages[0] - 1), (pages[0], pages[0]),
+                       (pages[len(pages) // 2], pages[len(pages) // 2]), (pages[1] - 1, pages[1] - 1)):
+        profiles.append([page_range] + random_profile(library.books, rng)[1:])
+        profiles.append([page_range, ['XX'], ['xxx'], 'No Such Title', -1, 'No Such Publisher', 0, None])
+
+    for responses in profiles:
+        assert indexed._candidates(responses) == tree._recommend_util(responses, 0), responses
+
+
+@pytest.mark.parametrize('system_class', [RecommendationSystem, IndexedRecommendationSystem])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_recommend_many_matches_recommend(in_catalogue: str, system_class: type, workers: int) -> None:
+    """Test that recommend_many gives the same recommendations as recommend with the seeds of
+    profile_seeds, whatever the number of workers.
+    """
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    system = system_class(library.books)
+    system.initialize()
+    rng = random.Random(113)
+    # repeated page ranges, so that several profiles share a prefix of responses
+    profiles = [random_profile(library.books, rng) for _ in range(30)]
+    profiles = [[profiles[i % 5][0]] + responses[1:] for i, responses in enumerate(profiles)]
+
+    seeds = profile_seeds(111, len(profiles))
+    expected = [system.recommend(responses, random.Random(seed)) for responses, seed in zip(profiles, seeds)]
+    assert system.recommend_many(profiles, workers, 111) == expected
+
+
+def neighbourhoods(books: dict[int, Book]) -> dict[int, set[int]]:
+    """Return a mapping from the ID of every book in books or similar to a book in books to the
+    IDs of the books it is connected to in the similar books graph, other than itself.
+    """
+    graph = {}
+    for book_id in books:
+        graph.setdefault(book_id, set())
+        for similar_book_id in books[book_id].similar_books:
+            if similar_book_id != book_id:
+                graph[book_id].add(similar_book_id)
+                graph.setdefault(similar_book_id, set()).add(book_id)
+    return graph
+
+
+def brute_force_top_k(books: dict[int, Book], graph: dict[int, set[int]], saved_ids: set[int], k: int,
+                      scorer: str) -> list[tuple[int, float]]:
+    """Return what SimilarBookSystem.recommend_top_k should return, computed from the sets of
+    neighbours in graph.
+    """
+    saved = {book_id for book_id in saved_ids if book_id in graph}
+    candidates = set().union(*(graph[book_id] for book_id in saved)) - saved
+    scores = {}
+    for book_id in candidates:
+        common = graph[book_id] & saved
+        if scorer == 'common_neighbours':
+            scores[book_id] = len(common)
+        elif scorer == 'jaccard':
+            scores[book_id] = len(common) / len(graph[book_id] | saved)
+        elif scorer == 'adamic_adar':
+            scores[book_id] = sum(1 / math.log(1 + len(graph[saved_id])) for saved_id in common)
+        else:
+            scores[book_id] = len(common) / math.sqrt(len(saved) * len(graph[book_id]))
+
+    ranked = sorted((book_id for book_id in scores if book_id in books), key=lambda b: (-round(scores[b], 9), b))
+    return [(book_id, scores[book_id]) for book_id in ranked[:k]]
+
+
+@pytest.mark.parametrize('scorer', sorted(SCORERS))
+def test_recommend_top_k_matches_brute_force(in_catalogue: str, scorer: str) -> None:
+    """Test that recommend_top_k gives the same books and scores as a brute force computation
+    over sets of neighbours, for random saved books, some of which have no similar books.
+    """
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    system = SimilarBookSystem(library.books)
+    system.initialize()
+    graph = neighbourhoods(library.books)
+    rng = random.Random(113)
+    book_ids = list(library.books)
+
+    for _ in range(50):
+        saved_ids = set(rng.sample(book_ids, rng.randint(1, 6)))
+        for k in (0, 1, 10, len(book_ids)):
+            expected = brute_force_top_k(library.books, graph, saved_ids, k, scorer)
+            recommended = system.recommend_top_k(saved_ids, k, scorer)
+            assert [book_id for book_id, _ in recommended] == [book_id for book_id, _ in expected]
+            assert [score for _, score in recommended] == pytest.approx([score for _, score in expected])
+
+
+def assert_same_graph(graph: CSRBookGraph, expected: CSRBookGraph) -> None:
+    """Assert that graph has the same books and edges as expected."""
+    for name, array in expected.arrays().items():
+        assert numpy.array_equal(graph.arrays()[name], array)
+
+
+def test_csr_edits_match_a_fresh_system(in_catalogue: str) -> None:
+    """Test that a system with a CSRBookGraph whose books are removed and added back answers
+    queries as a system built from scratch over the same books, and only rebuilds its graph
+    once a query needs it.
+    """
+    library = Library()
+    library.load_books(load_data())
+    system = SimilarBookSystem(library.books, CSRBookGraph.from_books(library.books))
+    system.initialize()
+    rng = random.Random(112)
+    removed = [library.books[book_id] for book_id in rng.sample(list(library.books), 100)]
+
+    for book in removed:
+        system.remove_book(book.book_id)
+    for book in removed[:50]:
+        system.add_book(book)
+    assert system.is_stale
+
+    fresh = SimilarBookSystem(dict(library.books), CSRBookGraph.from_books(library.books))
+    fresh.initialize()
+    for _ in range(20):
+        saved_ids = set(rng.sample(list(library.books), rng.randint(1, 6)))
+        assert system.recommend(saved_ids) == fresh.recommend(saved_ids)
+        assert system.recommend_top_k(saved_ids, 10) == fresh.recommend_top_k(saved_ids, 10)
+    assert not system.is_stale
+    assert system.in_degrees == fresh.in_degrees
+    assert_same_graph(system.get_csr_graph(), fresh.get_csr_graph())
+
+
+def test_load_library_saves_and_loads_the_similar_graph(in_catalogue: str) -> None:
+    """Test that load_library saves the graph of similar books the first time and loads the same
+    graph afterwards.
+    """
+    library = load_library()
+    assert_same_graph(library.similar_graph, CSRBookGraph.from_books(library.books))
+    loaded = CSRBookGraph.load(GRAPH_SNAPSHOT_DIRECTORY, [DATA_FILENAME, AUTHOR_DATA_FILENAME])
+    assert loaded is not None
+    assert_same_graph(loaded, library.similar_graph)
+    assert_same_graph(load_library().similar_graph, library.similar_graph)
+
+
+def test_similar_graph_snapshot_is_stale_once_its_source_changes(tmp_path: str) -> None:
+    """Test that a saved graph is loaded as it was saved until its source file changes."""
+    source = os.path.join(tmp_path, 'books.txt')
+    directory = os.path.join(tmp_path, 'graph')
+    with open(source, 'w') as file:
+        file.write('1 2\n')
+    graph = CSRBookGraph.from_edges(numpy.array([1, 2, 3]), numpy.array([1, 1]), numpy.array([2, 3]))
+    graph.save(directory, [source])
+    assert_same_graph(CSRBookGraph.load(directory, [source]), graph)
+
+    with open(source, 'w') as file:
+        file.write('1 3\n')
+    assert CSRBookGraph.load(directory, [source]) is None
+
+if __name__ == '__main__':
+    pytest.main(['test_recommendation_system.py'])
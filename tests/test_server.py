@@ -0,0 +1,221 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of server.py, run with pytest against a
+server listening on a free port of localhost, over the synthetic
+catalogue of conftest.py.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.client import HTTPConnection
+from typing import Any
+import asyncio
+import json
+import os
+import socket
+import threading
+from library import Library
+from main import load_library
+import pytest
+from server import HOST, BookService, RecommendationServer
+
+
+class BrokenService(BookService):
+    """A service whose searches fail with an unexpected error."""
+
+    def search(self, query: str, k: int) -> dict[str, Any]:
+        """Raise RuntimeError."""
+        raise RuntimeError('broken search')
+
+
+@contextmanager
+def running_server(service: BookService) -> Iterator[int]:
+    """Run a server of service with two worker processes on a free port of HOST, in an event
+    loop of a background thread, and return the port.
+    """
+    recommendation_server = RecommendationServer(service, 2)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(recommendation_server.start(HOST, 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        asyncio.run_coroutine_threadsafe(_close(server), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        recommendation_server.close()
+
+
+async def _close(server: asyncio.Server) -> None:
+    """Stop server from accepting connections and wait for it to close."""
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.fixture(scope='module')
+def library(catalogue_directory: str) -> Library:
+    """Return the library of the synthetic catalogue."""
+    working_directory = os.getcwd()
+    os.chdir(catalogue_directory)
+    try:
+        return load_library()
+    finally:
+        os.chdir(working_directory)
+
+
+@pytest.fixture(scope='module')
+def port(library: Library) -> Iterator[int]:
+    """Return the port of a server of the library of the synthetic catalogue."""
+    with running_server(BookService(library.books, library.text_index)) as server_port:
+        yield server_port
+
+
+@pytest.fixture
+def connection(port: int) -> Iterator[HTTPConnection]:
+    """Return a connection to the server of the library of the synthetic catalogue."""
+    client = HTTPConnection(HOST, port, timeout=60)
+    yield client
+    client.close()
+
+
+def request(connection: HTTPConnection, method: str, target: str, body: Any = None,
+            headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], dict[str, Any]]:
+    """Send a request over connection, with body in json unless it is None or bytes, and return
+    the status, headers (with lower-case names) and json payload of the response.
+    """
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body)
+    connection.request(method, target, body, headers or {})
+    response = connection.getresponse()
+    return response.status, {name.lower(): value for name, value in response.getheaders()}, json.loads(response.read())
+
+
+def raw_request(port: int, data: bytes) -> bytes:
+    """Send data over a new connection to the server on port and return everything the server
+    sends back until it closes the connection.
+    """
+    with socket.create_connection((HOST, port), timeout=60) as client:
+        client.sendall(data)
+        with client.makefile('rb') as file:
+            return file.read()
+
+
+def raw_status(port: int, data: bytes) -> int:
+    """Return the status of the response to data sent over a new connection to the server on port."""
+    return int(raw_request(port, data).split()[1])
+
+
+def test_lookup(library: Library, connection: HTTPConnection) -> None:
+    """Test that GET /books/<id> returns the book, and a 404 for an unknown or invalid id."""
+    book_id = next(iter(library.books))
+    status, headers, payload = request(connection, 'GET', f'/books/{book_id}')
+    assert status == 200 and payload['book_id'] == book_id
+    assert payload['title'] == library.books[book_id].title
+    assert float(headers['x-response-time-ms']) >= 0
+
+    for target in ('/books/999999999', '/books/abc', '/books/%C2%B2'):
+        status, _, payload = request(connection, 'GET', target)
+        assert status == 404 and 'error' in payload
+    assert request(connection, 'POST', f'/books/{book_id}', {})[0] == 405
+
+
+def test_search(library: Library, connection: HTTPConnection) -> None:
+    """Test that GET /search returns at most k books with their scores, as TextIndex.search does."""
+    word = library.books[next(iter(library.books))].title.split()[0]
+    status, _, payload = request(connection, 'GET', f'/search?q={word}&k=3')
+    expected = library.text_index.search(word, 3)
+    assert status == 200
+    assert [book['book_id'] for book in payload['books']] == [book_id for book_id, _ in expected]
+    assert all(book['score'] > 0 for book in payload['books'])
+
+    assert request(connection, 'GET', f'/search?q={word}&k=x')[0] == 400
+    assert request(connection, 'GET', f'/search?q={word}&k=%C2%B2')[0] == 400
+
+
+def test_recommend(library: Library, connection: HTTPConnection) -> None:
+    """Test that POST /recommend returns books recommended for valid responses, ordered from the
+    best to the worst rated, and a 400 or 405 for invalid requests.
+    """
+    book = library.books[next(iter(library.books))]
+    responses = [[0, 2000], [book.country], [book.language], None, None, None, None, None]
+    status, _, payload = request(connection, 'POST', '/recommend', {'responses': responses})
+    assert status == 200 and payload['books'] != []
+    ratings = [library.books[summary['book_id']].average_rating for summary in payload['books']]
+    assert ratings == sorted(ratings, reverse=True)
+
+    for body in ({'responses': responses[:7]}, {'responses': [[0, 2000], book.country] + responses[2:]},
+                 {'responses': [[0, 'many']] + responses[1:]}, {}, [], b'not json'):
+        assert request(connection, 'POST', '/recommend', body)[0] == 400
+    assert request(connection, 'GET', '/recommend')[0] == 405
+
+
+def test_similar(library: Library, connection: HTTPConnection) -> None:
+    """Test that POST /similar returns books similar to the saved books, and a 400 for invalid ids."""
+    book_id = next(book_id for book_id in library.books if library.books[book_id].similar_books)
+    status, _, payload = request(connection, 'POST', '/similar', {'saved_ids': [book_id]})
+    assert status == 200
+    assert all(summary['book_id'] in library.books for summary in payload['books'])
+
+    assert request(connection, 'POST', '/similar', {'saved_ids': ['1']})[0] == 400
+    assert request(connection, 'POST', '/similar', {'saved_ids': 1})[0] == 400
+
+
+def test_invalid_requests(port: int, connection: HTTPConnection) -> None:
+    """Test that an unknown endpoint is a 404 and a malformed request is a 400."""
+    assert request(connection, 'GET', '/nowhere')[0] == 404
+    assert raw_status(port, b'GET /books/1\r\n\r\n') == 400
+    assert raw_status(port, b'POST /similar HTTP/1.1\r\nContent-Length: \xb2\r\n\r\n') == 400
+    assert raw_status(port, b'POST /similar HTTP/1.1\r\nContent-Length: -1\r\n\r\n') == 400
+
+
+def test_keep_alive(library: Library, port: int, connection: HTTPConnection) -> None:
+    """Test that several requests are answered over one connection until the client asks for
+    it to be closed.
+    """
+    book_id = next(iter(library.books))
+    status, headers, _ = request(connection, 'GET', f'/books/{book_id}')
+    sock = connection.sock
+    assert status == 200 and headers['connection'] == 'keep-alive'
+
+    for target in ('/search?q=the', '/nowhere', f'/books/{book_id}'):
+        request(connection, 'GET', target)
+        assert connection.sock is sock
+
+    response = raw_request(port, f'GET /books/{book_id} HTTP/1.1\r\nConnection: close\r\n\r\n'.encode())
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200') and b'Connection: close' in head
+    assert json.loads(body)['book_id'] == book_id
+
+
+def test_unexpected_error_is_a_500(library: Library) -> None:
+    """Test that an unexpected error in a query is answered with a 500 and leaves the connection
+    usable.
+    """
+    with running_server(BrokenService(library.books, library.text_index)) as server_port:
+        client = HTTPConnection(HOST, server_port, timeout=60)
+        status, _, payload = request(client, 'GET', '/search?q=the')
+        assert status == 500 and payload['error'] == 'internal server error'
+        assert request(client, 'GET', f'/books/{next(iter(library.books))}')[0] == 200
+        client.close()
+
+
+if __name__ == '__main__':
+    pytest.main(['test_server.py'])
@@ -0,0 +1,127 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains the tests of text_search.py, run with pytest over
+the synthetic catalogue of conftest.py. The BM25 scores of TextIndex are
+checked against a brute force computation over the words of every book.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+from collections import Counter
+import math
+import os
+import random
+import numpy
+from book import Book
+from book_store import BOOK_FIELDS
+from library import Library
+from main import load_data
+import pytest
+from snapshot import load_snapshot, save_snapshot
+from text_search import B, K1, TITLE_WEIGHT, TextIndex, _decode_varints, _encode_varints, tokenize
+
+
+def word_counts(books: dict[int, Book]) -> dict[int, Counter]:
+    """Return the weighted count of every word in the title and description of every book."""
+    counts = {}
+    for book_id in books:
+        book_counts = Counter(tokenize(books[book_id].description))
+        for word in tokenize(books[book_id].title):
+            book_counts[word] += TITLE_WEIGHT
+        counts[book_id] = book_counts
+    return counts
+
+
+def brute_force_search(counts: dict[int, Counter], query: str, k: int) -> list[tuple[int, float]]:
+    """Return what TextIndex.search should return, computed from the word counts of every book."""
+    average_length = sum(sum(book_counts.values()) for book_counts in counts.values()) / len(counts)
+    scores = {}
+    for word in set(tokenize(query)):
+        matched = [book_id for book_id in counts if word in counts[book_id]]
+        idf = math.log(1 + (len(counts) - len(matched) + 0.5) / (len(matched) + 0.5))
+        for book_id in matched:
+            count = counts[book_id][word]
+            norm = K1 * (1 - B + B * sum(counts[book_id].values()) / average_length)
+            scores[book_id] = scores.get(book_id, 0) + idf * count * (K1 + 1) / (count + norm)
+
+    ranked = sorted(scores, key=lambda book_id: (-round(scores[book_id], 9), book_id))
+    return [(book_id, scores[book_id]) for book_id in ranked[:k]]
+
+
+def assert_same_results(results: list[tuple[int, float]], expected: list[tuple[int, float]]) -> None:
+    """Assert that results hold the books of expected in the same order, with the same scores."""
+    assert [book_id for book_id, _ in results] == [book_id for book_id, _ in expected]
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected])
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_search_matches_brute_force(in_catalogue: str, columnar: bool) -> None:
+    """Test that search gives the same books and BM25 scores as a brute force computation, for
+    random queries of words from the books, words from no book and repeated words.
+    """
+    library = Library(columnar=columnar)
+    library.load_books(load_data())
+    counts = word_counts(library.books)
+    words = sorted(set().union(*counts.values()))
+    rng = random.Random(122)
+
+    for _ in range(100):
+        query = ' '.join(rng.sample(words, rng.randint(1, 4)) + rng.choice([[], ['zzzzzz'], [words[0].upper()]]))
+        for k in (0, 1, 10, len(library.books)):
+            assert_same_results(library.text_index.search(query, k), brute_force_search(counts, query, k))
+
+
+def test_search_of_an_index_without_words() -> None:
+    """Test that an index of no books, or of books without any words, matches no query."""
+    assert TextIndex.from_books({}).search('anything') == []
+
+    book = Book.from_fields({**dict.fromkeys(BOOK_FIELDS), 'book_id': 1, 'title': '...', 'description': ''})
+    assert TextIndex.from_books({1: book}).search('anything') == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_varints_round_trip(seed: int) -> None:
+    """Test that decoding encoded integers gives them back, from 0 to the largest 64-bit integer."""
+    rng = numpy.random.default_rng(seed)
+    shifts = rng.integers(0, 64, size=1000).astype(numpy.uint64)
+    values = rng.integers(0, 2 ** 64, size=1000, dtype=numpy.uint64) >> shifts
+    values = numpy.concatenate([values, numpy.array([0, 127, 128, 2 ** 64 - 1], dtype=numpy.uint64)])
+
+    data, sizes = _encode_varints(values)
+    assert len(data) == sizes.sum()
+    assert numpy.array_equal(_decode_varints(data), values)
+    assert numpy.array_equal(_decode_varints(data[:sizes[0]]), values[:1])
+
+
+def test_snapshot_round_trip(in_catalogue: str, tmp_path: str) -> None:
+    """Test that the index read back from a snapshot has the same arrays and gives the same results."""
+    library = Library(columnar=True)
+    library.load_books(load_data())
+    source = os.path.join(in_catalogue, 'data', 'books.json.gz')
+    directory = os.path.join(tmp_path, 'snapshot')
+    save_snapshot(directory, {**library.books.arrays, **library.text_index.arrays}, [source])
+
+    loaded = TextIndex.from_snapshot(load_snapshot(directory, [source]))
+    assert sorted(loaded.arrays) == sorted(library.text_index.arrays)
+    for name, array in library.text_index.arrays.items():
+        assert numpy.array_equal(loaded.arrays[name], array)
+    for query in ('the', 'love war', 'zzzzzz'):
+        assert loaded.search(query, 20) == library.text_index.search(query, 20)
+
+
+if __name__ == '__main__':
+    pytest.main(['test_text_search.py'])
@@ -0,0 +1,313 @@
+"""CSC111 Winter 2023 Course Project: Book Recommendation System
+
+Descriptions and Instructions
+===============================
+This module contains a customized class called TextIndex that is used
+to find books by the words in their titles and descriptions. The text of
+every book is split into case-folded words, and an inverted index maps
+every word to the books containing it and how often it occurs there.
+Books are ranked by the BM25 score of the words of a query, and only the
+k best books are returned.
+
+The posting list of every word is compressed: the rows of the books
+containing it are stored as gaps between consecutive rows, and the gaps
+and word counts are written as variable-length integers (7 bits per byte,
+with the high bit set on every byte but the last of an integer). Like a
+BookStore, the whole index is a handful of numpy arrays, so it is saved
+in the library snapshot and read back without being built again.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the usage of this project's authors
+and the grading purpose of the instructors and teaching assistants
+from CSC111 at the University of Toronto, St. George campus. The
+authors of this code retain all rights to the code contained within
+this file. All forms of distribution of this code, regardless of
+changes, are expressly prohibited. For more information on copyright
+for CSC111 project materials, please consult the Course Syllabus
+for CSC111, Winter 2023.
+
+This file is Copyright (c) 2023 Jayden Chiola-Nakai, Maria Ma,
+Kaiwen Zheng, and Shaqeel Hazmi Bin Radzifuddin
+"""
+from __future__ import annotations
+import math
+import re
+import numpy
+from book import Book
+from book_store import BookStore, decode_strings
+
+
+ARRAY_PREFIX = 'text.'
+# BM25 parameters: K1 limits how much repeating a word raises the score, and B how much
+# longer texts are penalized.
+K1 = 1.2
+B = 0.75
+# Every word of a title counts as this many words of a description.
+TITLE_WEIGHT = 3
+SEARCH_RESULTS = 10
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+
+class TextIndex:
+    """An inverted index of the words in the titles and descriptions of books, ranked with BM25.
+
+    The index is kept in the following arrays, stored in self.arrays under the given names
+    prefixed with ARRAY_PREFIX:
+
+        - book_ids: the ID of the book in every row of the index
+        - lengths: the number of words in the text of every row, counting title words TITLE_WEIGHT times
+        - terms.data, terms.offsets: the words of the index, sorted by their utf-8 bytes, where
+          word i has the utf-8 bytes terms.data[terms.offsets[i]:terms.offsets[i + 1]]
+        - doc_freqs: the number of rows containing each word
+        - postings.data, postings.offsets: the compressed posting list of word i is
+          postings.data[postings.offsets[i]:postings.offsets[i + 1]], which holds the row gap and
+          the weighted count of the word in each row containing it, in increasing row order
+
+    Instance Attributes:
+        - arrays: a mapping from array name to the numpy array holding it
+        - average_length: the average number of words in the text of a row
+
+    Representation Invariants:
+        - len(self.arrays[ARRAY_PREFIX + 'book_ids']) == len(self.arrays[ARRAY_PREFIX + 'lengths'])
+    """
+    arrays: dict[str, numpy.ndarray]
+    average_length: float
+
+    def __init__(self, arrays: dict[str, numpy.ndarray]) -> None:
+        """Initialize the index from its arrays, named as described above."""
+        self.arrays = arrays
+        lengths = arrays[ARRAY_PREFIX + 'lengths']
+        self.average_length = float(lengths.mean()) if len(lengths) > 0 else 0.0
+
+    @classmethod
+    def from_books(cls, books: dict[int, Book]) -> TextIndex:
+        """Return the text index of the titles and descriptions of books."""
+        if isinstance(books, BookStore):
+            columns = books.arrays
+            return cls._build(columns['book_id'],
+                              columns['title.codes'], decode_strings(columns['title.offsets'], columns['title.data']),
+                              columns['description.codes'],
+                              decode_strings(columns['description.offsets'], columns['description.data']))
+
+        book_ids = list(books)
+        rows = numpy.arange(len(book_ids))
+        return cls._build(numpy.array(book_ids, dtype=numpy.int64),
+                          rows, [books[book_id].title for book_id in book_ids],
+                          rows, [books[book_id].description for book_id in book_ids])
+
+    @classmethod
+    def _build(cls, book_ids: numpy.ndarray, title_codes: numpy.ndarray, titles: list[str],
+               description_codes: numpy.ndarray, descriptions: list[str]) -> TextIndex:
+        """Return the text index of the books with book_ids, where the title of row i is
+        titles[title_codes[i]] and its description is descriptions[description_codes[i]].
+
+        Every distinct title and description is split into words only once.
+        """
+        vocabulary = {}
+        title_counts = _count_words(titles, vocabulary)
+        description_counts = _count_words(descriptions, vocabulary)
+
+        rows_title, terms_title, counts_title = _expand(title_codes, *title_counts)
+        rows_description, terms_description, counts_description = _expand(description_codes, *description_counts)
+        rows = numpy.concatenate([rows_title, rows_description])
+        terms = numpy.concatenate([terms_title, terms_description])
+        counts = numpy.concatenate([counts_title * TITLE_WEIGHT, counts_description])
+
+        # number the words in the order of their utf-8 bytes, so they can be found by binary search
+        words = [word.encode('utf-8') for word in vocabulary]
+        order = sorted(range(len(words)), key=words.__getitem__)
+        rank = numpy.zeros(len(words), dtype=numpy.int64)
+        rank[numpy.array(order, dtype=numpy.int64)] = numpy.arange(len(words), dtype=numpy.int64)
+        terms = rank[terms]
+
+        # merge the counts of a word in the title and description of the same row
+        num_rows = len(book_ids)
+        keys = terms * max(num_rows, 1) + rows
+        keys, inverse = numpy.unique(keys, return_inverse=True)
+        counts = numpy.bincount(inverse.reshape(-1), weights=counts, minlength=len(keys)).astype(numpy.int64)
+        terms, rows = keys // max(num_rows, 1), keys % max(num_rows, 1)
+
+        doc_freqs = numpy.bincount(terms, minlength=len(words)).astype(numpy.int64)
+        posting_offsets = numpy.zeros(len(words) + 1, dtype=numpy.int64)
+        numpy.cumsum(doc_freqs, out=posting_offsets[1:])
+
+        gaps = numpy.diff(rows, prepend=0)
+        gaps[posting_offsets[:-1][doc_freqs > 0]] = rows[posting_offsets[:-1][doc_freqs > 0]]
+        values = numpy.empty(2 * len(rows), dtype=numpy.uint64)
+        values[0::2], values[1::2] = gaps, counts
+        data, sizes = _encode_varints(values)
+        byte_offsets = numpy.zeros(len(values) + 1, dtype=numpy.int64)
+        numpy.cumsum(sizes, out=byte_offsets[1:])
+
+        sorted_words = [words[i] for i in order]
+        term_offsets = numpy.zeros(len(words) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.array([len(word) for word in sorted_words], dtype=numpy.int64), out=term_offsets[1:])
+
+        return cls({
+            ARRAY_PREFIX + 'book_ids': numpy.asarray(book_ids, dtype=numpy.int64),
+            ARRAY_PREFIX + 'lengths': numpy.bincount(rows, weights=counts, minlength=num_rows).astype(numpy.int32),
+            ARRAY_PREFIX + 'terms.data': numpy.frombuffer(b''.join(sorted_words), dtype=numpy.uint8),
+            ARRAY_PREFIX + 'terms.offsets': term_offsets,
+            ARRAY_PREFIX + 'doc_freqs': doc_freqs,
+            ARRAY_PREFIX + 'postings.data': data,
+            ARRAY_PREFIX + 'postings.offsets': byte_offsets[2 * posting_offsets]
+        })
+
+    @classmethod
+    def from_snapshot(cls, arrays: dict[str, numpy.ndarray]) -> TextIndex:
+        """Return the text index among the arrays of a library snapshot."""
+        return cls({name: array for name, array in arrays.items() if name.startswith(ARRAY_PREFIX)})
+
+    def __len__(self) -> int:
+        """Return the number of books in this index."""
+        return len(self.arrays[ARRAY_PREFIX + 'book_ids'])
+
+    def search(self, query: str, k: int = SEARCH_RESULTS) -> list[tuple[int, float]]:
+        """Return the IDs and BM25 scores of the k books whose title and description best match
+        the words of query, from the best to the worst match (ties in increasing ID order).
+
+        Only books containing at least one word of query are returned.
+
+        Preconditions:
+            - k >= 0
+        """
+        if k == 0 or self.average_length == 0:
+            # an index of books without any words matches no query
+            return []
+
+        num_rows = len(self)
+        matched_rows, matched_scores = [], []
+        for word in set(tokenize(query)):
+            term = self._find_term(word)
+            if term is None:
+                continue
+            rows, counts = self.postings(term)
+            doc_freq = len(rows)
+            idf = math.log(1 + (num_rows - doc_freq + 0.5) / (doc_freq + 0.5))
+            lengths = self.arrays[ARRAY_PREFIX + 'lengths'][rows]
+            norms = K1 * (1 - B + B * lengths / self.average_length)
+            matched_rows.append(rows)
+            matched_scores.append(idf * counts * (K1 + 1) / (counts + norms))
+
+        if not matched_rows:
+            return []
+
+        rows, inverse = numpy.unique(numpy.concatenate(matched_rows), return_inverse=True)
+        scores = numpy.bincount(inverse.reshape(-1), weights=numpy.concatenate(matched_scores), minlength=len(rows))
+        book_ids = self.arrays[ARRAY_PREFIX + 'book_ids'][rows]
+        if len(rows) > k:
+            # keep every row scoring at least the k-th best score, so that ties are broken by ID
+            threshold = numpy.partition(scores, len(rows) - k)[len(rows) - k]
+            keep = scores >= threshold
+            book_ids, scores = book_ids[keep], scores[keep]
+
+        best = numpy.lexsort((book_ids, -scores))[:k]
+        return list(zip(book_ids[best].tolist(), scores[best].tolist()))
+
+    def postings(self, term: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the rows containing the word with index term and the weighted count of the
+        word in each of those rows, decoded from its compressed posting list.
+        """
+        offsets = self.arrays[ARRAY_PREFIX + 'postings.offsets']
+        values = _decode_varints(self.arrays[ARRAY_PREFIX + 'postings.data'][offsets[term]:offsets[term + 1]])
+        values = values.astype(numpy.int64).reshape(-1, 2)
+        return numpy.cumsum(values[:, 0]), values[:, 1]
+
+    def _find_term(self, word: str) -> int | None:
+        """Return the index of word among the words of this index, or None if it is not one of them."""
+        target = word.encode('utf-8')
+        offsets, data = self.arrays[ARRAY_PREFIX + 'terms.offsets'], self.arrays[ARRAY_PREFIX + 'terms.data']
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if data[offsets[middle]:offsets[middle + 1]].tobytes() < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(offsets) - 1 and data[offsets[low]:offsets[low + 1]].tobytes() == target:
+            return low
+        return None
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the case-folded words of text, in order.
+
+    A word is a maximal run of letters and digits.
+    """
+    return WORD_PATTERN.findall(text.casefold())
+
+
+def _count_words(texts: list[str], vocabulary: dict[str, int]) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Return the word counts of every text in texts as three arrays offsets, terms and counts,
+    where text i contains the words with indexes terms[offsets[i]:offsets[i + 1]], the same
+    entries of counts times.
+
+    Words are numbered in vocabulary, which is extended with every word seen for the first time.
+    """
+    offsets = numpy.zeros(len(texts) + 1, dtype=numpy.int64)
+    terms, counts = [], []
+    for i, text in enumerate(texts):
+        words = numpy.array([vocabulary.setdefault(word, len(vocabulary)) for word in tokenize(text)],
+                            dtype=numpy.int64)
+        text_terms, text_counts = numpy.unique(words, return_counts=True)
+        terms.append(text_terms)
+        counts.append(text_counts)
+        offsets[i + 1] = offsets[i] + len(text_terms)
+
+    if not texts:
+        return offsets, numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+    return offsets, numpy.concatenate(terms), numpy.concatenate(counts).astype(numpy.int64)
+
+
+def _expand(codes: numpy.ndarray, offsets: numpy.ndarray, terms: numpy.ndarray,
+            counts: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Return the row, word index and count of every word of every row, where row i has the
+    word counts of the text with index codes[i] as returned by _count_words.
+    """
+    codes = numpy.asarray(codes, dtype=numpy.int64)
+    sizes = offsets[codes + 1] - offsets[codes]
+    rows = numpy.repeat(numpy.arange(len(codes), dtype=numpy.int64), sizes)
+    starts = numpy.repeat(offsets[codes] - (numpy.cumsum(sizes) - sizes), sizes)
+    positions = starts + numpy.arange(len(rows), dtype=numpy.int64)
+    return rows, terms[positions], counts[positions]
+
+
+def _encode_varints(values: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Return the bytes of values written as variable-length integers, and the number of bytes
+    of each value.
+    """
+    sizes = numpy.ones(len(values), dtype=numpy.int64)
+    for i in range(1, 10):
+        sizes += values >= numpy.uint64(1) << numpy.uint64(7 * i)
+
+    starts = numpy.cumsum(sizes) - sizes
+    data = numpy.zeros(int(sizes.sum()), dtype=numpy.uint8)
+    for i in range(int(sizes.max()) if len(sizes) > 0 else 0):
+        selected = sizes > i
+        chunk = (values[selected] >> numpy.uint64(7 * i)) & numpy.uint64(0x7f)
+        chunk |= numpy.where(sizes[selected] > i + 1, numpy.uint64(0x80), numpy.uint64(0))
+        data[starts[selected] + i] = chunk
+    return data, sizes
+
+
+def _decode_varints(data: numpy.ndarray) -> numpy.ndarray:
+    """Return the integers written in data as variable-length integers."""
+    if len(data) == 0:
+        return numpy.zeros(0, dtype=numpy.uint64)
+
+    data = numpy.asarray(data, dtype=numpy.uint64)
+    ends = (data & numpy.uint64(0x80)) == 0
+    starts = numpy.flatnonzero(numpy.concatenate(([True], ends[:-1])))
+    groups = numpy.cumsum(numpy.concatenate(([0], ends[:-1])))
+    shifts = (7 * (numpy.arange(len(data)) - starts[groups])).astype(numpy.uint64)
+    return numpy.bitwise_or.reduceat((data & numpy.uint64(0x7f)) << shifts, starts)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'extra-imports': ['__future__', 'math', 're', 'numpy', 'book', 'book_store']
+    })